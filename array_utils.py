@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+"""
+Array Helpers
+Small vectorized idioms shared by the pattern, DRC and grid modules
+"""
+
+import numpy as np
+
+
+def ragged_arange(counts: np.ndarray) -> np.ndarray:
+    """
+    Position of every element within its run, for runs of the given lengths
+
+    Equivalent to np.concatenate([np.arange(c) for c in counts]) without the
+    Python loop; use with np.repeat(np.arange(len(counts)), counts) for the
+    owning run.
+
+    Args:
+        counts: Non-negative integer run lengths
+
+    Returns:
+        int64 array of length counts.sum()
+    """
+    counts = np.asarray(counts, dtype=np.int64)
+    return np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
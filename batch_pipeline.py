@@ -0,0 +1,465 @@
+#!/usr/bin/env python3
+"""
+Manifest-Driven Batch Pipeline
+Builds pattern and simulation artifacts for the variants listed in a
+JSON/YAML manifest, rebuilding only jobs whose inputs changed (content
+hashes, like make) and running independent jobs concurrently
+"""
+
+import argparse
+import contextlib
+import functools
+import hashlib
+import json
+import sys
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+MODULE_DIR = Path(__file__).resolve().parent
+STATE_FILE = '.pipeline_state.json'
+
+# Entry modules of each job kind; every local module they import (directly,
+# lazily inside functions, or transitively) is part of the cache key
+JOB_ENTRY_MODULES = {
+    'pattern': ('fractal_pattern_generator', 'design_rule_checker'),
+    'simulation': ('thermal_fea_simulator',),
+}
+
+# This module holds the job bodies, so it keys every job; its imports are not
+# followed, since it imports the code of both job kinds
+PIPELINE_MODULE = Path(__file__).stem
+
+PATTERN_METHODS = {
+    'voronoi': 'generate_voronoi_fractal',
+    'hilbert': 'generate_hilbert_fractal',
+    'radial': 'generate_radial_fractal',
+}
+
+PATTERN_EXPORTS = ('json', 'twp', 'dxf', 'svg', 'png', 'drc')
+
+
+@dataclass
+class Job:
+    """One build step with declared inputs, outputs and dependencies"""
+    id: str
+    kind: str
+    config: dict
+    outputs: Dict[str, str]  # artifact name -> path
+    inputs: List[str] = field(default_factory=list)  # files produced by deps
+    deps: List[str] = field(default_factory=list)
+
+
+# ---------------------------------------------------------------------------
+# Manifest
+# ---------------------------------------------------------------------------
+
+def load_manifest(filename: str) -> dict:
+    """Read a JSON or YAML (.yaml/.yml, needs PyYAML) manifest"""
+    with open(filename, 'r') as f:
+        if Path(filename).suffix.lower() in ('.yaml', '.yml'):
+            from fractal_pattern_generator import _require
+            yaml = _require('yaml', 'YAML manifests', 'use a .json manifest')
+            return yaml.safe_load(f)
+        return json.load(f)
+
+
+def resolve_spec(spec) -> dict:
+    """
+    WaferSpec fields from a manifest entry
+
+    Accepts a preset name ('space_solar', 'ai_compute', 'quantum'), a dict
+    with 'base' preset plus field overrides, or a full dict of fields.
+    """
+    from fractal_pattern_generator import SPACE_VARIANT, AI_VARIANT, QUANTUM_VARIANT
+
+    presets = {'space_solar': SPACE_VARIANT, 'ai_compute': AI_VARIANT,
+               'quantum': QUANTUM_VARIANT}
+    if isinstance(spec, str):
+        spec = {'base': spec}
+    spec = dict(spec)
+    base = spec.pop('base', None)
+    if base is not None:
+        if base not in presets:
+            raise ValueError(f"Unknown wafer spec preset '{base}'; "
+                             f"choose from {', '.join(presets)}")
+        spec = dict(asdict(presets[base]), **spec)
+    spec['operating_temp_range'] = list(spec['operating_temp_range'])
+    return spec
+
+
+def default_manifest() -> dict:
+    """Manifest reproducing generate_all_variants + run_all_simulations"""
+    from fractal_pattern_generator import (SPACE_VARIANT, AI_VARIANT, QUANTUM_VARIANT,
+                                           default_hot_spots)
+    from thermal_fea_simulator import SIMULATION_CASES
+
+    patterns = {
+        'space_solar': (SPACE_VARIANT, {'type': 'voronoi', 'num_points': 500}),
+        'ai_compute': (AI_VARIANT, {'type': 'hilbert', 'order': 6}),
+        'quantum': (QUANTUM_VARIANT, {'type': 'radial', 'num_primary': 24,
+                                      'branch_factor': 4}),
+    }
+    variants = []
+    for case in SIMULATION_CASES:
+        spec, pattern = patterns[case['name']]
+        variants.append({
+            'name': case['name'],
+            'spec': case['name'],
+            'seed': 0,
+            'hot_spots': [[float(v) for v in h] for h in default_hot_spots(spec)],
+            'pattern': pattern,
+            'exports': list(PATTERN_EXPORTS),
+            'simulation': {
+                'resolution': 150,
+                'ambient_temp_C': case['ambient_temp'],
+                'cooling': case['cooling'],
+                'heat_loads': [list(load) for load in case['heat_loads']],
+            },
+        })
+    return {'output_dir': 'build', 'variants': variants}
+
+
+def plan_jobs(manifest: dict, output_dir: Path) -> List[Job]:
+    """Expand a manifest into pattern and simulation jobs"""
+    jobs = []
+    names = set()
+    for variant in manifest['variants']:
+        name = variant['name']
+        if name in names:
+            raise ValueError(f"Duplicate variant name '{name}' in manifest")
+        names.add(name)
+
+        exports = variant.get('exports', list(PATTERN_EXPORTS))
+        unknown = set(exports) - set(PATTERN_EXPORTS)
+        if unknown:
+            raise ValueError(f"{name}: unknown exports {sorted(unknown)}")
+        pattern = dict(variant['pattern'])
+        if pattern.get('type') not in PATTERN_METHODS:
+            raise ValueError(f"{name}: pattern type must be one of {', '.join(PATTERN_METHODS)}")
+
+        # JSON and TWP are always built: they feed the simulation
+        outputs = {ext: str(output_dir / f'{name}_pattern.{ext}')
+                   for ext in ('json', 'twp', 'dxf', 'svg', 'png')
+                   if ext in exports or ext in ('json', 'twp')}
+        if 'drc' in exports:
+            outputs['drc'] = str(output_dir / f'{name}_drc.json')
+        pattern_job = Job(
+            id=f'{name}:pattern', kind='pattern', outputs=outputs,
+            config={'spec': resolve_spec(variant['spec']), 'pattern': pattern,
+                    'hot_spots': variant.get('hot_spots', 'default'),
+                    'seed': variant.get('seed', 0), 'exports': sorted(exports),
+                    'render': variant.get('render', {'fast': True, 'dpi': 150})})
+        jobs.append(pattern_job)
+
+        simulation = variant.get('simulation')
+        if simulation:
+            sim_outputs = {'results': str(output_dir / f'{name}_results.json')}
+            if simulation.get('render', True):
+                sim_outputs['png'] = str(output_dir / f'{name}_thermal_steady.png')
+            jobs.append(Job(
+                id=f'{name}:simulation', kind='simulation', outputs=sim_outputs,
+                config=dict(simulation, diameter_mm=pattern_job.config['spec']['diameter_mm']),
+                inputs=[outputs['twp']], deps=[pattern_job.id]))
+    return jobs
+
+
+# ---------------------------------------------------------------------------
+# Content hashing and build state
+# ---------------------------------------------------------------------------
+
+class HashCache:
+    """SHA-256 of files, reused while size and mtime are unchanged"""
+
+    def __init__(self, entries: Optional[dict] = None):
+        self.entries = entries or {}
+
+    def __call__(self, filename: str) -> Optional[str]:
+        path = Path(filename)
+        if not path.exists():
+            return None
+        stat = path.stat()
+        key = str(path.resolve())
+        cached = self.entries.get(key)
+        if cached and cached['size'] == stat.st_size and cached['mtime_ns'] == stat.st_mtime_ns:
+            return cached['sha256']
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        self.entries[key] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns,
+                             'sha256': digest.hexdigest()}
+        return digest.hexdigest()
+
+
+def _local_imports(module: str) -> List[str]:
+    """Modules in this directory imported anywhere in a module's source"""
+    import ast
+
+    tree = ast.parse((MODULE_DIR / f'{module}.py').read_text(encoding='utf-8'))
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name.split('.')[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names.add(node.module.split('.')[0])
+    return sorted(name for name in names if (MODULE_DIR / f'{name}.py').exists())
+
+
+@functools.lru_cache(maxsize=None)
+def job_code(kind: str) -> Tuple[str, ...]:
+    """Source files whose contents are part of a job kind's cache key"""
+    seen, pending = {PIPELINE_MODULE}, list(JOB_ENTRY_MODULES[kind])
+    while pending:
+        module = pending.pop()
+        if module not in seen:
+            seen.add(module)
+            pending.extend(_local_imports(module))
+    return tuple(f'{module}.py' for module in sorted(seen))
+
+
+def job_key(job: Job, file_hash: HashCache) -> str:
+    """Cache key over the job's config, input contents and code"""
+    payload = {
+        'kind': job.kind,
+        'config': job.config,
+        'inputs': {p: file_hash(p) for p in job.inputs},
+        'code': {name: file_hash(str(MODULE_DIR / name)) for name in job_code(job.kind)},
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str)
+                          .encode('utf-8')).hexdigest()
+
+
+def is_stale(job: Job, key: str, state: dict, file_hash: HashCache) -> bool:
+    """A job is stale if its key changed or a recorded output is missing or modified"""
+    record = state.get(job.id)
+    if not record or record['key'] != key:
+        return True
+    return any(file_hash(path) != digest for path, digest in record['outputs'].items())
+
+
+# ---------------------------------------------------------------------------
+# Job execution (runs in worker processes)
+# ---------------------------------------------------------------------------
+
+def _build_pattern(config: dict, outputs: Dict[str, str]) -> List[str]:
+    from fractal_pattern_generator import FractalPatternGenerator, WaferSpec, default_hot_spots
+    from design_rule_checker import run_drc_gate, withhold_release
+
+    spec = WaferSpec(**dict(config['spec'],
+                            operating_temp_range=tuple(config['spec']['operating_temp_range'])))
+    np.random.seed(config['seed'])
+    gen = FractalPatternGenerator(spec)
+    hot_spots = config['hot_spots']
+    for x, y, intensity in (default_hot_spots(spec) if hot_spots == 'default' else hot_spots):
+        gen.add_hot_spot(x, y, intensity)
+
+    pattern = dict(config['pattern'])
+    getattr(gen, PATTERN_METHODS[pattern.pop('type')])(**pattern)
+
+    written = []
+    release_dxf = True
+    if 'drc' in outputs:
+        report = run_drc_gate(gen, outputs['drc'], strict=False)
+        release_dxf = report.passed
+        written.append(outputs['drc'])
+    gen.export_json(outputs['json'])
+    gen.export_binary(outputs['twp'])
+    written += [outputs['json'], outputs['twp']]
+    if 'dxf' in outputs:
+        if release_dxf:
+            gen.export_dxf(outputs['dxf'], streaming=True)
+            written.append(outputs['dxf'])
+        else:
+            withhold_release(outputs['dxf'])
+    if 'svg' in outputs:
+        gen.export_svg(outputs['svg'], compact=True)
+        written.append(outputs['svg'])
+    if 'png' in outputs:
+        render = config['render']
+        gen.visualize(outputs['png'], fast=render.get('fast', True), dpi=render.get('dpi', 150))
+        written.append(outputs['png'])
+    return written
+
+
+def _build_simulation(config: dict, inputs: List[str], outputs: Dict[str, str]) -> List[str]:
+    from thermal_fea_simulator import ThermalFEA
+
+    fea = ThermalFEA(config['diameter_mm'], resolution=config.get('resolution', 150))
+    fea.load_pattern_from_binary(inputs[0])
+    for load in config.get('heat_loads', []):
+        fea.add_heat_source(*load)
+    fea.set_boundary_conditions(config.get('ambient_temp_C', 25.0),
+                                config.get('cooling', 'convective'))
+    fea.solve_steady_state(config.get('solver', 'direct'), **config.get('solver_options', {}))
+
+    written = []
+    if 'png' in outputs:
+        fea.visualize(outputs['png'], fast=True, dpi=config.get('dpi', 150))
+        written.append(outputs['png'])
+    fea.export_results(outputs['results'])
+    written.append(outputs['results'])
+    return written
+
+
+def run_job(job: Job, log_dir: str) -> List[str]:
+    """Run one job with its output captured to <log_dir>/<job>.log"""
+    log_file = Path(log_dir) / (job.id.replace(':', '.') + '.log')
+    with open(log_file, 'w') as log, contextlib.redirect_stdout(log):
+        try:
+            if job.kind == 'pattern':
+                return _build_pattern(job.config, job.outputs)
+            return _build_simulation(job.config, job.inputs, job.outputs)
+        except Exception:
+            traceback.print_exc(file=log)
+            raise
+
+
+# ---------------------------------------------------------------------------
+# Scheduler
+# ---------------------------------------------------------------------------
+
+@dataclass
+class BuildSummary:
+    built: List[str] = field(default_factory=list)
+    up_to_date: List[str] = field(default_factory=list)
+    failed: List[str] = field(default_factory=list)
+    skipped: List[str] = field(default_factory=list)
+    seconds: float = 0.0
+
+
+def run_pipeline(manifest: dict, output_dir: Optional[str] = None, workers: int = 1,
+                 force: bool = False, dry_run: bool = False,
+                 only: Optional[List[str]] = None) -> BuildSummary:
+    """
+    Build stale artifacts for a manifest
+
+    Args:
+        manifest: Parsed manifest (see default_manifest for the schema)
+        output_dir: Overrides the manifest's output_dir
+        workers: Concurrent job processes (1 runs in-process)
+        force: Rebuild everything
+        dry_run: Report what would be built without running anything
+        only: Restrict to these variant names (their dependencies included)
+
+    Returns:
+        BuildSummary of built, up-to-date, failed and skipped job ids
+    """
+    start = time.perf_counter()
+    out = Path(output_dir or manifest.get('output_dir', 'build'))
+    out.mkdir(parents=True, exist_ok=True)
+    (out / 'logs').mkdir(exist_ok=True)
+
+    jobs = {job.id: job for job in plan_jobs(manifest, out)}
+    if only:
+        jobs = {jid: job for jid, job in jobs.items() if jid.split(':')[0] in only}
+
+    state_path = out / STATE_FILE
+    saved = json.loads(state_path.read_text()) if state_path.exists() else {}
+    state, file_hash = saved.get('jobs', {}), HashCache(saved.get('hashes'))
+    summary = BuildSummary()
+    pending = dict(jobs)
+    changed = set()  # jobs rebuilt in this run (dependents must re-check)
+    running = {}
+
+    def save_state():
+        state_path.write_text(json.dumps({'jobs': state, 'hashes': file_hash.entries},
+                                         indent=2))
+
+    def finish(job: Job, written: List[str], key: str):
+        state[job.id] = {'key': key, 'outputs': {p: file_hash(p) for p in written},
+                         'built_at': time.strftime('%Y-%m-%dT%H:%M:%S')}
+        summary.built.append(job.id)
+        changed.add(job.id)
+        save_state()
+
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 and not dry_run else None
+    try:
+        while pending or running:
+            # Schedule every job whose dependencies have finished
+            for jid in list(pending):
+                job = pending[jid]
+                deps = [d for d in job.deps if d in jobs]
+                if any(d in summary.failed or d in summary.skipped for d in deps):
+                    summary.skipped.append(jid)
+                    del pending[jid]
+                    continue
+                if any(d in pending or d in (r[0] for r in running.values()) for d in deps):
+                    continue
+                del pending[jid]
+                if dry_run and any(d in changed for d in deps):
+                    print(f"[would build] {jid} (dependency changes)")
+                    summary.built.append(jid)
+                    changed.add(jid)
+                    continue
+                key = job_key(job, file_hash)
+                if not force and not is_stale(job, key, state, file_hash):
+                    summary.up_to_date.append(jid)
+                    continue
+                if dry_run:
+                    print(f"[would build] {jid}")
+                    summary.built.append(jid)
+                    changed.add(jid)
+                elif pool is None:
+                    print(f"[build] {jid}")
+                    try:
+                        finish(job, run_job(job, str(out / 'logs')), key)
+                    except Exception as exc:
+                        print(f"[failed] {jid}: {exc}")
+                        summary.failed.append(jid)
+                else:
+                    print(f"[build] {jid}")
+                    running[pool.submit(run_job, job, str(out / 'logs'))] = (jid, key)
+
+            if running:
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    jid, key = running.pop(future)
+                    try:
+                        finish(jobs[jid], future.result(), key)
+                    except Exception as exc:
+                        print(f"[failed] {jid}: {exc}")
+                        summary.failed.append(jid)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    summary.seconds = time.perf_counter() - start
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('manifest', nargs='?', help='JSON or YAML manifest')
+    parser.add_argument('-o', '--output-dir', help="Overrides the manifest's output_dir")
+    parser.add_argument('-j', '--workers', type=int, default=1)
+    parser.add_argument('--force', action='store_true', help='Rebuild everything')
+    parser.add_argument('--dry-run', action='store_true')
+    parser.add_argument('--only', nargs='+', metavar='VARIANT')
+    parser.add_argument('--write-default', metavar='PATH',
+                        help='Write the built-in three-variant manifest and exit')
+    args = parser.parse_args(argv)
+
+    if args.write_default:
+        with open(args.write_default, 'w') as f:
+            json.dump(default_manifest(), f, indent=2)
+        print(f"Default manifest written to {args.write_default}")
+        return 0
+
+    manifest = load_manifest(args.manifest) if args.manifest else default_manifest()
+    summary = run_pipeline(manifest, args.output_dir, args.workers, args.force,
+                           args.dry_run, args.only)
+    print(f"\n{len(summary.built)} built, {len(summary.up_to_date)} up to date, "
+          f"{len(summary.failed)} failed, {len(summary.skipped)} skipped "
+          f"in {summary.seconds:.1f}s")
+    return 1 if summary.failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Performance Benchmark Suite
+Times pattern generation, export, pattern loading, rasterization, matrix
+assembly and solves across sizes and wafer variants, records peak memory,
+and compares results against a stored baseline to flag regressions
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass, asdict, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from fractal_pattern_generator import (FractalPatternGenerator, SPACE_VARIANT,
+                                       AI_VARIANT, QUANTUM_VARIANT)
+from thermal_fea_simulator import ThermalFEA
+
+
+VARIANTS = {
+    'space_solar': SPACE_VARIANT,
+    'ai_compute': AI_VARIANT,
+    'quantum': QUANTUM_VARIANT,
+}
+
+DEFAULT_RESOLUTIONS = (50, 100, 150)
+DEFAULT_THRESHOLD = 0.25  # fractional slowdown flagged as a regression
+
+
+@dataclass
+class BenchmarkCase:
+    """One benchmark: setup builds fresh state, run is the timed operation"""
+    group: str
+    name: str
+    params: Dict
+    setup: Callable[[], object]
+    run: Callable[[object], None]
+
+    @property
+    def key(self) -> str:
+        args = ','.join(f'{k}={v}' for k, v in sorted(self.params.items()))
+        return f'{self.group}/{self.name}[{args}]'
+
+
+@dataclass
+class BenchmarkResult:
+    """Timing and memory for one case"""
+    key: str
+    group: str
+    name: str
+    params: Dict
+    seconds: float
+    all_seconds: List[float] = field(default_factory=list)
+    peak_memory_mb: Optional[float] = None
+
+
+def _quiet(func, *args):
+    """Run func with stdout suppressed (the FEA reports progress via print)"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args)
+
+
+def run_case(case: BenchmarkCase, repeat: int = 3, memory: bool = True) -> BenchmarkResult:
+    """Best-of-`repeat` wall time plus one tracemalloc run for peak memory"""
+    # Untimed warm-up so lazy imports (scipy, ...) and first-call caches
+    # are not charged to the first case that triggers them
+    _quiet(case.run, _quiet(case.setup))
+
+    timings = []
+    for _ in range(repeat):
+        state = _quiet(case.setup)
+        start = time.perf_counter()
+        _quiet(case.run, state)
+        timings.append(time.perf_counter() - start)
+
+    peak_mb = None
+    if memory:
+        state = _quiet(case.setup)
+        tracemalloc.start()
+        try:
+            _quiet(case.run, state)
+            peak_mb = tracemalloc.get_traced_memory()[1] / 1e6
+        finally:
+            tracemalloc.stop()
+
+    return BenchmarkResult(case.key, case.group, case.name, case.params,
+                           min(timings), timings, peak_mb)
+
+
+def _variant_generator(variant: str, pattern: str, size: int) -> FractalPatternGenerator:
+    """Deterministic generator with the variant's hot spots and a pattern"""
+    np.random.seed(0)
+    spec = VARIANTS[variant]
+    gen = FractalPatternGenerator(spec)
+    gen.add_hot_spot(0.0, 0.0, spec.peak_power_density_W_cm2)
+    if pattern == 'voronoi':
+        gen.generate_voronoi_fractal(num_points=size)
+    elif pattern == 'hilbert':
+        gen.generate_hilbert_fractal(order=size)
+    else:
+        gen.generate_radial_fractal(num_primary=size, branch_factor=4)
+    return gen
+
+
+def generator_cases(voronoi_points=(250, 500, 1000), hilbert_orders=(4, 5, 6, 7),
+                    radial_primaries=(12, 24, 48)) -> List[BenchmarkCase]:
+    """Pattern generation by method and size"""
+    cases = []
+    sizes = (('voronoi', 'num_points', voronoi_points),
+             ('hilbert', 'order', hilbert_orders),
+             ('radial', 'num_primary', radial_primaries))
+    for pattern, param, values in sizes:
+        for size in values:
+            def setup(size=size):
+                np.random.seed(0)
+                gen = FractalPatternGenerator(AI_VARIANT)
+                gen.add_hot_spot(0.0, 0.0, 500.0)
+                return gen
+
+            def run(gen, pattern=pattern, size=size):
+                if pattern == 'voronoi':
+                    gen.generate_voronoi_fractal(num_points=size)
+                elif pattern == 'hilbert':
+                    gen.generate_hilbert_fractal(order=size)
+                else:
+                    gen.generate_radial_fractal(num_primary=size, branch_factor=4)
+
+            cases.append(BenchmarkCase('generate', pattern, {param: size}, setup, run))
+    return cases
+
+
+def exporter_cases(out_dir: Path, hilbert_orders=(5, 6)) -> List[BenchmarkCase]:
+    """Every exporter on Hilbert patterns of increasing size"""
+    exporters = {
+        'dxf': lambda g, p: g.export_dxf(str(p / 'bench.dxf')),
+        'dxf_streaming': lambda g, p: g.export_dxf(str(p / 'bench_s.dxf'), streaming=True),
+        'svg': lambda g, p: g.export_svg(str(p / 'bench.svg')),
+        'svg_compact': lambda g, p: g.export_svg(str(p / 'bench_c.svg'), compact=True),
+        'json': lambda g, p: g.export_json(str(p / 'bench.json')),
+        'binary': lambda g, p: g.export_binary(str(p / 'bench.twp')),
+    }
+    cases = []
+    for order in hilbert_orders:
+        gen = _quiet(_variant_generator, 'ai_compute', 'hilbert', order)
+        for name, export in exporters.items():
+            cases.append(BenchmarkCase(
+                'export', name, {'order': order, 'channels': len(gen.channels)},
+                lambda gen=gen: gen, lambda g, export=export: export(g, out_dir)))
+    return cases
+
+
+def fea_cases(out_dir: Path, resolutions=DEFAULT_RESOLUTIONS,
+              variants=tuple(VARIANTS), transient: bool = True) -> List[BenchmarkCase]:
+    """FEA phases across mesh resolutions and wafer variants"""
+    patterns = {'space_solar': ('voronoi', 500), 'ai_compute': ('hilbert', 6),
+                'quantum': ('radial', 24)}
+    cases = []
+    for variant in variants:
+        spec = VARIANTS[variant]
+        gen = _quiet(_variant_generator, variant, *patterns[variant])
+        json_file = out_dir / f'{variant}_bench.json'
+        binary_file = out_dir / f'{variant}_bench.twp'
+        _quiet(gen.export_json, str(json_file))
+        _quiet(gen.export_binary, str(binary_file))
+        islands = gen.add_diamond_islands()
+
+        for n in resolutions:
+            params = {'variant': variant, 'resolution': n, 'nodes': n * n}
+
+            def mesh(spec=spec, n=n):
+                return ThermalFEA(spec.diameter_mm, resolution=n)
+
+            def loaded(spec=spec, n=n, gen=gen, islands=islands):
+                fea = ThermalFEA(spec.diameter_mm, resolution=n)
+                fea.load_pattern(gen.channels, islands)
+                fea.add_heat_source(0.0, 0.0, 100.0)
+                fea.set_boundary_conditions(25.0, 'liquid')
+                return fea
+
+            def with_channels(spec=spec, n=n, gen=gen, islands=islands):
+                fea = ThermalFEA(spec.diameter_mm, resolution=n)
+                fea.channels = gen.channel_array()
+                fea.diamond_islands = islands
+                return fea
+
+            cases += [
+                BenchmarkCase('fea', 'load_pattern_from_json', params, mesh,
+                              lambda f, p=json_file: f.load_pattern_from_json(str(p))),
+                BenchmarkCase('fea', 'load_pattern_from_binary', params, mesh,
+                              lambda f, p=binary_file: f.load_pattern_from_binary(str(p))),
+                BenchmarkCase('fea', 'rasterize_channels', params, with_channels,
+                              lambda f: f._apply_channel_conductivity()),
+                BenchmarkCase('fea', 'stamp_islands', params, with_channels,
+                              lambda f: f._apply_diamond_islands()),
+                BenchmarkCase('fea', 'stamp_sources', params, mesh,
+                              lambda f: f.add_heat_source(0.0, 0.0, 100.0)),
+                BenchmarkCase('fea', 'assemble_stiffness', params, loaded,
+                              lambda f: f.build_stiffness_matrix()),
+                BenchmarkCase('fea', 'solve_steady_state', params, loaded,
+                              lambda f: f.solve_steady_state()),
+            ]
+            if transient:
+                cases.append(BenchmarkCase('fea', 'solve_transient', params, loaded,
+                                           lambda f: f.solve_transient(1.0, dt=0.1)))
+    return cases
+
+
+def environment_info() -> Dict:
+    """Interpreter, platform and git revision for the results file"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'],
+                                cwd=Path(__file__).resolve().parent,
+                                capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ''
+    return {'python': platform.python_version(), 'numpy': np.__version__,
+            'platform': platform.platform(), 'machine': platform.machine(),
+            'commit': commit, 'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S')}
+
+
+def compare_results(current: List[BenchmarkResult], baseline: Dict,
+                    threshold: float = DEFAULT_THRESHOLD) -> List[Dict]:
+    """
+    Flag cases whose time or peak memory grew by more than `threshold`
+
+    Args:
+        current: Results of this run
+        baseline: Parsed results file from an earlier run
+        threshold: Allowed fractional increase (0.25 = 25%)
+
+    Returns:
+        One entry per regression with the metric, old and new values
+    """
+    old = {r['key']: r for r in baseline.get('results', [])}
+    regressions = []
+    for r in current:
+        prev = old.get(r.key)
+        if prev is None:
+            continue
+        metrics = [('seconds', prev['seconds'], r.seconds)]
+        if prev.get('peak_memory_mb') and r.peak_memory_mb is not None:
+            metrics.append(('peak_memory_mb', prev['peak_memory_mb'], r.peak_memory_mb))
+        for metric, before, after in metrics:
+            if before > 0 and after > before * (1 + threshold):
+                regressions.append({'key': r.key, 'metric': metric, 'baseline': before,
+                                    'current': after, 'ratio': after / before})
+    return regressions
+
+
+def print_scaling_table(results: List[BenchmarkResult]):
+    """Time and memory per case, grouped so scaling with size reads down a column"""
+    print(f"\n{'case':<78} {'time':>10} {'peak MB':>9}")
+    for r in sorted(results, key=lambda r: (r.group, r.name, str(sorted(r.params.items())))):
+        mem = f'{r.peak_memory_mb:9.1f}' if r.peak_memory_mb is not None else f"{'-':>9}"
+        print(f"{r.key:<78} {r.seconds * 1000:8.1f}ms {mem}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--groups', nargs='+', default=['generate', 'export', 'fea'],
+                        choices=['generate', 'export', 'fea'])
+    parser.add_argument('--resolutions', nargs='+', type=int,
+                        default=list(DEFAULT_RESOLUTIONS),
+                        help='FEA mesh points per diameter (e.g. 250 1000 4000)')
+    parser.add_argument('--variants', nargs='+', default=list(VARIANTS),
+                        choices=list(VARIANTS))
+    parser.add_argument('--hilbert-orders', nargs='+', type=int, default=[4, 5, 6, 7])
+    parser.add_argument('--no-transient', action='store_true')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--no-memory', action='store_true',
+                        help='Skip the tracemalloc peak-memory run')
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--baseline', help='Earlier results file to compare against')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument('--fail-on-regression', action='store_true')
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        out_dir = Path(tmp)
+        cases = []
+        if 'generate' in args.groups:
+            cases += generator_cases(hilbert_orders=args.hilbert_orders)
+        if 'export' in args.groups:
+            cases += exporter_cases(out_dir, hilbert_orders=args.hilbert_orders[-2:])
+        if 'fea' in args.groups:
+            cases += fea_cases(out_dir, args.resolutions, args.variants,
+                               transient=not args.no_transient)
+
+        results = []
+        for i, case in enumerate(cases, 1):
+            result = run_case(case, args.repeat, memory=not args.no_memory)
+            results.append(result)
+            print(f"[{i}/{len(cases)}] {case.key}: {result.seconds * 1000:.1f} ms")
+
+    print_scaling_table(results)
+    data = {'environment': environment_info(),
+            'results': [asdict(r) for r in results]}
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+        regressions = compare_results(results, baseline, args.threshold)
+        data['baseline'] = {'file': args.baseline,
+                            'commit': baseline.get('environment', {}).get('commit'),
+                            'threshold': args.threshold,
+                            'regressions': regressions}
+        print(f"\n{len(regressions)} regression(s) vs {args.baseline} "
+              f"(threshold {args.threshold:.0%})")
+        for reg in regressions:
+            print(f"  REGRESSION {reg['key']} {reg['metric']}: "
+                  f"{reg['baseline']:.4g} -> {reg['current']:.4g} ({reg['ratio']:.2f}x)")
+
+    with open(args.output, 'w') as f:
+        json.dump(data, f, indent=2)
+    print(f"\nBenchmark results written to {args.output}")
+
+    if regressions and args.fail_on_regression:
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+Streaming CAD Writers for Fractal Heat Spreader Patterns
+Writes large patterns straight to disk in bounded memory, without
+building an in-memory document
+"""
+
+import numpy as np
+from typing import List, Tuple
+
+
+def merge_channel_runs(channels, tol_mm: float = 1e-9) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Merge consecutive end-to-start connected segments into polyline runs
+
+    Args:
+        channels: (N, 2, 2) channel segment endpoints in mm
+        tol_mm: Maximum gap treated as connected
+
+    Returns:
+        (vertices, starts): (M, 2) vertex array and the index of the first
+        vertex of each run; run k spans vertices[starts[k]:starts[k + 1]]
+    """
+    channels = np.asarray(channels, dtype=float).reshape(-1, 2, 2)
+    if len(channels) == 0:
+        return np.empty((0, 2)), np.empty(0, dtype=np.int64)
+
+    gaps = np.linalg.norm(channels[1:, 0] - channels[:-1, 1], axis=1)
+    seg_starts = np.concatenate([[0], np.flatnonzero(gaps > tol_mm) + 1])
+    seg_ends = np.concatenate([seg_starts[1:], [len(channels)]])
+
+    # Each run contributes every segment start plus its final end point
+    is_last = np.zeros(len(channels), dtype=bool)
+    is_last[seg_ends - 1] = True
+    repeats = np.where(is_last, 2, 1)
+    vertices = np.repeat(channels[:, 0], repeats, axis=0)
+    last_pos = np.cumsum(repeats)[is_last] - 1
+    vertices[last_pos] = channels[is_last, 1]
+    starts = seg_starts + np.arange(len(seg_starts))
+    return vertices, starts
+
+
+class StreamingDXFWriter:
+    """
+    Incremental DXF R2000 writer
+
+    Repeated features are written once as BLOCKs and placed with INSERT,
+    and channel runs are written as LWPOLYLINEs. Handles come from a
+    counter: the BLOCK_RECORD table is written up front with the TABLES,
+    a minimal OBJECTS section (root dictionary and ACAD_GROUP) is written
+    on close, and $HANDSEED is reserved in the HEADER and patched last.
+
+    Call header(), tables(), circle_blocks() and begin_entities() in that
+    order, then write entities.
+    """
+
+    SEED_WIDTH = 16  # fixed-width hex so $HANDSEED can be patched in place
+
+    def __init__(self, filename: str, precision: int = 6,
+                 chunk_size: int = 50000):
+        self.filename = filename
+        self.fmt = f'%.{precision}f'
+        self.chunk_size = chunk_size
+        self._file = None
+        self._section = None
+        self._handle = 1
+        self._seed_offset = None
+        self._block_records = {}
+        self._owner = None
+
+    def __enter__(self):
+        self._file = open(self.filename, 'w', buffering=1 << 20)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self._objects()
+            self._end_section()
+            self._file.write('0\nEOF\n')
+            if self._seed_offset is not None:
+                self._file.seek(self._seed_offset)
+                self._file.write(f'{self._handle:0{self.SEED_WIDTH}X}')
+        self._file.close()
+        self._file = None
+
+    def _write(self, text: str):
+        self._file.write(text)
+
+    def _next_handle(self) -> str:
+        handle = f'{self._handle:X}'
+        self._handle += 1
+        return handle
+
+    def _with_handles(self, values: np.ndarray) -> tuple:
+        """Flat format arguments: a fresh handle followed by each row of values"""
+        rows = np.empty((len(values), values.shape[1] + 1), dtype=object)
+        rows[:, 0] = range(self._handle, self._handle + len(values))
+        rows[:, 1:] = values
+        self._handle += len(values)
+        return tuple(rows.ravel().tolist())
+
+    def _begin_section(self, name: str):
+        self._end_section()
+        self._write(f'0\nSECTION\n2\n{name}\n')
+        self._section = name
+
+    def _end_section(self):
+        if self._section is not None:
+            self._write('0\nENDSEC\n')
+            self._section = None
+
+    def header(self, extmin: Tuple[float, float], extmax: Tuple[float, float]):
+        """HEADER section (version, millimetre units, extents) and empty CLASSES"""
+        f = self.fmt
+        self._begin_section('HEADER')
+        self._write('9\n$ACADVER\n1\nAC1015\n9\n$HANDSEED\n5\n')
+        self._file.flush()
+        self._seed_offset = self._file.tell()
+        self._write('0' * self.SEED_WIDTH + '\n')
+        self._write('9\n$INSUNITS\n70\n4\n')
+        self._write(f'9\n$EXTMIN\n10\n{f % extmin[0]}\n20\n{f % extmin[1]}\n30\n0.0\n')
+        self._write(f'9\n$EXTMAX\n10\n{f % extmax[0]}\n20\n{f % extmax[1]}\n30\n0.0\n')
+        self._begin_section('CLASSES')
+
+    def _table(self, name: str, entries: List[str], subclass: str = ''):
+        """
+        One symbol table; entries are record bodies after the handle/owner
+
+        Each entry string starts with its record type and is given a handle
+        (group 105 for DIMSTYLE, 5 otherwise) owned by the table.
+        """
+        table = self._next_handle()
+        self._write(f'0\nTABLE\n2\n{name}\n5\n{table}\n330\n0\n100\nAcDbSymbolTable\n'
+                    f'{subclass}70\n{len(entries)}\n')
+        code = 105 if name == 'DIMSTYLE' else 5
+        for entry in entries:
+            record, body = entry.split('\n', 1)
+            self._write(f'0\n{record}\n{code}\n{self._next_handle()}\n330\n{table}\n'
+                        f'100\nAcDbSymbolTableRecord\n{body}')
+        self._write('0\nENDTAB\n')
+
+    def tables(self, layers: List[Tuple[str, int]], blocks: List[str]):
+        """
+        TABLES section with the required default records, (name, color)
+        layers and a BLOCK_RECORD for model space, paper space and each
+        block name later written by circle_blocks()
+        """
+        self._begin_section('TABLES')
+        self._table('VPORT', [])
+        self._table('LTYPE', [
+            f'LTYPE\n100\nAcDbLinetypeTableRecord\n2\n{name}\n70\n0\n3\n{text}\n'
+            f'72\n65\n73\n0\n40\n0.0\n'
+            for name, text in (('ByBlock', ''), ('ByLayer', ''), ('Continuous', 'Solid line'))])
+        self._table('LAYER', [
+            f'LAYER\n100\nAcDbLayerTableRecord\n2\n{name}\n70\n0\n62\n{color}\n'
+            f'6\nContinuous\n'
+            for name, color in [('0', 7)] + list(layers)])
+        self._table('STYLE', [
+            'STYLE\n100\nAcDbTextStyleTableRecord\n2\nStandard\n70\n0\n40\n0.0\n'
+            '41\n1.0\n50\n0.0\n71\n0\n42\n2.5\n3\ntxt\n4\n\n'])
+        self._table('VIEW', [])
+        self._table('UCS', [])
+        self._table('APPID', ['APPID\n100\nAcDbRegAppTableRecord\n2\nACAD\n70\n0\n'])
+        self._table('DIMSTYLE',
+                    ['DIMSTYLE\n100\nAcDbDimStyleTableRecord\n2\nStandard\n70\n0\n'],
+                    subclass='100\nAcDbDimStyleTable\n')
+
+        names = ['*Model_Space', '*Paper_Space'] + list(blocks)
+        first = self._handle + 1  # after the table's own handle
+        self._block_records = {name: f'{first + k:X}' for k, name in enumerate(names)}
+        self._table('BLOCK_RECORD', [f'BLOCK_RECORD\n100\nAcDbBlockTableRecord\n2\n{name}\n'
+                                     for name in names])
+
+    def _block(self, name: str, content: str = '', paper_space: bool = False):
+        owner = self._block_records[name]
+        space = '67\n1\n' if paper_space else ''
+        self._write(f'0\nBLOCK\n5\n{self._next_handle()}\n330\n{owner}\n100\nAcDbEntity\n'
+                    f'{space}8\n0\n100\nAcDbBlockBegin\n2\n{name}\n70\n0\n'
+                    f'10\n0.0\n20\n0.0\n30\n0.0\n3\n{name}\n1\n\n')
+        self._write(content)
+        self._write(f'0\nENDBLK\n5\n{self._next_handle()}\n330\n{owner}\n100\nAcDbEntity\n'
+                    f'{space}8\n0\n100\nAcDbBlockEnd\n')
+
+    def circle_blocks(self, blocks: List[Tuple[str, float]]):
+        """BLOCKS section with the layout blocks and one circle block per (name, radius)"""
+        f = self.fmt
+        self._begin_section('BLOCKS')
+        self._block('*Model_Space')
+        self._block('*Paper_Space', paper_space=True)
+        for name, radius in blocks:
+            owner = self._block_records[name]
+            circle = (f'0\nCIRCLE\n5\n{self._next_handle()}\n330\n{owner}\n'
+                      f'100\nAcDbEntity\n8\n0\n100\nAcDbCircle\n'
+                      f'10\n0.0\n20\n0.0\n30\n0.0\n40\n{f % radius}\n')
+            self._block(name, circle)
+
+    def begin_entities(self):
+        self._begin_section('ENTITIES')
+        self._owner = self._block_records['*Model_Space']
+
+    def _entity(self, kind: str, layer: str) -> str:
+        """Common entity prefix with a handle placeholder (%X) and model-space owner"""
+        return f'0\n{kind}\n5\n%X\n330\n{self._owner}\n100\nAcDbEntity\n8\n{layer}\n'
+
+    def circle(self, center: Tuple[float, float], radius: float, layer: str):
+        f = self.fmt
+        self._write(self._entity('CIRCLE', layer) % self._handle +
+                    f'100\nAcDbCircle\n10\n{f % center[0]}\n20\n{f % center[1]}\n'
+                    f'30\n0.0\n40\n{f % radius}\n')
+        self._handle += 1
+
+    def inserts(self, block: str, positions: np.ndarray, layer: str,
+                scales: np.ndarray = None):
+        """INSERT a block at every (x, y) position, optionally scaled"""
+        f = self.fmt
+        head = (self._entity('INSERT', layer) +
+                f'100\nAcDbBlockReference\n2\n{block}\n10\n{f}\n20\n{f}\n30\n0.0\n')
+        positions = np.asarray(positions, dtype=float).reshape(-1, 2)
+        if scales is not None:
+            head += f'41\n{f}\n42\n{f}\n'
+            scales = np.asarray(scales, dtype=float).reshape(-1, 1)
+            positions = np.hstack([positions, scales, scales])
+        for lo in range(0, len(positions), self.chunk_size):
+            chunk = positions[lo:lo + self.chunk_size]
+            self._write((head * len(chunk)) % self._with_handles(chunk))
+
+    def polylines(self, vertices: np.ndarray, starts: np.ndarray, layer: str):
+        """Write merged runs from `merge_channel_runs` as open LWPOLYLINEs"""
+        f = self.fmt
+        open_run = self._entity('LWPOLYLINE', layer) + '100\nAcDbPolyline\n90\n%d\n70\n0\n'
+        vertex = f'10\n{f}\n20\n{f}\n'
+
+        # Emit text in vertex chunks, opening runs at their first vertex
+        ends = np.concatenate([starts[1:], [len(vertices)]])
+        cuts = np.union1d(starts, ends)
+        run_lengths = dict(zip(starts.tolist(), (ends - starts).tolist()))
+        for lo in range(0, len(vertices), self.chunk_size):
+            hi = min(lo + self.chunk_size, len(vertices))
+            inner = cuts[(cuts > lo) & (cuts < hi)]
+            parts = []
+            bounds = [lo] + inner.tolist() + [hi]
+            for a, b in zip(bounds[:-1], bounds[1:]):
+                if a in run_lengths:
+                    parts.append(open_run % (self._handle, run_lengths[a]))
+                    self._handle += 1
+                piece = vertices[a:b]
+                parts.append((vertex * len(piece)) % tuple(piece.ravel().tolist()))
+            self._write(''.join(parts))
+
+    def _objects(self):
+        """Minimal OBJECTS section: root dictionary owning ACAD_GROUP"""
+        root, group = self._next_handle(), self._next_handle()
+        self._begin_section('OBJECTS')
+        self._write(f'0\nDICTIONARY\n5\n{root}\n330\n0\n100\nAcDbDictionary\n281\n1\n'
+                    f'3\nACAD_GROUP\n350\n{group}\n'
+                    f'0\nDICTIONARY\n5\n{group}\n330\n{root}\n100\nAcDbDictionary\n'
+                    f'281\n1\n')
+
+
+class StreamingSVGWriter:
+    """
+    Incremental SVG writer with aggregated path data
+
+    Channel runs are written into a few <path> elements using relative
+    line commands on a fixed-precision grid, so rounding never drifts.
+    Filenames ending in .svgz are gzip-compressed on the fly.
+    """
+
+    def __init__(self, filename: str, size_px: int, precision: int = 2,
+                 vertices_per_path: int = 200000, compress: bool = None):
+        self.filename = filename
+        self.size_px = size_px
+        self.precision = precision
+        self.vertices_per_path = vertices_per_path
+        self.compress = filename.endswith('.svgz') if compress is None else compress
+        self._file = None
+
+    def __enter__(self):
+        if self.compress:
+            import gzip
+            self._file = gzip.open(self.filename, 'wt', compresslevel=6)
+        else:
+            self._file = open(self.filename, 'w', buffering=1 << 20)
+        size = self.size_px
+        self._file.write('<?xml version="1.0" encoding="utf-8" ?>\n'
+                         f'<svg xmlns="http://www.w3.org/2000/svg" version="1.1" '
+                         f'width="{size}px" height="{size}px" '
+                         f'viewBox="0 0 {size} {size}">\n')
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self._file.write('</svg>\n')
+        self._file.close()
+        self._file = None
+
+    def _num(self, value: float) -> str:
+        return f'{value:.{self.precision}f}'
+
+    def circle(self, cx: float, cy: float, r: float, **style):
+        """Write a circle; style keywords use underscores for dashes"""
+        attrs = ''.join(f' {k.replace("_", "-")}="{v}"' for k, v in style.items())
+        self._file.write(f'<circle cx="{self._num(cx)}" cy="{self._num(cy)}" '
+                         f'r="{self._num(r)}"{attrs} />\n')
+
+    def paths(self, vertices: np.ndarray, starts: np.ndarray, **style):
+        """
+        Write polyline runs from `merge_channel_runs` as <path> elements
+
+        Args:
+            vertices: (M, 2) vertex array in SVG pixel coordinates
+            starts: Index of the first vertex of each run
+            **style: Path presentation attributes (underscores become dashes)
+        """
+        if len(vertices) == 0:
+            return
+        attrs = ''.join(f' {k.replace("_", "-")}="{v}"' for k, v in style.items())
+        scale = 10 ** self.precision
+        q = np.round(np.asarray(vertices, dtype=float) * scale).astype(np.int64)
+        num_fmt = f'%.{self.precision}f'
+        pair = f'{num_fmt} {num_fmt}'
+
+        ends = np.concatenate([starts[1:], [len(q)]])
+        path_vertices = 0
+        self._file.write(f'<path{attrs} d="')
+        for a, b in zip(starts.tolist(), ends.tolist()):
+            if path_vertices and path_vertices + (b - a) > self.vertices_per_path:
+                self._file.write(f'" />\n<path{attrs} d="')
+                path_vertices = 0
+            run = q[a:b]
+            steps = np.diff(run, axis=0) / scale
+            text = 'M' + pair % tuple((run[0] / scale).tolist())
+            if len(steps):
+                text += 'l' + ' '.join([pair] * len(steps)) % tuple(steps.ravel().tolist())
+            self._file.write(text)
+            path_vertices += b - a
+        self._file.write('" />\n')
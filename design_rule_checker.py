@@ -0,0 +1,539 @@
+#!/usr/bin/env python3
+"""
+Design Rule Checker for Fractal Heat Spreader Patterns
+Verifies channel spacing, rim clearance, overlaps and dangling ends
+before a pattern is released to the laser-etching partner
+"""
+
+import numpy as np
+import json
+from dataclasses import dataclass, asdict, field
+from pathlib import Path
+from typing import List, Tuple, Optional
+
+from array_utils import ragged_arange
+
+
+# Rules whose violations block manufacturing release
+ERROR_RULES = ('channel_spacing', 'edge_clearance')
+
+# Default minimum gap between a channel edge and the wafer rim (mm)
+EDGE_CLEARANCE_MM = 0.5
+
+
+@dataclass
+class DesignRules:
+    """
+    Manufacturing design rules (all distances edge-to-edge)
+
+    Channels may end near the rim (no dangling-end warning within one
+    width plus spacing of the clearance band) but never inside it.
+    """
+    channel_width_mm: float
+    min_channel_spacing_mm: float
+    edge_clearance_mm: float = EDGE_CLEARANCE_MM
+    island_clearance_mm: float = 0.0
+    heat_pipe_clearance_mm: float = 0.0
+    node_tolerance_mm: float = 1e-6  # endpoint merge tolerance
+    max_reported_per_rule: int = 10000  # violations listed (all are counted)
+
+    @classmethod
+    def for_spec(cls, spec, **overrides) -> 'DesignRules':
+        """Default rules for a WaferSpec: spacing equal to one channel width"""
+        width_mm = spec.channel_width_um / 1000.0
+        rules = dict(channel_width_mm=width_mm, min_channel_spacing_mm=width_mm)
+        rules.update(overrides)
+        return cls(**rules)
+
+
+@dataclass
+class Violation:
+    """Single design rule violation"""
+    rule: str
+    severity: str  # 'error' or 'warning'
+    x_mm: float
+    y_mm: float
+    measured_mm: float
+    required_mm: float
+    items: Tuple[int, ...] = ()
+
+
+@dataclass
+class DRCReport:
+    """Result of a design rule check"""
+    pattern_name: str
+    num_channels: int
+    violations: List[Violation] = field(default_factory=list)
+    totals: dict = field(default_factory=dict)
+
+    def record(self, rule: str, total: int, violations: List[Violation]):
+        """Record a rule's total violation count and the listed subset"""
+        if total:
+            self.totals[rule] = self.totals.get(rule, 0) + total
+            self.violations.extend(violations)
+
+    @property
+    def errors(self) -> List[Violation]:
+        return [v for v in self.violations if v.severity == 'error']
+
+    @property
+    def warnings(self) -> List[Violation]:
+        return [v for v in self.violations if v.severity == 'warning']
+
+    @property
+    def num_errors(self) -> int:
+        return sum(n for rule, n in self.totals.items() if rule in ERROR_RULES)
+
+    @property
+    def passed(self) -> bool:
+        return self.num_errors == 0
+
+    def counts(self) -> dict:
+        """Total number of violations per rule"""
+        return dict(self.totals)
+
+    def summary(self) -> str:
+        status = 'PASS' if self.passed else 'FAIL'
+        num_warnings = sum(self.totals.values()) - self.num_errors
+        parts = ', '.join(f"{rule}: {n}" for rule, n in sorted(self.totals.items()))
+        return (f"DRC {status} for {self.pattern_name} "
+                f"({self.num_channels} channels, {self.num_errors} errors, "
+                f"{num_warnings} warnings){' - ' + parts if parts else ''}")
+
+    def export_json(self, filename: str):
+        """Export report to JSON"""
+        data = {
+            'pattern_name': self.pattern_name,
+            'num_channels': self.num_channels,
+            'passed': self.passed,
+            'counts': self.counts(),
+            'violations': [asdict(v) for v in self.violations],
+        }
+        with open(filename, 'w') as f:
+            json.dump(data, f, indent=2)
+        print(f"DRC report exported to {filename}")
+
+
+class DesignRuleError(Exception):
+    """Raised when a pattern fails error-severity design rules"""
+
+    def __init__(self, report: DRCReport):
+        super().__init__(report.summary())
+        self.report = report
+
+
+class UniformGridIndex:
+    """
+    Uniform-grid spatial index over axis-aligned boxes
+
+    Entries are stored as (cell key, item id) pairs sorted by cell key,
+    so building is O(N log N) and candidate lookup is a binary search.
+    """
+
+    def __init__(self, cell_size_mm: float):
+        self.cell_size = cell_size_mm
+        self.keys = np.empty(0, dtype=np.int64)
+        self.ids = np.empty(0, dtype=np.int64)
+
+    def _cell_range(self, lo: np.ndarray, hi: np.ndarray):
+        return (np.floor(lo / self.cell_size).astype(np.int64),
+                np.floor(hi / self.cell_size).astype(np.int64))
+
+    @staticmethod
+    def _key(ci: np.ndarray, cj: np.ndarray) -> np.ndarray:
+        # Offset keeps keys positive for any wafer-sized coordinate range
+        return (ci + (1 << 30)) * (1 << 31) + (cj + (1 << 30))
+
+    def _expand(self, box_min: np.ndarray, box_max: np.ndarray):
+        """Expand boxes into (cell key, box index) pairs"""
+        i0, i1 = self._cell_range(box_min[:, 0], box_max[:, 0])
+        j0, j1 = self._cell_range(box_min[:, 1], box_max[:, 1])
+        ni = i1 - i0 + 1
+        nj = j1 - j0 + 1
+        counts = ni * nj
+        owner = np.repeat(np.arange(len(counts)), counts)
+        # Position of each expanded entry within its box's cell block
+        local = ragged_arange(counts)
+        ci = i0[owner] + local // nj[owner]
+        cj = j0[owner] + local % nj[owner]
+        return self._key(ci, cj), owner
+
+    def build(self, box_min: np.ndarray, box_max: np.ndarray,
+              ids: Optional[np.ndarray] = None):
+        """Index boxes given as (N, 2) min/max corner arrays"""
+        keys, owner = self._expand(box_min, box_max)
+        item_ids = owner if ids is None else np.asarray(ids)[owner]
+        order = np.argsort(keys, kind='stable')
+        self.keys = keys[order]
+        self.ids = item_ids[order]
+        return self
+
+    def self_pairs(self) -> np.ndarray:
+        """Unique (a, b) id pairs with a < b sharing at least one cell"""
+        pairs = []
+        n = len(self.keys)
+        k = 1
+        while k < n:
+            same = self.keys[k:] == self.keys[:-k]
+            if not same.any():
+                break
+            a = self.ids[:-k][same]
+            b = self.ids[k:][same]
+            pairs.append(np.stack([np.minimum(a, b), np.maximum(a, b)], axis=1))
+            k += 1
+        if not pairs:
+            return np.empty((0, 2), dtype=np.int64)
+        pairs = np.concatenate(pairs)
+        pairs = pairs[pairs[:, 0] != pairs[:, 1]]
+        return _unique_pairs(pairs)
+
+    def query_boxes(self, box_min: np.ndarray, box_max: np.ndarray) -> np.ndarray:
+        """Unique (query index, item id) pairs for boxes sharing a cell"""
+        keys, owner = self._expand(box_min, box_max)
+        lo = np.searchsorted(self.keys, keys, side='left')
+        hi = np.searchsorted(self.keys, keys, side='right')
+        counts = hi - lo
+        q = np.repeat(owner, counts)
+        pos = ragged_arange(counts)
+        items = self.ids[np.repeat(lo, counts) + pos]
+        if len(q) == 0:
+            return np.empty((0, 2), dtype=np.int64)
+        return _unique_pairs(np.stack([q, items], axis=1))
+
+
+def _unique_pairs(pairs: np.ndarray) -> np.ndarray:
+    """Row-unique integer pairs (1D key sort is much faster than axis=0)"""
+    if len(pairs) == 0:
+        return np.empty((0, 2), dtype=np.int64)
+    base = int(pairs[:, 1].max()) + 1
+    keys = _sorted_unique(pairs[:, 0].astype(np.int64) * base + pairs[:, 1])
+    return np.stack([keys // base, keys % base], axis=1)
+
+
+def _sorted_unique(keys: np.ndarray) -> np.ndarray:
+    """Sorted unique values of an integer key array"""
+    keys = np.sort(keys)
+    if len(keys) == 0:
+        return keys
+    return keys[np.concatenate([[True], keys[1:] != keys[:-1]])]
+
+
+def _contains(sorted_keys: np.ndarray, keys: np.ndarray) -> np.ndarray:
+    """Membership test against a sorted unique key array"""
+    pos = np.searchsorted(sorted_keys, keys)
+    pos = np.minimum(pos, len(sorted_keys) - 1)
+    return sorted_keys[pos] == keys
+
+
+def _point_segment_distance(p: np.ndarray, a: np.ndarray, b: np.ndarray):
+    """Distance from points p to segments a-b, with the closest segment points"""
+    ab = b - a
+    denom = np.einsum('ij,ij->i', ab, ab)
+    t = np.einsum('ij,ij->i', p - a, ab) / np.where(denom > 0, denom, 1.0)
+    t = np.clip(t, 0.0, 1.0)
+    closest = a + t[:, None] * ab
+    return np.linalg.norm(p - closest, axis=1), closest
+
+
+def _segment_segment_distance(a1, a2, b1, b2):
+    """
+    Minimum distance between segment pairs
+
+    Returns the distance, a witness midpoint, and the smallest
+    endpoint-to-other-segment distance (zero at junctions).
+    """
+    def cross(u, v):
+        return u[:, 0] * v[:, 1] - u[:, 1] * v[:, 0]
+
+    candidates = [
+        _point_segment_distance(a1, b1, b2) + (a1,),
+        _point_segment_distance(a2, b1, b2) + (a2,),
+        _point_segment_distance(b1, a1, a2) + (b1,),
+        _point_segment_distance(b2, a1, a2) + (b2,),
+    ]
+    dists = np.stack([c[0] for c in candidates], axis=1)
+    best = dists.argmin(axis=1)
+    rows = np.arange(len(a1))
+    dist = dists[rows, best]
+    endpoint_gap = dist.copy()
+    witness = np.stack([(c[1] + c[2]) / 2 for c in candidates], axis=1)[rows, best]
+
+    # Proper crossings have zero distance
+    d1 = cross(a2 - a1, b1 - a1)
+    d2 = cross(a2 - a1, b2 - a1)
+    d3 = cross(b2 - b1, a1 - b1)
+    d4 = cross(b2 - b1, a2 - b1)
+    crossing = (d1 * d2 < 0) & (d3 * d4 < 0)
+    if crossing.any():
+        t = d3[crossing] / (d3[crossing] - d4[crossing])
+        witness[crossing] = a1[crossing] + t[:, None] * (a2[crossing] - a1[crossing])
+        dist[crossing] = 0.0
+    return dist, witness, endpoint_gap
+
+
+class DesignRuleChecker:
+    """Spatially indexed design rule checker for channel patterns"""
+
+    def __init__(self, radius_mm: float, rules: DesignRules):
+        self.radius_mm = radius_mm
+        self.rules = rules
+
+    @classmethod
+    def for_generator(cls, gen, **overrides) -> 'DesignRuleChecker':
+        """Checker configured from a FractalPatternGenerator's WaferSpec"""
+        return cls(gen.radius_mm, DesignRules.for_spec(gen.spec, **overrides))
+
+    def check_generator(self, gen) -> DRCReport:
+        """Check a generator's channels, diamond islands and heat-pipe sites"""
+        return self.check(gen.channel_array(),
+                          islands=np.asarray(gen.add_diamond_islands(), dtype=float),
+                          heat_pipes=gen.heat_pipe_sites(),
+                          pattern_name=gen.spec.name)
+
+    def check(self, channels: np.ndarray,
+              islands: Optional[np.ndarray] = None,
+              heat_pipes: Optional[np.ndarray] = None,
+              pattern_name: str = 'pattern') -> DRCReport:
+        """
+        Run all design rules
+
+        Args:
+            channels: (N, 2, 2) array of channel segment endpoints (mm)
+            islands: (M, 3) array of diamond islands (x, y, radius) in mm
+            heat_pipes: (K, 3) array of heat-pipe sites (x, y, radius) in mm
+            pattern_name: Name used in the report
+        """
+        channels = np.asarray(channels, dtype=float).reshape(-1, 2, 2)
+        report = DRCReport(pattern_name, len(channels))
+        if len(channels) == 0:
+            return report
+
+        nodes, degree = self._node_graph(channels)
+
+        report.record('edge_clearance', *self._check_edge_clearance(channels))
+        report.record('dangling_end', *self._check_dangling_ends(channels, nodes, degree))
+        report.record('channel_spacing', *self._check_spacing(channels, nodes))
+
+        circle_sets = [('channel_island_overlap', islands, self.rules.island_clearance_mm),
+                       ('channel_heat_pipe_overlap', heat_pipes,
+                        self.rules.heat_pipe_clearance_mm)]
+        for rule, circles, clearance in circle_sets:
+            if circles is not None and len(circles):
+                report.record(rule, *self._check_circle_overlap(rule, channels,
+                                                                circles, clearance))
+
+        return report
+
+    def _listed(self, bad: np.ndarray) -> np.ndarray:
+        """Violation indices that get a Violation record"""
+        return bad[:self.rules.max_reported_per_rule]
+
+    def _node_graph(self, channels: np.ndarray):
+        """Merge coincident endpoints into node ids and count node degrees"""
+        tol = self.rules.node_tolerance_mm
+        quantized = np.round(channels.reshape(-1, 2) / tol).astype(np.int64)
+        quantized -= quantized.min(axis=0)
+        keys = quantized[:, 0] * (int(quantized[:, 1].max()) + 1) + quantized[:, 1]
+        _, node_ids = np.unique(keys, return_inverse=True)
+        node_ids = node_ids.reshape(-1, 2)
+        degree = np.bincount(node_ids.ravel())
+        return node_ids, degree
+
+    def _check_edge_clearance(self, channels: np.ndarray):
+        # Segments are convex, so the point farthest from the centre is an endpoint
+        required = self.rules.edge_clearance_mm
+        points = channels.reshape(-1, 2)
+        clearance = (self.radius_mm - np.hypot(points[:, 0], points[:, 1])
+                     - self.rules.channel_width_mm / 2)
+        # Endpoints clipped exactly to the limit may round just below it
+        bad = np.flatnonzero(clearance < required - self.rules.node_tolerance_mm)
+        return len(bad), [Violation('edge_clearance', 'error',
+                                    float(points[p, 0]), float(points[p, 1]),
+                                    float(clearance[p]), required, (int(p // 2),))
+                          for p in self._listed(bad)]
+
+    def _check_dangling_ends(self, channels: np.ndarray, nodes: np.ndarray,
+                             degree: np.ndarray):
+        # Free ends are allowed where the channel terminates at the rim
+        points = channels.reshape(-1, 2)
+        node_flat = nodes.ravel()
+        rim_gap = self.radius_mm - np.hypot(points[:, 0], points[:, 1])
+        free = degree[node_flat] == 1
+        interior = rim_gap > (self.rules.edge_clearance_mm
+                              + self.rules.channel_width_mm
+                              + self.rules.min_channel_spacing_mm)
+        bad = np.flatnonzero(free & interior)
+        if len(bad):
+            bad = bad[~self._on_other_channel(channels, bad)]
+        return len(bad), [Violation('dangling_end', 'warning',
+                                    float(points[p, 0]), float(points[p, 1]),
+                                    float(rim_gap[p]), 0.0, (int(p // 2),))
+                          for p in self._listed(bad)]
+
+    def _on_other_channel(self, channels: np.ndarray, endpoints: np.ndarray) -> np.ndarray:
+        """Flat endpoint indices that lie on another channel (T-junctions)"""
+        tol = self.rules.node_tolerance_mm
+        lengths = np.linalg.norm(channels[:, 1] - channels[:, 0], axis=1)
+        cell = max(float(np.median(lengths)), tol)
+        pieces, parent = self._split_segments(channels, cell)
+        index = UniformGridIndex(cell).build(np.minimum(pieces[:, 0], pieces[:, 1]) - tol,
+                                             np.maximum(pieces[:, 0], pieces[:, 1]) + tol,
+                                             ids=parent)
+        points = channels.reshape(-1, 2)[endpoints]
+        pairs = index.query_boxes(points, points)
+        pairs = pairs[pairs[:, 1] != endpoints[pairs[:, 0]] // 2]
+        dist, _ = _point_segment_distance(points[pairs[:, 0]], channels[pairs[:, 1], 0],
+                                          channels[pairs[:, 1], 1])
+        on_channel = np.zeros(len(endpoints), dtype=bool)
+        on_channel[pairs[dist <= tol, 0]] = True
+        return on_channel
+
+    def _check_spacing(self, channels: np.ndarray, nodes: np.ndarray):
+        """Minimum edge-to-edge spacing between non-adjacent channels"""
+        width = self.rules.channel_width_mm
+        threshold = width + self.rules.min_channel_spacing_mm  # centreline distance
+        pieces, parent = self._split_segments(channels, threshold)
+
+        pad = threshold / 2
+        box_min = np.minimum(pieces[:, 0], pieces[:, 1]) - pad
+        box_max = np.maximum(pieces[:, 0], pieces[:, 1]) + pad
+        index = UniformGridIndex(threshold).build(box_min, box_max, ids=parent)
+        pairs = index.self_pairs()
+        if len(pairs) == 0:
+            return 0, []
+
+        junctions = self._junction_clusters(channels, nodes, threshold)
+        pairs = pairs[~self._topologically_adjacent(pairs, junctions[nodes])]
+        if len(pairs) == 0:
+            return 0, []
+
+        a, b = pairs[:, 0], pairs[:, 1]
+        dist, witness, endpoint_gap = _segment_segment_distance(
+            channels[a, 0], channels[a, 1], channels[b, 0], channels[b, 1])
+        # T-junctions (an endpoint lying on the other channel) are connections
+        junction = endpoint_gap <= self.rules.node_tolerance_mm
+        bad = np.flatnonzero((dist < threshold) & ~junction)
+        spacing = dist - width
+        return len(bad), [Violation('channel_spacing', 'error',
+                                    float(witness[i, 0]), float(witness[i, 1]),
+                                    float(spacing[i]), self.rules.min_channel_spacing_mm,
+                                    (int(a[i]), int(b[i])))
+                          for i in self._listed(bad)]
+
+    @staticmethod
+    def _split_segments(channels: np.ndarray, max_len: float):
+        """Split long segments so every piece spans at most a few grid cells"""
+        lengths = np.linalg.norm(channels[:, 1] - channels[:, 0], axis=1)
+        parts = np.maximum(1, np.ceil(lengths / max_len).astype(np.int64))
+        parent = np.repeat(np.arange(len(channels)), parts)
+        k = ragged_arange(parts)
+        t0 = (k / parts[parent])[:, None]
+        t1 = ((k + 1) / parts[parent])[:, None]
+        start, delta = channels[parent, 0], channels[parent, 1] - channels[parent, 0]
+        pieces = np.stack([start + t0 * delta, start + t1 * delta], axis=1)
+        return pieces, parent
+
+    @staticmethod
+    def _junction_clusters(channels: np.ndarray, nodes: np.ndarray,
+                           min_length: float) -> np.ndarray:
+        """
+        Junction id per node, merging nodes joined by segments below min_length
+
+        A segment shorter than the spacing threshold is narrower than the
+        channels meeting at its ends, so both ends etch as one junction.
+        """
+        from scipy.sparse import coo_matrix
+        from scipy.sparse.csgraph import connected_components
+
+        num_nodes = int(nodes.max()) + 1
+        short = np.linalg.norm(channels[:, 1] - channels[:, 0], axis=1) < min_length
+        graph = coo_matrix((np.ones(int(short.sum())), (nodes[short, 0], nodes[short, 1])),
+                           shape=(num_nodes, num_nodes))
+        return connected_components(graph, directed=False)[1]
+
+    @staticmethod
+    def _topologically_adjacent(pairs: np.ndarray, nodes: np.ndarray) -> np.ndarray:
+        """
+        Pairs that share a junction or are joined by a single segment
+
+        Channels meeting at a junction are necessarily closer than the
+        spacing rule near that junction, so they are exempt.
+        """
+        na, nb = nodes[pairs[:, 0]], nodes[pairs[:, 1]]
+        shared = ((na[:, :1] == nb[:, :1]) | (na[:, :1] == nb[:, 1:]) |
+                  (na[:, 1:] == nb[:, :1]) | (na[:, 1:] == nb[:, 1:])).ravel()
+
+        num_nodes = int(nodes.max()) + 1
+        edge_keys = _sorted_unique(np.minimum(nodes[:, 0], nodes[:, 1]) * num_nodes +
+                                   np.maximum(nodes[:, 0], nodes[:, 1]))
+        bridged = np.zeros(len(pairs), dtype=bool)
+        for i in range(2):
+            for j in range(2):
+                u, v = na[:, i], nb[:, j]
+                keys = np.minimum(u, v) * num_nodes + np.maximum(u, v)
+                bridged |= _contains(edge_keys, keys)
+        return shared | bridged
+
+    def _check_circle_overlap(self, rule: str, channels: np.ndarray,
+                              circles: np.ndarray, clearance: float):
+        """Channels passing within clearance of circular features"""
+        circles = np.asarray(circles, dtype=float).reshape(-1, 3)
+        reach = circles[:, 2] + self.rules.channel_width_mm / 2 + clearance
+        cell = max(float(np.median(reach)) * 2, self.rules.channel_width_mm)
+
+        pieces, parent = self._split_segments(channels, cell)
+        index = UniformGridIndex(cell).build(np.minimum(pieces[:, 0], pieces[:, 1]),
+                                             np.maximum(pieces[:, 0], pieces[:, 1]),
+                                             ids=parent)
+        centres = circles[:, :2]
+        pairs = index.query_boxes(centres - reach[:, None], centres + reach[:, None])
+        if len(pairs) == 0:
+            return 0, []
+
+        c, s = pairs[:, 0], pairs[:, 1]
+        dist, _ = _point_segment_distance(centres[c], channels[s, 0], channels[s, 1])
+        gap = dist - circles[c, 2] - self.rules.channel_width_mm / 2
+        bad = np.flatnonzero(gap < clearance)
+        return len(bad), [Violation(rule, 'warning',
+                                    float(centres[c[i], 0]), float(centres[c[i], 1]),
+                                    float(gap[i]), clearance, (int(s[i]), int(c[i])))
+                          for i in self._listed(bad)]
+
+
+def withhold_release(filename: str):
+    """
+    Withhold a manufacturing file for a pattern that failed the DRC gate
+
+    A file left by an earlier run no longer matches the current pattern, so
+    it is removed rather than left next to the failing report.
+    """
+    path = Path(filename)
+    if path.exists():
+        path.unlink()
+        print(f"Removed stale {path.name}: pattern failed design rule check")
+    else:
+        print(f"{path.name} withheld: pattern failed design rule check")
+
+
+def run_drc_gate(gen, report_file: Optional[str] = None,
+                 strict: bool = True, **rule_overrides) -> DRCReport:
+    """
+    Check a generator's pattern before export
+
+    Args:
+        gen: FractalPatternGenerator with a generated pattern
+        report_file: Optional path for the JSON violation report
+        strict: Raise DesignRuleError when error-severity rules fail
+        **rule_overrides: DesignRules fields to override
+
+    Returns:
+        DRCReport for the pattern
+    """
+    checker = DesignRuleChecker.for_generator(gen, **rule_overrides)
+    report = checker.check_generator(gen)
+    print(report.summary())
+    if report_file:
+        report.export_json(report_file)
+    if strict and not report.passed:
+        raise DesignRuleError(report)
+    return report
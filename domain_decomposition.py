@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+"""
+Domain-Decomposition Parallel Solver
+Two-level additive Schwarz preconditioned conjugate gradients for the
+ThermalFEA steady-state system, with subdomain factorizations held by
+worker processes that exchange halos through shared memory
+"""
+
+import argparse
+import json
+import multiprocessing as mp
+import os
+import time
+from dataclasses import dataclass, field
+from multiprocessing import shared_memory
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+@dataclass
+class CGResult:
+    """Outcome of a preconditioned conjugate gradient solve"""
+    x: np.ndarray
+    iterations: int
+    relative_residual: float
+    converged: bool
+    residual_history: List[float] = field(default_factory=list)
+
+
+def pcg(A, b: np.ndarray, precondition: Optional[Callable] = None,
+        x0: Optional[np.ndarray] = None, rtol: float = 1e-8,
+        maxiter: Optional[int] = None) -> CGResult:
+    """
+    Preconditioned conjugate gradients for a symmetric positive definite A
+
+    Args:
+        A: Sparse matrix or anything supporting A @ x
+        b: Right-hand side
+        precondition: Callable applying M⁻¹ to a residual (identity if omitted)
+        x0: Initial guess (warm start)
+        rtol: Stop when ‖b - Ax‖ ≤ rtol·‖b‖
+        maxiter: Iteration limit (defaults to len(b))
+
+    Returns:
+        CGResult with the solution and convergence history
+    """
+    x = np.zeros_like(b) if x0 is None else np.array(x0, dtype=float)
+    maxiter = maxiter or len(b)
+    bnorm = np.linalg.norm(b) or 1.0
+    r = b - A @ x
+    res = float(np.linalg.norm(r) / bnorm)
+    history = [res]
+    if res <= rtol:
+        return CGResult(x, 0, res, True, history)
+
+    z = precondition(r) if precondition else r.copy()
+    p = z.copy()
+    rz = r @ z
+    iterations = 0
+    for iterations in range(1, maxiter + 1):
+        Ap = A @ p
+        alpha = rz / (p @ Ap)
+        x += alpha * p
+        r -= alpha * Ap
+        res = float(np.linalg.norm(r) / bnorm)
+        history.append(res)
+        if res <= rtol:
+            break
+        z = precondition(r) if precondition else r.copy()
+        rz_new = r @ z
+        p = z + (rz_new / rz) * p
+        rz = rz_new
+    return CGResult(x, iterations, res, res <= rtol, history)
+
+
+def reduced_system(K, F: np.ndarray, mask: np.ndarray,
+                   conductivity: np.ndarray) -> Tuple['object', np.ndarray, np.ndarray]:
+    """
+    Symmetric positive definite system over the nodes inside the wafer
+
+    ThermalFEA rows are k_i times a symmetric stencil plus a diagonal Robin
+    term, so scaling row i by -1/k_i gives an equivalent SPD system.
+
+    Args:
+        K, F: Output of build_stiffness_matrix / build_force_vector
+        mask: (n, n) wafer mask
+        conductivity: (n, n) conductivity map used to assemble K
+
+    Returns:
+        (A, b, nodes) where nodes are the flat grid indices of the unknowns
+    """
+    from scipy.sparse import diags
+
+    nodes = np.flatnonzero(mask.ravel())
+    scale = -1.0 / conductivity.ravel()[nodes]
+    A = diags(scale) @ K[nodes][:, nodes]
+    A = ((A + A.T) * 0.5).tocsr()  # remove rounding asymmetry
+    return A, scale * F[nodes], nodes
+
+
+def _balanced_cuts(counts: np.ndarray, parts: int) -> np.ndarray:
+    """Cut positions splitting a 1D count profile into parts of equal total"""
+    cum = np.cumsum(counts)
+    targets = cum[-1] * np.arange(1, parts) / parts
+    cuts = np.searchsorted(cum, targets) + 1
+    return np.concatenate([[0], cuts, [len(counts)]])
+
+
+def partition_grid(mask: np.ndarray, num_subdomains: int, overlap: int = 2
+                   ) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Split the masked grid into load-balanced rectangular subdomains
+
+    Columns are cut into strips with equal node counts, then each strip
+    into boxes with equal node counts.
+
+    Args:
+        mask: (n, n) wafer mask, rows along Y
+        num_subdomains: Requested number of subdomains
+        overlap: Halo width in grid cells added around each box
+
+    Returns:
+        List of (core, extended) arrays of unknown indices (positions in
+        the flat-nonzero ordering of mask); cores partition the unknowns
+    """
+    n_rows, n_cols = mask.shape
+    position = np.full(mask.size, -1, dtype=np.int64)
+    position[np.flatnonzero(mask.ravel())] = np.arange(int(mask.sum()))
+    position = position.reshape(mask.shape)
+
+    strips = max(1, int(np.sqrt(num_subdomains)))
+    while num_subdomains % strips:
+        strips -= 1
+    boxes = num_subdomains // strips
+
+    subdomains = []
+    i_cuts = _balanced_cuts(mask.sum(axis=0), strips)
+    for i0, i1 in zip(i_cuts[:-1], i_cuts[1:]):
+        if i1 <= i0:
+            continue
+        j_cuts = _balanced_cuts(mask[:, i0:i1].sum(axis=1), boxes)
+        for j0, j1 in zip(j_cuts[:-1], j_cuts[1:]):
+            core = position[j0:j1, i0:i1]
+            core = core[core >= 0]
+            if j1 <= j0 or len(core) == 0:
+                continue
+            ext = position[max(j0 - overlap, 0):min(j1 + overlap, n_rows),
+                           max(i0 - overlap, 0):min(i1 + overlap, n_cols)]
+            subdomains.append((core, ext[ext >= 0]))
+    return subdomains
+
+
+def _factorize(A_local):
+    from scipy.sparse.linalg import splu
+    return splu(A_local.tocsc())
+
+
+def _worker_loop(conn, r_name: str, z_name: str, num_unknowns: int, z_size: int,
+                 tasks: Sequence[Tuple[np.ndarray, int, 'object']]):
+    """Factor assigned subdomains, then apply local solves on request"""
+    r_shm = shared_memory.SharedMemory(name=r_name)
+    z_shm = shared_memory.SharedMemory(name=z_name)
+    r = np.ndarray((num_unknowns,), dtype=np.float64, buffer=r_shm.buf)
+    z = np.ndarray((z_size,), dtype=np.float64, buffer=z_shm.buf)
+    factors = [(ext, offset, _factorize(A_local)) for ext, offset, A_local in tasks]
+    conn.send('ready')
+    try:
+        while conn.recv() == 'apply':
+            for ext, offset, lu in factors:
+                z[offset:offset + len(ext)] = lu.solve(r[ext])
+            conn.send('done')
+    finally:
+        del r, z
+        r_shm.close()
+        z_shm.close()
+
+
+class SchwarzPreconditioner:
+    """
+    Two-level additive Schwarz preconditioner
+
+    M⁻¹ r = Σ_s R_sᵀ A_s⁻¹ R_s r + Z A₀⁻¹ Zᵀ r, with overlapping subdomain
+    solves A_s⁻¹ and a piecewise-constant coarse space Z (one column per
+    subdomain core). Subdomain factorizations live in worker processes;
+    residuals and local corrections pass through shared memory.
+    """
+
+    def __init__(self, A, mask: np.ndarray, num_subdomains: int = 16,
+                 overlap: int = 2, workers: Optional[int] = None, coarse: bool = True):
+        """
+        Args:
+            A: SPD system over the unknowns inside mask (see reduced_system)
+            mask: (n, n) wafer mask defining the unknown ordering
+            num_subdomains: Number of subdomains
+            overlap: Halo width in grid cells
+            workers: Worker processes (CPU count if omitted; 1 runs in-process)
+            coarse: Include the coarse-space correction
+        """
+        from scipy.sparse import csr_matrix
+
+        self.num_unknowns = A.shape[0]
+        subdomains = partition_grid(mask, num_subdomains, overlap)
+        self.num_subdomains = len(subdomains)
+        self.workers = max(1, min(workers or os.cpu_count() or 1, self.num_subdomains))
+
+        # Coarse space: indicator of each subdomain core
+        self.coarse_inverse = None
+        if coarse:
+            owner = np.empty(self.num_unknowns, dtype=np.int64)
+            for s, (core, _) in enumerate(subdomains):
+                owner[core] = s
+            self.owner = owner
+            Z = csr_matrix((np.ones(self.num_unknowns), (np.arange(self.num_unknowns), owner)),
+                           shape=(self.num_unknowns, self.num_subdomains))
+            self.coarse_inverse = np.linalg.inv((Z.T @ A @ Z).toarray())
+
+        # Local corrections are written to consecutive slices of one buffer
+        sizes = [len(ext) for _, ext in subdomains]
+        offsets = np.concatenate([[0], np.cumsum(sizes)])
+        self.scatter_index = np.concatenate([ext for _, ext in subdomains])
+        self.subdomain_sizes = sizes
+        tasks = [(ext, int(offsets[s]), A[ext][:, ext])
+                 for s, (_, ext) in enumerate(subdomains)]
+
+        self._processes, self._connections = [], []
+        if self.workers == 1:
+            self._local = [(ext, offset, _factorize(A_local)) for ext, offset, A_local in tasks]
+            self._r = np.empty(self.num_unknowns)
+            self._z = np.empty(int(offsets[-1]))
+            return
+
+        self._r_shm = shared_memory.SharedMemory(create=True, size=8 * self.num_unknowns)
+        self._z_shm = shared_memory.SharedMemory(create=True, size=8 * max(int(offsets[-1]), 1))
+        self._r = np.ndarray((self.num_unknowns,), dtype=np.float64, buffer=self._r_shm.buf)
+        self._z = np.ndarray((int(offsets[-1]),), dtype=np.float64, buffer=self._z_shm.buf)
+
+        # Largest subdomains first, each to the least-loaded worker
+        assignment = [[] for _ in range(self.workers)]
+        load = np.zeros(self.workers)
+        for s in np.argsort(sizes)[::-1]:
+            w = int(np.argmin(load))
+            assignment[w].append(tasks[s])
+            load[w] += sizes[s]**1.5
+
+        for worker_tasks in assignment:
+            parent, child = mp.Pipe()
+            proc = mp.Process(target=_worker_loop, daemon=True,
+                              args=(child, self._r_shm.name, self._z_shm.name,
+                                    self.num_unknowns, len(self._z), worker_tasks))
+            proc.start()
+            self._processes.append(proc)
+            self._connections.append(parent)
+        for conn in self._connections:
+            conn.recv()
+
+    def __call__(self, r: np.ndarray) -> np.ndarray:
+        self._r[:] = r
+        if self._processes:
+            for conn in self._connections:
+                conn.send('apply')
+            for conn in self._connections:
+                conn.recv()
+        else:
+            for ext, offset, lu in self._local:
+                self._z[offset:offset + len(ext)] = lu.solve(self._r[ext])
+        z = np.bincount(self.scatter_index, weights=self._z, minlength=self.num_unknowns)
+        if self.coarse_inverse is not None:
+            coarse_r = np.bincount(self.owner, weights=r, minlength=self.num_subdomains)
+            z += (self.coarse_inverse @ coarse_r)[self.owner]
+        return z
+
+    def close(self):
+        """Stop workers and release shared memory"""
+        for conn in self._connections:
+            conn.send('stop')
+        for proc in self._processes:
+            proc.join()
+        if self._processes:
+            del self._r, self._z
+            for shm in (self._r_shm, self._z_shm):
+                shm.close()
+                shm.unlink()
+        self._processes, self._connections = [], []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def solve_schwarz(fea, K, F: np.ndarray, num_subdomains: int = 16, overlap: int = 2,
+                  workers: Optional[int] = None, rtol: float = 1e-8,
+                  maxiter: Optional[int] = None) -> np.ndarray:
+    """
+    Solve a ThermalFEA steady-state system with Schwarz-preconditioned CG
+
+    Args:
+        fea: ThermalFEA instance that assembled K and F
+        K, F: Stiffness matrix and force vector
+        num_subdomains: Number of subdomains
+        overlap: Halo width in grid cells
+        workers: Worker processes (CPU count if omitted)
+        rtol: Relative residual tolerance
+        maxiter: CG iteration limit
+
+    Returns:
+        Full-grid temperature vector (outside nodes at ambient)
+    """
+    A, b, nodes = reduced_system(K, F, fea.mask, fea.conductivity_map)
+    instrumentation = fea.instrumentation
+    with instrumentation.phase('factorization', method='schwarz'):
+        M = SchwarzPreconditioner(A, fea.mask, num_subdomains, overlap, workers)
+        instrumentation.annotate(subdomains=M.num_subdomains, workers=M.workers,
+                                 overlap=overlap)
+    try:
+        with instrumentation.phase('solve', method='schwarz-pcg'):
+            result = pcg(A, b, M, rtol=rtol, maxiter=maxiter)
+            instrumentation.annotate(iterations=result.iterations,
+                                     relative_residual=result.relative_residual)
+    finally:
+        M.close()
+    if not result.converged:
+        print(f"Warning: CG stopped after {result.iterations} iterations "
+              f"at relative residual {result.relative_residual:.2e}")
+    else:
+        print(f"CG converged in {result.iterations} iterations "
+              f"({M.num_subdomains} subdomains, {M.workers} workers)")
+
+    T = np.full(fea.num_nodes, fea.ambient_temp, dtype=float)
+    T[nodes] = result.x
+    return T
+
+
+def strong_scaling(fea, worker_counts: Sequence[int], num_subdomains: int = 64,
+                   overlap: int = 2, rtol: float = 1e-8) -> List[Dict]:
+    """
+    Time preconditioner setup and solve at fixed problem size
+
+    The subdomain count is held fixed so every run performs the same
+    arithmetic and iteration count; only the worker count varies.
+
+    Returns:
+        One row per worker count with setup/solve times, speedup and
+        parallel efficiency relative to the first entry
+    """
+    K = fea.build_stiffness_matrix()
+    F = fea.build_force_vector()
+    A, b, _ = reduced_system(K, F, fea.mask, fea.conductivity_map)
+
+    rows = []
+    for workers in worker_counts:
+        start = time.perf_counter()
+        M = SchwarzPreconditioner(A, fea.mask, num_subdomains, overlap, workers)
+        setup_s = time.perf_counter() - start
+        try:
+            start = time.perf_counter()
+            result = pcg(A, b, M, rtol=rtol)
+            solve_s = time.perf_counter() - start
+        finally:
+            M.close()
+        rows.append({'workers': M.workers, 'unknowns': A.shape[0],
+                     'subdomains': M.num_subdomains, 'iterations': result.iterations,
+                     'setup_s': setup_s, 'solve_s': solve_s,
+                     'total_s': setup_s + solve_s})
+
+    base = rows[0]['total_s'] * rows[0]['workers']
+    for row in rows:
+        row['speedup'] = rows[0]['total_s'] / row['total_s']
+        row['efficiency'] = base / (row['total_s'] * row['workers'])
+    return rows
+
+
+def main(argv=None):
+    from thermal_fea_simulator import ThermalFEA
+
+    parser = argparse.ArgumentParser(description='Strong-scaling study of the Schwarz solver')
+    parser.add_argument('--diameter', type=float, default=450.0)
+    parser.add_argument('--resolution', type=int, default=1000,
+                        help='Mesh points per diameter (≈0.785·resolution² unknowns)')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--subdomains', type=int, default=64)
+    parser.add_argument('--overlap', type=int, default=2)
+    parser.add_argument('--rtol', type=float, default=1e-8)
+    parser.add_argument('--pattern', help='Optional .json or .twp pattern file')
+    parser.add_argument('--output', default='strong_scaling.json')
+    args = parser.parse_args(argv)
+
+    fea = ThermalFEA(args.diameter, resolution=args.resolution)
+    if args.pattern and args.pattern.endswith('.twp'):
+        fea.load_pattern_from_binary(args.pattern)
+    elif args.pattern:
+        fea.load_pattern_from_json(args.pattern)
+    fea.add_heat_source(0.0, 0.0, 1000.0)
+    fea.set_boundary_conditions(25.0, 'liquid')
+
+    rows = strong_scaling(fea, args.workers, args.subdomains, args.overlap, args.rtol)
+    print(f"\n{'workers':>8} {'setup':>9} {'solve':>9} {'iters':>6} {'speedup':>8} {'eff':>6}")
+    for row in rows:
+        print(f"{row['workers']:>8} {row['setup_s']:8.2f}s {row['solve_s']:8.2f}s "
+              f"{row['iterations']:>6} {row['speedup']:7.2f}x {row['efficiency']:6.0%}")
+
+    with open(args.output, 'w') as f:
+        json.dump({'resolution': args.resolution, 'diameter_mm': args.diameter,
+                   'cpu_count': os.cpu_count(), 'results': rows}, f, indent=2)
+    print(f"Scaling results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Fast Headless Rendering for Patterns and Thermal Results
+Draws straight onto Agg canvases with collections and images instead of
+per-channel artists and contour passes, optionally across worker processes
+"""
+
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+def _new_figure(figsize: Tuple[float, float]):
+    """Figure bound to an Agg canvas without touching pyplot state"""
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    return fig
+
+
+def downsample(field: np.ndarray, target_px: Optional[int]) -> Tuple[np.ndarray, int]:
+    """
+    Block-average a 2D field so neither axis exceeds target_px pixels
+
+    NaN cells (outside the wafer) are ignored within a block.
+    Returns the reduced field and the block factor.
+    """
+    n = max(field.shape)
+    if not target_px or n <= target_px:
+        return field, 1
+    factor = int(np.ceil(n / target_px))
+    rows = -(-field.shape[0] // factor) * factor
+    cols = -(-field.shape[1] // factor) * factor
+    padded = np.full((rows, cols), np.nan)
+    padded[:field.shape[0], :field.shape[1]] = field
+    blocks = padded.reshape(rows // factor, factor, cols // factor, factor)
+    valid = np.isfinite(blocks)
+    counts = valid.sum(axis=(1, 3))
+    sums = np.where(valid, blocks, 0.0).sum(axis=(1, 3))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(counts > 0, sums / counts, np.nan), factor
+
+
+def _channel_collection(channels, **kwargs):
+    from matplotlib.collections import LineCollection
+    segments = np.asarray(channels, dtype=float).reshape(-1, 2, 2)
+    return LineCollection(segments, **kwargs)
+
+
+def _circle_collection(circles, **kwargs):
+    from matplotlib.collections import EllipseCollection
+    circles = np.asarray(circles, dtype=float).reshape(-1, 3)
+    diameters = 2 * circles[:, 2]
+    return EllipseCollection(diameters, diameters, np.zeros(len(circles)),
+                             units='xy', offsets=circles[:, :2], **kwargs)
+
+
+def _wafer_axes(ax, radius_mm: float, margin: float = 1.0):
+    ax.set_xlim(-radius_mm * margin, radius_mm * margin)
+    ax.set_ylim(-radius_mm * margin, radius_mm * margin)
+    ax.set_aspect('equal')
+    ax.set_xlabel('X (mm)')
+    ax.set_ylabel('Y (mm)')
+    ax.grid(True, alpha=0.3)
+
+
+def render_pattern(filename: str, radius_mm: float, channels,
+                   diamond_islands=(), hot_spots=(), title: str = '',
+                   dpi: int = 100):
+    """
+    Render a channel pattern preview
+
+    Args:
+        filename: Output image path
+        radius_mm: Wafer radius
+        channels: (N, 2, 2) channel segments in mm
+        diamond_islands: Sequence of (x, y, radius) in mm
+        hot_spots: Sequence of (x, y, intensity W/cm²)
+        title: Plot title
+        dpi: Output resolution
+    """
+    from matplotlib.patches import Circle
+
+    fig = _new_figure((12, 12))
+    ax = fig.add_subplot()
+    ax.add_patch(Circle((0, 0), radius_mm, fill=False, edgecolor='black', linewidth=2))
+    ax.add_collection(_channel_collection(channels, colors='b', linewidths=0.5,
+                                          alpha=0.6))
+    if len(diamond_islands):
+        ax.add_collection(_circle_collection(diamond_islands, facecolors='orange',
+                                             edgecolors='darkorange', linewidths=1,
+                                             alpha=0.5, offset_transform=ax.transData))
+    hot = np.asarray(hot_spots, dtype=float).reshape(-1, 3)
+    if len(hot):
+        scatter = ax.scatter(hot[:, 0], hot[:, 1], c=hot[:, 2], cmap='hot',
+                             s=200, alpha=0.7, edgecolor='red', linewidth=2)
+        fig.colorbar(scatter, ax=ax, label='Power Density (W/cm²)')
+    _wafer_axes(ax, radius_mm, margin=1.1)
+    ax.set_title(title)
+    fig.savefig(filename, dpi=dpi, bbox_inches='tight')
+
+
+def render_thermal(filename: str, temperature: np.ndarray, mask: np.ndarray,
+                   radius_mm: float, spacing_mm: float, channels=(),
+                   diamond_islands=(), dpi: int = 100,
+                   target_px: Optional[int] = None):
+    """
+    Render temperature and physical gradient magnitude side by side
+
+    Args:
+        filename: Output image path
+        temperature: (n, n) temperature field in °C, rows along Y
+        mask: (n, n) boolean wafer mask
+        radius_mm: Wafer radius
+        spacing_mm: Grid spacing used for the gradient (°C/mm)
+        channels: Channel segments to overlay
+        diamond_islands: Sequence of (x, y, radius) to overlay
+        dpi: Output resolution
+        target_px: Downsample fields to at most this many pixels per axis
+    """
+    temp = np.where(mask, temperature, np.nan)
+    grad_y, grad_x = np.gradient(temp, spacing_mm)
+    grad_mag = np.hypot(grad_x, grad_y)
+
+    temp_img, _ = downsample(temp, target_px)
+    grad_img, _ = downsample(grad_mag, target_px)
+    half = spacing_mm / 2
+    extent = (-radius_mm - half, radius_mm + half, -radius_mm - half, radius_mm + half)
+
+    fig = _new_figure((16, 7))
+    axes = fig.subplots(1, 2)
+
+    ax = axes[0]
+    im = ax.imshow(temp_img, origin='lower', extent=extent, cmap='hot',
+                   interpolation='nearest')
+    fig.colorbar(im, ax=ax, label='Temperature (°C)')
+    if len(channels):
+        ax.add_collection(_channel_collection(channels, colors='c', linewidths=0.3,
+                                              alpha=0.3))
+    if len(diamond_islands):
+        ax.add_collection(_circle_collection(diamond_islands, facecolors='none',
+                                             edgecolors='cyan', linewidths=1,
+                                             alpha=0.5, offset_transform=ax.transData))
+    _wafer_axes(ax, radius_mm)
+    ax.set_title('Temperature Distribution')
+
+    ax = axes[1]
+    im = ax.imshow(grad_img, origin='lower', extent=extent, cmap='viridis',
+                   interpolation='nearest')
+    fig.colorbar(im, ax=ax, label='Thermal Gradient (°C/mm)')
+    _wafer_axes(ax, radius_mm)
+    ax.set_title('Thermal Gradient Magnitude')
+
+    fig.tight_layout()
+    fig.savefig(filename, dpi=dpi, bbox_inches='tight')
+
+
+RENDERERS = {
+    'pattern': render_pattern,
+    'thermal': render_thermal,
+}
+
+
+def _run_job(job: Tuple[str, Dict]) -> str:
+    kind, kwargs = job
+    RENDERERS[kind](**kwargs)
+    return kwargs['filename']
+
+
+def _init_worker():
+    import matplotlib
+    matplotlib.use('Agg')
+
+
+def render_batch(jobs: Sequence[Tuple[str, Dict]], workers: Optional[int] = None
+                 ) -> List[str]:
+    """
+    Render many (kind, kwargs) jobs in parallel worker processes
+
+    Jobs come from FractalPatternGenerator.render_job or ThermalFEA.render_job.
+    Workers use the Agg backend; with workers=1 jobs run in-process.
+
+    Returns:
+        Output filenames in job order
+    """
+    if workers == 1:
+        return [_run_job(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        return list(pool.map(_run_job, jobs))
@@ -6,15 +6,28 @@ Optimized for space solar, AI compute, and quantum computing applications
 """
 
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.patches import Circle
-from scipy.spatial import Voronoi
 import json
+import importlib
 from dataclasses import dataclass, asdict
 from typing import List, Tuple
-import svgwrite
 from pathlib import Path
 
+from design_rule_checker import EDGE_CLEARANCE_MM, withhold_release
+from instrumentation import Instrumentation, instrumented
+
+# matplotlib, scipy, svgwrite and ezdxf are imported by the methods that
+# need them, so pattern generation and binary/JSON export stay lightweight.
+
+
+def _require(module: str, feature: str, alternative: str = ''):
+    """Import an optional dependency or fail with an actionable message"""
+    try:
+        return importlib.import_module(module)
+    except ImportError as exc:
+        hint = f" or {alternative}" if alternative else ''
+        raise ImportError(f"{feature} requires the '{module}' package; "
+                          f"install it with `pip install {module}`{hint}") from exc
+
 
 @dataclass
 class WaferSpec:
@@ -63,7 +76,9 @@ QUANTUM_VARIANT = WaferSpec(
 class FractalPatternGenerator:
     """Generate optimized fractal heat spreader patterns"""
     
-    def __init__(self, spec: WaferSpec, resolution: int = 2000):
+    def __init__(self, spec: WaferSpec, resolution: int = 2000,
+                 instrumentation: Instrumentation = None):
+        self.instrumentation = instrumentation or Instrumentation('FractalPatternGenerator')
         self.spec = spec
         self.resolution = resolution
         self.radius_mm = spec.diameter_mm / 2.0
@@ -71,10 +86,16 @@ class FractalPatternGenerator:
         self.hot_spots = []
         self.channels = []
         
+    @property
+    def channel_radius_mm(self) -> float:
+        """Largest channel centreline radius that keeps the DRC rim clearance"""
+        return self.radius_mm - EDGE_CLEARANCE_MM - self.spec.channel_width_um / 2000.0
+    
     def add_hot_spot(self, x_mm: float, y_mm: float, intensity: float):
         """Add a heat source location with intensity (W/cm²)"""
         self.hot_spots.append((x_mm, y_mm, intensity))
         
+    @instrumented('generate', pattern='voronoi')
     def generate_voronoi_fractal(self, num_points: int = 500, 
                                   iterations: int = 3) -> np.ndarray:
         """
@@ -105,6 +126,7 @@ class FractalPatternGenerator:
         points = np.array(points)
         
         # Generate Voronoi diagram
+        from scipy.spatial import Voronoi
         vor = Voronoi(points)
         
         # Extract channel network from Voronoi edges
@@ -115,14 +137,16 @@ class FractalPatternGenerator:
                 p1 = vor.vertices[v1]
                 p2 = vor.vertices[v2]
                 
-                # Check if both points within wafer
-                if (np.sqrt(p1[0]**2 + p1[1]**2) <= self.radius_mm and
-                    np.sqrt(p2[0]**2 + p2[1]**2) <= self.radius_mm):
+                # Check if both points clear the wafer rim
+                if (np.sqrt(p1[0]**2 + p1[1]**2) <= self.channel_radius_mm and
+                    np.sqrt(p2[0]**2 + p2[1]**2) <= self.channel_radius_mm):
                     channels.append((tuple(p1), tuple(p2)))
         
         self.channels = channels
+        self.instrumentation.annotate(channels=len(channels))
         return channels
     
+    @instrumented('generate', pattern='hilbert')
     def generate_hilbert_fractal(self, order: int = 5) -> List[Tuple]:
         """
         Generate Hilbert curve fractal pattern
@@ -199,13 +223,15 @@ class FractalPatternGenerator:
         for i in range(len(path) - 1):
             p1 = tuple(path[i])
             p2 = tuple(path[i + 1])
-            if (np.sqrt(p1[0]**2 + p1[1]**2) <= self.radius_mm and
-                np.sqrt(p2[0]**2 + p2[1]**2) <= self.radius_mm):
+            if (np.sqrt(p1[0]**2 + p1[1]**2) <= self.channel_radius_mm and
+                np.sqrt(p2[0]**2 + p2[1]**2) <= self.channel_radius_mm):
                 channels.append((p1, p2))
         
         self.channels = channels
+        self.instrumentation.annotate(channels=len(channels))
         return channels
     
+    @instrumented('generate', pattern='radial')
     def generate_radial_fractal(self, num_primary: int = 16, 
                                branch_factor: int = 3) -> List[Tuple]:
         """
@@ -213,13 +239,14 @@ class FractalPatternGenerator:
         Optimal for centralized heat sources
         """
         channels = []
+        rim = self.channel_radius_mm
         
-        # Primary radial channels
+        # Primary radial channels, ending at the rim clearance
         for i in range(num_primary):
             angle = 2 * np.pi * i / num_primary
             x1, y1 = 0.0, 0.0
-            x2 = self.radius_mm * np.cos(angle)
-            y2 = self.radius_mm * np.sin(angle)
+            x2 = rim * np.cos(angle)
+            y2 = rim * np.sin(angle)
             channels.append(((x1, y1), (x2, y2)))
             
             # Add branching
@@ -227,18 +254,20 @@ class FractalPatternGenerator:
                 branch_x = r * self.radius_mm * np.cos(angle)
                 branch_y = r * self.radius_mm * np.sin(angle)
                 
-                # Branch to adjacent primary channels
+                # Branch to adjacent primary channels, clipped to the rim clearance
                 next_angle = 2 * np.pi * (i + 0.5) / num_primary
-                branch_end_x = (r + 0.1) * self.radius_mm * np.cos(next_angle)
-                branch_end_y = (r + 0.1) * self.radius_mm * np.sin(next_angle)
+                branch_end_r = min((r + 0.1) * self.radius_mm, rim)
+                branch_end_x = branch_end_r * np.cos(next_angle)
+                branch_end_y = branch_end_r * np.sin(next_angle)
                 
-                if np.sqrt(branch_end_x**2 + branch_end_y**2) <= self.radius_mm:
-                    channels.append(((branch_x, branch_y), 
-                                   (branch_end_x, branch_end_y)))
+                channels.append(((branch_x, branch_y), 
+                               (branch_end_x, branch_end_y)))
         
         self.channels = channels
+        self.instrumentation.annotate(channels=len(channels))
         return channels
     
+    @instrumented('island_placement')
     def add_diamond_islands(self, num_islands: int = 20) -> List[Tuple]:
         """
         Generate positions for CVD diamond islands at predicted hot spots
@@ -266,16 +295,40 @@ class FractalPatternGenerator:
         
         return islands
     
-    def export_dxf(self, filename: str):
-        """Export pattern to DXF format for CAM"""
-        try:
-            import ezdxf
-        except ImportError:
-            print("ezdxf not installed. Installing...")
-            import subprocess
-            subprocess.run(['pip', 'install', 'ezdxf', '--break-system-packages'], 
-                         check=True)
-            import ezdxf
+    def channel_array(self) -> np.ndarray:
+        """Channel endpoints as an (N, 2, 2) float array in mm"""
+        return np.asarray(self.channels, dtype=float).reshape(-1, 2, 2)
+    
+    def heat_pipe_sites(self, pitch_mm: float = 5.0,
+                        pipe_radius_mm: float = 0.25) -> np.ndarray:
+        """
+        Heat pipe grid locations inside the wafer
+        Returns (K, 3) array of (x, y, radius_mm)
+        """
+        num_pipes = int(self.spec.diameter_mm / pitch_mm)
+        offsets = (np.arange(num_pipes) - num_pipes / 2) * pitch_mm
+        x, y = np.meshgrid(offsets, offsets, indexing='ij')
+        inside = np.sqrt(x**2 + y**2) <= self.radius_mm
+        return np.column_stack([x[inside], y[inside],
+                                np.full(inside.sum(), pipe_radius_mm)])
+    
+    @instrumented('export', format='dxf')
+    def export_dxf(self, filename: str, streaming: bool = False):
+        """
+        Export pattern to DXF format for CAM
+        
+        Args:
+            filename: Output DXF path
+            streaming: Stream an R2000 file to disk with heat pipes and diamond
+                       islands as BLOCK/INSERT and channels merged into
+                       polylines (bounded memory, no ezdxf needed)
+        """
+        if streaming:
+            self._export_dxf_streaming(filename)
+            return
+        
+        ezdxf = _require('ezdxf', 'DXF export',
+                         'use export_dxf(..., streaming=True)')
         
         doc = ezdxf.new('R2010')
         msp = doc.modelspace()
@@ -293,23 +346,58 @@ class FractalPatternGenerator:
             msp.add_circle((x, y), r, dxfattribs={'layer': 'DIAMOND_ISLANDS'})
         
         # Add heat pipe locations
-        num_pipes = int(self.spec.diameter_mm / 5)  # Every 5mm
-        for i in range(num_pipes):
-            for j in range(num_pipes):
-                x = (i - num_pipes/2) * 5
-                y = (j - num_pipes/2) * 5
-                if np.sqrt(x**2 + y**2) <= self.radius_mm:
-                    msp.add_circle((x, y), 0.25, 
-                                 dxfattribs={'layer': 'HEAT_PIPES'})
+        for x, y, r in self.heat_pipe_sites():  # Every 5mm
+            msp.add_circle((x, y), r, dxfattribs={'layer': 'HEAT_PIPES'})
         
         doc.saveas(filename)
         print(f"DXF exported to {filename}")
     
-    def export_svg(self, filename: str):
-        """Export pattern to SVG for visualization"""
+    def _export_dxf_streaming(self, filename: str):
+        """Streaming DXF export (see export_dxf)"""
+        from cad_writers import StreamingDXFWriter, merge_channel_runs
+        
+        islands = np.asarray(self.add_diamond_islands(), dtype=float).reshape(-1, 3)
+        pipes = self.heat_pipe_sites()
+        pipe_radius = float(pipes[0, 2]) if len(pipes) else 0.25
+        vertices, starts = merge_channel_runs(self.channel_array())
+        
+        extent = self.radius_mm
+        with StreamingDXFWriter(filename) as dxf:
+            dxf.header((-extent, -extent), (extent, extent))
+            blocks = [('HEAT_PIPE', pipe_radius), ('DIAMOND_ISLAND', 1.0)]
+            dxf.tables([('WAFER_OUTLINE', 7), ('CHANNELS', 5),
+                        ('DIAMOND_ISLANDS', 30), ('HEAT_PIPES', 1)],
+                       [name for name, _ in blocks])
+            dxf.circle_blocks(blocks)
+            dxf.begin_entities()
+            dxf.circle((0.0, 0.0), self.radius_mm, 'WAFER_OUTLINE')
+            dxf.polylines(vertices, starts, 'CHANNELS')
+            dxf.inserts('DIAMOND_ISLAND', islands[:, :2], 'DIAMOND_ISLANDS',
+                        scales=islands[:, 2])
+            dxf.inserts('HEAT_PIPE', pipes[:, :2], 'HEAT_PIPES')
+        
+        print(f"DXF exported to {filename} ({len(starts)} channel runs, "
+              f"{len(pipes)} heat pipe inserts)")
+    
+    @instrumented('export', format='svg')
+    def export_svg(self, filename: str, compact: bool = False, precision: int = 2):
+        """
+        Export pattern to SVG for visualization
+        
+        Args:
+            filename: Output path; a .svgz suffix writes gzip-compressed SVG
+            compact: Stream channels as a few aggregated <path> elements
+            precision: Decimal places for compact path coordinates (pixels)
+        """
+        if compact or filename.endswith('.svgz'):
+            self._export_svg_compact(filename, precision)
+            return
+        
         width = int(self.spec.diameter_mm * 10)
         height = width
         
+        svgwrite = _require('svgwrite', 'SVG export',
+                            'use export_svg(..., compact=True)')
         dwg = svgwrite.Drawing(filename, size=(f'{width}px', f'{height}px'), 
                               profile='tiny')
         
@@ -349,6 +437,32 @@ class FractalPatternGenerator:
         dwg.save()
         print(f"SVG exported to {filename}")
     
+    def _export_svg_compact(self, filename: str, precision: int):
+        """Compact streaming SVG export (see export_svg)"""
+        from cad_writers import StreamingSVGWriter, merge_channel_runs
+        
+        width = int(self.spec.diameter_mm * 10)
+        offset = width / 2
+        
+        vertices, starts = merge_channel_runs(self.channel_array())
+        vertices = np.column_stack([vertices[:, 0] * 10 + offset,
+                                    -vertices[:, 1] * 10 + offset])
+        
+        with StreamingSVGWriter(filename, width, precision) as svg:
+            svg.circle(offset, offset, self.radius_mm * 10,
+                       fill='lightgray', stroke='black', stroke_width=2)
+            svg.paths(vertices, starts, fill='none', stroke='blue', stroke_width=1)
+            for x, y, r in self.add_diamond_islands():
+                svg.circle(x * 10 + offset, -y * 10 + offset, r * 10,
+                           fill='orange', fill_opacity=0.5,
+                           stroke='darkorange', stroke_width=1)
+            for x, y, intensity in self.hot_spots:
+                svg.circle(x * 10 + offset, -y * 10 + offset, 30,
+                           fill='red', fill_opacity=0.7)
+        
+        print(f"SVG exported to {filename}")
+    
+    @instrumented('export', format='json')
     def export_json(self, filename: str):
         """Export pattern data to JSON"""
         data = {
@@ -356,15 +470,7 @@ class FractalPatternGenerator:
             'channels': [[list(p1), list(p2)] for p1, p2 in self.channels],
             'diamond_islands': [(float(x), float(y), float(r)) for x, y, r in self.add_diamond_islands()],
             'hot_spots': self.hot_spots,
-            'metadata': {
-                'num_channels': len(self.channels),
-                'total_channel_length_mm': float(sum(
-                    np.sqrt((p2[0]-p1[0])**2 + (p2[1]-p1[1])**2) 
-                    for p1, p2 in self.channels
-                )),
-                'channel_width_um': self.spec.channel_width_um,
-                'channel_depth_um': self.spec.channel_depth_um
-            }
+            'metadata': self._pattern_metadata()
         }
         
         with open(filename, 'w') as f:
@@ -372,8 +478,65 @@ class FractalPatternGenerator:
         
         print(f"JSON data exported to {filename}")
     
-    def visualize(self, filename: str = None):
-        """Create visualization plot"""
+    @instrumented('export', format='binary')
+    def export_binary(self, filename: str):
+        """
+        Export pattern data to the binary columnar format
+        Memory-mappable alternative to export_json for FEA input
+        """
+        from pattern_format import write_pattern
+        
+        write_pattern(filename, self.channel_array(),
+                      diamond_islands=self.add_diamond_islands(),
+                      hot_spots=self.hot_spots,
+                      wafer_spec=asdict(self.spec),
+                      metadata=self._pattern_metadata())
+        
+        print(f"Binary pattern exported to {filename}")
+    
+    def _pattern_metadata(self) -> dict:
+        """Summary metadata shared by the JSON and binary exporters"""
+        channels = self.channel_array()
+        return {
+            'num_channels': len(channels),
+            'total_channel_length_mm': float(
+                np.linalg.norm(channels[:, 1] - channels[:, 0], axis=1).sum()),
+            'channel_width_um': self.spec.channel_width_um,
+            'channel_depth_um': self.spec.channel_depth_um
+        }
+    
+    def render_job(self, filename: str, dpi: int = 100):
+        """Picklable fast-render job for fast_render.render_batch"""
+        return ('pattern', dict(
+            filename=filename, radius_mm=self.radius_mm,
+            channels=self.channel_array(),
+            diamond_islands=np.asarray(self.add_diamond_islands(), dtype=float),
+            hot_spots=np.asarray(self.hot_spots, dtype=float).reshape(-1, 3),
+            title=f'{self.spec.name} Thermal Management Wafer\n'
+                  f'Fractal Heat Spreader Pattern',
+            dpi=dpi))
+    
+    @instrumented('export', format='image')
+    def visualize(self, filename: str = None, fast: bool = False, dpi: int = 300):
+        """
+        Create visualization plot
+        
+        Args:
+            filename: Output image path (shows interactively if omitted)
+            fast: Headless Agg rendering with a single LineCollection
+            dpi: Output resolution
+        """
+        if fast:
+            if filename is None:
+                raise ValueError("fast rendering requires an output filename")
+            from fast_render import render_batch
+            render_batch([self.render_job(filename, dpi)], workers=1)
+            print(f"Visualization saved to {filename}")
+            return
+        
+        import matplotlib.pyplot as plt
+        from matplotlib.patches import Circle
+        
         fig, ax = plt.subplots(figsize=(12, 12))
         
         # Wafer outline
@@ -413,7 +576,7 @@ class FractalPatternGenerator:
                     f'Fractal Heat Spreader Pattern')
         
         if filename:
-            plt.savefig(filename, dpi=300, bbox_inches='tight')
+            plt.savefig(filename, dpi=dpi, bbox_inches='tight')
             print(f"Visualization saved to {filename}")
         else:
             plt.show()
@@ -421,9 +584,45 @@ class FractalPatternGenerator:
         plt.close()
 
 
-def generate_all_variants():
-    """Generate optimized patterns for all three variants"""
-    output_dir = Path('/home/claude/thermal_wafer_project/cad_models')
+def default_hot_spots(spec: WaferSpec) -> List[Tuple[float, float, float]]:
+    """Reference hot spot layout (x, y, W/cm²) for a built-in variant"""
+    hot_spots = []
+    if spec.name == "Space Solar":
+        # Distributed solar cell hot spots
+        for i in range(12):
+            angle = 2 * np.pi * i / 12
+            r = spec.diameter_mm / 2 * 0.7
+            hot_spots.append((r * np.cos(angle), r * np.sin(angle), 50.0))
+    
+    elif spec.name == "AI Compute":
+        # Central processing core with high-density hot spots
+        hot_spots.append((0, 0, 500.0))
+        for i in range(8):
+            angle = 2 * np.pi * i / 8
+            r = 30
+            hot_spots.append((r * np.cos(angle), r * np.sin(angle), 300.0))
+    
+    elif spec.name == "Quantum":
+        # Precision qubit array hot spots
+        for i in range(-3, 4):
+            for j in range(-3, 4):
+                if i**2 + j**2 <= 9:
+                    hot_spots.append((i * 15, j * 15, 10.0))
+    
+    return hot_spots
+
+
+def generate_all_variants(drc_gate: bool = True, output_dir: str = '.'):
+    """
+    Generate optimized patterns for all three variants
+    
+    Args:
+        drc_gate: Run the design rule checker and withhold the DXF
+                  (manufacturing) export for patterns with DRC errors
+        output_dir: Directory for the generated files
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
     
     variants = [
         (SPACE_VARIANT, 'voronoi'),
@@ -439,31 +638,8 @@ def generate_all_variants():
         gen = FractalPatternGenerator(spec)
         
         # Add hot spots based on variant
-        if spec.name == "Space Solar":
-            # Distributed solar cell hot spots
-            for i in range(12):
-                angle = 2 * np.pi * i / 12
-                r = spec.diameter_mm / 2 * 0.7
-                x = r * np.cos(angle)
-                y = r * np.sin(angle)
-                gen.add_hot_spot(x, y, 50.0)
-        
-        elif spec.name == "AI Compute":
-            # Central processing core with high-density hot spots
-            gen.add_hot_spot(0, 0, 500.0)
-            for i in range(8):
-                angle = 2 * np.pi * i / 8
-                r = 30
-                x = r * np.cos(angle)
-                y = r * np.sin(angle)
-                gen.add_hot_spot(x, y, 300.0)
-        
-        elif spec.name == "Quantum":
-            # Precision qubit array hot spots
-            for i in range(-3, 4):
-                for j in range(-3, 4):
-                    if i**2 + j**2 <= 9:
-                        gen.add_hot_spot(i * 15, j * 15, 10.0)
+        for x, y, intensity in default_hot_spots(spec):
+            gen.add_hot_spot(x, y, intensity)
         
         # Generate pattern
         if pattern_type == 'voronoi':
@@ -475,30 +651,36 @@ def generate_all_variants():
         
         # Export all formats
         base_name = spec.name.lower().replace(' ', '_')
-        gen.export_dxf(str(output_dir / f'{base_name}_pattern.dxf'))
+        
+        # Design rule gate before the CAM file is released
+        release_dxf = True
+        if drc_gate:
+            from design_rule_checker import run_drc_gate
+            report = run_drc_gate(gen, str(output_dir / f'{base_name}_drc.json'),
+                                  strict=False)
+            release_dxf = report.passed
+        
+        if release_dxf:
+            gen.export_dxf(str(output_dir / f'{base_name}_pattern.dxf'))
+        else:
+            withhold_release(str(output_dir / f'{base_name}_pattern.dxf'))
         gen.export_svg(str(output_dir / f'{base_name}_pattern.svg'))
         gen.export_json(str(output_dir / f'{base_name}_pattern.json'))
+        gen.export_binary(str(output_dir / f'{base_name}_pattern.twp'))
         gen.visualize(str(output_dir / f'{base_name}_pattern.png'))
         
         print(f"\nFiles generated for {spec.name}:")
-        print(f"  - {base_name}_pattern.dxf (CAM manufacturing)")
+        if release_dxf:
+            print(f"  - {base_name}_pattern.dxf (CAM manufacturing)")
+        if drc_gate:
+            print(f"  - {base_name}_drc.json (design rule report)")
         print(f"  - {base_name}_pattern.svg (visualization)")
         print(f"  - {base_name}_pattern.json (simulation data)")
+        print(f"  - {base_name}_pattern.twp (binary simulation data)")
         print(f"  - {base_name}_pattern.png (preview image)")
 
 
 if __name__ == '__main__':
-    # Install required packages
-    import subprocess
-    packages = ['svgwrite', 'ezdxf']
-    for pkg in packages:
-        try:
-            __import__(pkg)
-        except ImportError:
-            print(f"Installing {pkg}...")
-            subprocess.run(['pip', 'install', pkg, '--break-system-packages'], 
-                         check=True)
-    
     generate_all_variants()
     
     print("\n" + "="*60)
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Import-Time Budget Check
+Measures cold import time of the project entry points in fresh
+interpreters and verifies that heavy optional dependencies stay unloaded
+"""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+
+# Budget per module (seconds, cold interpreter, median of runs)
+IMPORT_BUDGETS_S = {
+    'fractal_pattern_generator': 0.3,
+    'thermal_fea_simulator': 0.3,
+    'pattern_format': 0.3,
+    'design_rule_checker': 0.3,
+    'pattern_metrics': 0.3,
+    'cad_writers': 0.3,
+    'fast_render': 0.3,
+    'instrumentation': 0.3,
+    'domain_decomposition': 0.3,
+    'tiled_grid': 0.3,
+    'batch_pipeline': 0.3,
+    'tolerance_ensemble': 0.3,
+    'layered_stack': 0.3,
+    'array_utils': 0.3,
+}
+
+# Modules that must not be loaded by a plain import of the entry points
+FORBIDDEN_AT_IMPORT = ('matplotlib', 'scipy', 'svgwrite', 'ezdxf')
+
+_PROBE = '''
+import sys, time, json
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{'seconds': elapsed,
+                   'loaded': [m for m in {forbidden!r} if m in sys.modules]}}))
+'''
+
+
+def measure_import(module: str, runs: int = 3) -> Dict:
+    """Median cold import time and forbidden modules loaded by `import module`"""
+    repo_dir = str(Path(__file__).resolve().parent)
+    samples, loaded = [], []
+    for _ in range(runs):
+        code = _PROBE.format(module=module, forbidden=FORBIDDEN_AT_IMPORT)
+        out = subprocess.run([sys.executable, '-c', code], cwd=repo_dir,
+                             capture_output=True, text=True, check=True)
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        samples.append(result['seconds'])
+        loaded = result['loaded']
+    samples.sort()
+    return {'module': module, 'seconds': samples[len(samples) // 2], 'loaded': loaded}
+
+
+def check_import_budgets(runs: int = 3) -> List[Dict]:
+    """Measure every budgeted module; each result carries a 'passed' flag"""
+    results = []
+    for module, budget in IMPORT_BUDGETS_S.items():
+        result = measure_import(module, runs)
+        result['budget_s'] = budget
+        result['passed'] = result['seconds'] <= budget and not result['loaded']
+        results.append(result)
+    return results
+
+
+if __name__ == '__main__':
+    results = check_import_budgets()
+    for r in results:
+        status = 'OK  ' if r['passed'] else 'FAIL'
+        extra = f"  loaded: {', '.join(r['loaded'])}" if r['loaded'] else ''
+        print(f"{status} {r['module']:<28} {r['seconds'] * 1000:7.1f} ms "
+              f"(budget {r['budget_s'] * 1000:.0f} ms){extra}")
+    sys.exit(0 if all(r['passed'] for r in results) else 1)
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Structured Phase Instrumentation
+Records per-phase timings (and optionally tracemalloc peaks and cProfile
+statistics) as events delivered to hooks, replacing ad-hoc timing prints
+"""
+
+import functools
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass, field, asdict
+from typing import Callable, Dict, List, Optional, Sequence
+
+
+@dataclass
+class PhaseEvent:
+    """One completed phase"""
+    source: str
+    phase: str
+    seconds: float
+    started_at: float  # Unix time
+    depth: int = 0  # nesting level, 0 for top-level phases
+    peak_memory_mb: Optional[float] = None  # peak above the phase's starting usage
+    info: dict = field(default_factory=dict)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class JsonlHook:
+    """Hook appending each event as one JSON line, for aggregating sweeps"""
+
+    def __init__(self, filename: str, **context):
+        """
+        Args:
+            filename: Output .jsonl path (appended to)
+            context: Extra fields written with every event (run id, variant, ...)
+        """
+        self.filename = filename
+        self.context = context
+
+    def __call__(self, event: PhaseEvent):
+        record = dict(self.context, **event.to_dict())
+        with open(self.filename, 'a') as f:
+            f.write(json.dumps(record) + '\n')
+
+
+class Instrumentation:
+    """
+    Per-phase timing and memory capture with event hooks
+
+    Phases nest; each emits a PhaseEvent to every hook when it finishes.
+    With memory=True, tracemalloc runs while any phase is active; with
+    profile=True, a cProfile profiler accumulates across all phases.
+    """
+
+    def __init__(self, source: str = '', memory: bool = False, profile: bool = False,
+                 hooks: Sequence[Callable[[PhaseEvent], None]] = ()):
+        """
+        Args:
+            source: Name recorded on every event (e.g. 'ThermalFEA')
+            memory: Record tracemalloc peak memory per phase
+            profile: Capture cProfile statistics across phases
+            hooks: Callables receiving each PhaseEvent
+        """
+        if memory and not hasattr(tracemalloc, 'reset_peak'):
+            raise ValueError("per-phase memory capture requires Python 3.9+")
+        self.source = source
+        self.memory = memory
+        self.profile = profile
+        self.hooks = list(hooks)
+        self.events: List[PhaseEvent] = []
+        self._stack: List[dict] = []
+        self._started_tracing = False
+        self._profiler = None
+
+    def add_hook(self, hook: Callable[[PhaseEvent], None]):
+        self.hooks.append(hook)
+
+    def annotate(self, **info):
+        """Attach details (iteration counts, sizes, ...) to the innermost active phase"""
+        if self._stack:
+            self._stack[-1]['info'].update(info)
+
+    def elapsed(self) -> float:
+        """Seconds so far in the innermost active phase (0.0 outside any phase)"""
+        return time.perf_counter() - self._stack[-1]['start'] if self._stack else 0.0
+
+    @contextmanager
+    def phase(self, name: str, **info):
+        """Time a block as a named phase"""
+        frame = {'info': dict(info), 'peak': 0, 'base': 0}
+        if not self._stack:
+            self._begin()
+        if self.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if self._stack:
+                # Fold the parent's peak so far in before resetting it
+                self._stack[-1]['peak'] = max(self._stack[-1]['peak'], peak)
+            tracemalloc.reset_peak()
+            frame['base'] = current
+        self._stack.append(frame)
+
+        started_at = time.time()
+        frame['start'] = time.perf_counter()
+        try:
+            yield frame['info']
+        finally:
+            seconds = time.perf_counter() - frame['start']
+            self._stack.pop()
+            peak_mb = None
+            if self.memory:
+                peak = max(tracemalloc.get_traced_memory()[1], frame['peak'])
+                peak_mb = max(peak - frame['base'], 0) / 1e6
+                if self._stack:
+                    self._stack[-1]['peak'] = max(self._stack[-1]['peak'], peak)
+            if not self._stack:
+                self._end()
+            self._emit(PhaseEvent(self.source, name, seconds, started_at,
+                                  len(self._stack), peak_mb, frame['info']))
+
+    def _begin(self):
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        if self.profile:
+            if self._profiler is None:
+                import cProfile
+                self._profiler = cProfile.Profile()
+            self._profiler.enable()
+
+    def _end(self):
+        if self._profiler is not None:
+            self._profiler.disable()
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def _emit(self, event: PhaseEvent):
+        self.events.append(event)
+        for hook in self.hooks:
+            hook(event)
+
+    def summary(self) -> Dict:
+        """Aggregate events by phase: count, total and max seconds, peak memory"""
+        phases = {}
+        for e in self.events:
+            s = phases.setdefault(e.phase, {'count': 0, 'total_s': 0.0, 'max_s': 0.0})
+            s['count'] += 1
+            s['total_s'] += e.seconds
+            s['max_s'] = max(s['max_s'], e.seconds)
+            if e.peak_memory_mb is not None:
+                s['peak_memory_mb'] = max(s.get('peak_memory_mb', 0.0), e.peak_memory_mb)
+        return {
+            'source': self.source,
+            'total_s': sum(e.seconds for e in self.events if e.depth == 0),
+            'num_events': len(self.events),
+            'phases': phases,
+        }
+
+    def profile_stats(self, sort: str = 'cumulative', limit: int = 25) -> str:
+        """Formatted cProfile statistics (empty unless profile=True)"""
+        if self._profiler is None:
+            return ''
+        import io
+        import pstats
+        out = io.StringIO()
+        pstats.Stats(self._profiler, stream=out).sort_stats(sort).print_stats(limit)
+        return out.getvalue()
+
+    def dump_profile(self, filename: str):
+        """Write raw cProfile data (for snakeviz, pstats, ...)"""
+        if self._profiler is None:
+            raise ValueError("profiling is not enabled for this instrumentation")
+        self._profiler.dump_stats(filename)
+
+
+def instrumented(phase: str, **info):
+    """Method decorator running the call as a phase of self.instrumentation"""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self.instrumentation.phase(phase, **info):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Multi-Layer 2.5D Stack Solver
+Stacked 2D grids, one per layer of the wafer build-up, coupled by vertical
+conductances and cooled through the base into a cold plate. The block
+system is solved with conjugate gradients preconditioned by line solves
+through the thickness plus a collapsed-stack (2D) coarse correction
+"""
+
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from domain_decomposition import pcg
+from thermal_fea_simulator import MATERIALS
+from tiled_grid import (DIAMOND_CONDUCTIVITY, HEAT_PIPE_CONDUCTIVITY, channel_stamp_centers,
+                        stamp_channels, stamp_islands)
+
+
+@dataclass
+class Layer:
+    """One layer of the wafer stack"""
+    name: str
+    thickness_um: float
+    material: str  # key into thermal_fea_simulator.MATERIALS
+    feature: Optional[str] = None  # 'channels' or 'islands' stamped into this layer
+
+    @property
+    def conductivity(self) -> float:
+        return MATERIALS[self.material].conductivity
+
+    @property
+    def thickness_m(self) -> float:
+        return self.thickness_um * 1e-6
+
+
+def default_layers(channel_depth_um: float = 200.0) -> List[Layer]:
+    """
+    Five-layer build-up from technical_specifications.md, top (heat input) first
+
+    Args:
+        channel_depth_um: Heat-pipe layer thickness (WaferSpec.channel_depth_um)
+    """
+    return [
+        Layer('interface', 50.0, 'copper'),
+        Layer('diamond_islands', 100.0, 'copper', feature='islands'),
+        Layer('composite_spreader', 450.0, 'diamond_copper_composite'),
+        Layer('heat_pipes', channel_depth_um, 'copper', feature='channels'),
+        Layer('base', 350.0, 'aluminum_nitride'),
+    ]
+
+
+def _harmonic(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    return 2 * a * b / (a + b)
+
+
+class LayeredStack:
+    """
+    Finite-volume model of a layered wafer on a ThermalFEA grid
+
+    Every layer shares the FEA mask and cell size. Heat sources enter the
+    top layer, the rim of every layer sees the FEA convective coefficient,
+    and the bottom face conducts into a cold plate at ambient temperature
+    through the same coefficient.
+    """
+
+    def __init__(self, fea, layers: Optional[List[Layer]] = None):
+        """
+        Args:
+            fea: ThermalFEA with pattern, heat sources and boundary conditions set
+            layers: Stack from top to bottom (default_layers() for the
+                    pattern's channel depth if omitted)
+        """
+        if layers is None:
+            spec = getattr(fea, 'wafer_spec', {}) or {}
+            layers = default_layers(spec.get('channel_depth_um', 200.0))
+        self.fea = fea
+        self.layers = layers
+        self.nodes = np.flatnonzero(fea.mask.ravel())
+
+    @property
+    def num_layers(self) -> int:
+        return len(self.layers)
+
+    def conductivity_maps(self) -> np.ndarray:
+        """(layers, n, n) conductivity with channels and islands stamped into their layers"""
+        fea = self.fea
+        maps = np.empty((self.num_layers,) + fea.mask.shape)
+        centers = None
+        for k, layer in zip(maps, self.layers):
+            k[:] = layer.conductivity
+            if layer.feature == 'channels':
+                if centers is None:
+                    ci, cj = channel_stamp_centers(fea.channels, fea.dx, fea.radius_mm, fea.n)
+                    keep = fea.mask[cj, ci]
+                    centers = ci[keep], cj[keep]
+                stamp_channels(k, fea.mask, 0, 0, *centers, HEAT_PIPE_CONDUCTIVITY)
+            elif layer.feature == 'islands':
+                stamp_islands(k, fea.mask, fea.cell_x, fea.cell_y, fea.diamond_islands,
+                              DIAMOND_CONDUCTIVITY)
+            elif layer.feature is not None:
+                raise ValueError(f"Unknown layer feature '{layer.feature}'")
+        return maps
+
+    def _in_plane_pairs(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Local indices (a, b) of horizontally and vertically adjacent inside nodes"""
+        fea = self.fea
+        local = np.full(fea.num_nodes, -1)
+        local[self.nodes] = np.arange(len(self.nodes))
+        local = local.reshape(fea.mask.shape)
+        a = np.concatenate([local[:, :-1].ravel(), local[:-1, :].ravel()])
+        b = np.concatenate([local[:, 1:].ravel(), local[1:, :].ravel()])
+        both = (a >= 0) & (b >= 0)
+        return a[both], b[both]
+
+    def assemble(self) -> Tuple['object', np.ndarray]:
+        """
+        Conductance system G·T = q for all layers
+
+        Unknown l·N + i is node i (of N inside nodes) in layer l. G is
+        symmetric positive definite with layer-major block structure.
+
+        Returns:
+            (G, q) with G in W/K and q in W
+        """
+        from scipy.sparse import coo_matrix
+
+        fea = self.fea
+        L, N = self.num_layers, len(self.nodes)
+        dx = fea.dx / 1000.0  # m
+        k = self.conductivity_maps().reshape(L, -1)[:, self.nodes]
+        t = np.array([layer.thickness_m for layer in self.layers])[:, None]
+
+        # In-plane: face area t·dx over distance dx
+        a, b = self._in_plane_pairs()
+        g_plane = t * _harmonic(k[:, a], k[:, b])
+        offset = (np.arange(L) * N)[:, None]
+        rows = [(a + offset).ravel(), (b + offset).ravel()]
+        cols = [(b + offset).ravel(), (a + offset).ravel()]
+        vals = [-g_plane.ravel(), -g_plane.ravel()]
+
+        # Through the thickness: half-layer resistances in series over dx²
+        half = t / (2 * k)
+        g_vertical = dx**2 / (half[:-1] + half[1:])
+        upper = np.arange((L - 1) * N)
+        rows += [upper, upper + N]
+        cols += [upper + N, upper]
+        vals += [-g_vertical.ravel(), -g_vertical.ravel()]
+
+        # Ambient couplings: cold plate under the base, convection at the rim
+        g_ambient = np.zeros((L, N))
+        g_ambient[-1] += dx**2 / (half[-1] + 1.0 / fea.h)
+        rim = fea._boundary_nodes()[self.nodes]
+        g_ambient[:, rim] += fea.h * t * dx
+
+        diag = g_ambient.ravel() + np.bincount(
+            np.concatenate(rows[:2]), np.concatenate([g_plane.ravel()] * 2), minlength=L * N)
+        diag[:(L - 1) * N] += g_vertical.ravel()
+        diag[N:] += g_vertical.ravel()
+        idx = np.arange(L * N)
+        G = coo_matrix((np.concatenate(vals + [diag]),
+                        (np.concatenate(rows + [idx]), np.concatenate(cols + [idx]))),
+                       shape=(L * N, L * N)).tocsr()
+
+        q = g_ambient.ravel() * fea.ambient_temp
+        q[:N] += fea.heat_sources.ravel()[self.nodes] * fea.dx**2  # W/mm² · mm²
+        return G, q
+
+    def to_grid(self, x: np.ndarray) -> np.ndarray:
+        """(layers, n, n) temperatures from a solution vector, ambient outside the wafer"""
+        fea = self.fea
+        T = np.full((self.num_layers, fea.num_nodes), fea.ambient_temp, dtype=float)
+        T[:, self.nodes] = x.reshape(self.num_layers, -1)
+        return T.reshape((self.num_layers,) + fea.mask.shape)
+
+
+class LinePreconditioner:
+    """
+    Layer-aware two-level preconditioner for a LayeredStack system
+
+    Applies a symmetric sweep: exact tridiagonal solves along every vertical
+    line (block Jacobi through the thickness), a coarse correction on the
+    stack collapsed to one 2D layer, then a second line sweep. Thin layers
+    couple far more strongly through the thickness than in-plane, so the
+    collapsed stack captures the smooth error and the line solves the rest.
+    """
+
+    def __init__(self, G, num_layers: int):
+        """
+        Args:
+            G: Stack conductance matrix from LayeredStack.assemble
+            num_layers: Number of layers
+        """
+        from scipy.sparse import identity, vstack
+        from scipy.sparse.linalg import splu
+
+        self.G = G
+        L = self.num_layers = num_layers
+        N = self.num_columns = G.shape[0] // num_layers
+        diag = G.diagonal().reshape(L, N)
+        off = G.diagonal(N).reshape(L - 1, N) if L > 1 else np.empty((0, N))
+
+        # Thomas factorization of every line at once
+        self.lower = off
+        self.pivot = np.empty((L, N))
+        self.pivot[0] = diag[0]
+        for l in range(1, L):
+            self.pivot[l] = diag[l] - off[l - 1]**2 / self.pivot[l - 1]
+
+        # Collapsed stack: P replicates a 2D field into every layer
+        P = vstack([identity(N, format='csr')] * L).tocsr()
+        self.coarse = splu((P.T @ G @ P).tocsc())
+        self.nnz_factor = int(self.coarse.L.nnz + self.coarse.U.nnz)
+
+    def line_solve(self, r: np.ndarray) -> np.ndarray:
+        """Solve every vertical tridiagonal line for a residual"""
+        L = self.num_layers
+        y = r.reshape(L, -1).copy()
+        for l in range(1, L):
+            y[l] -= self.lower[l - 1] / self.pivot[l - 1] * y[l - 1]
+        y[L - 1] /= self.pivot[L - 1]
+        for l in range(L - 2, -1, -1):
+            y[l] = (y[l] - self.lower[l] * y[l + 1]) / self.pivot[l]
+        return y.ravel()
+
+    def coarse_solve(self, r: np.ndarray) -> np.ndarray:
+        """Correction from the collapsed stack, replicated through the thickness"""
+        z = self.coarse.solve(r.reshape(self.num_layers, -1).sum(axis=0))
+        return np.tile(z, self.num_layers)
+
+    def __call__(self, r: np.ndarray) -> np.ndarray:
+        x = self.line_solve(r)
+        x += self.coarse_solve(r - self.G @ x)
+        x += self.line_solve(r - self.G @ x)
+        return x
+
+
+def solve_stack(fea, layers: Optional[List[Layer]] = None, solver: str = 'line',
+                rtol: float = 1e-8, maxiter: Optional[int] = None) -> np.ndarray:
+    """
+    Steady-state temperatures of a layered wafer
+
+    Args:
+        fea: ThermalFEA with pattern, heat sources and boundary conditions set
+        layers: Stack from top to bottom (default_layers() if omitted)
+        solver: 'line' (layer-aware preconditioned CG) or 'direct' (sparse LU
+                of the whole block system, for reference)
+        rtol: CG relative residual tolerance
+        maxiter: CG iteration limit
+
+    Returns:
+        (layers, n, n) temperature array, top layer first
+    """
+    from scipy.sparse.linalg import splu
+
+    if solver not in ('line', 'direct'):
+        raise ValueError(f"Unknown solver '{solver}'; use 'line' or 'direct'")
+
+    stack = LayeredStack(fea, layers)
+    instrumentation = fea.instrumentation
+    with instrumentation.phase('assembly', operator='stack', layers=stack.num_layers):
+        G, q = stack.assemble()
+
+    if solver == 'direct':
+        with instrumentation.phase('factorization', method='splu'):
+            lu = splu(G.tocsc())
+            instrumentation.annotate(nnz_factor=int(lu.L.nnz + lu.U.nnz))
+        with instrumentation.phase('solve', method='splu', iterations=1):
+            x = lu.solve(q)
+        return stack.to_grid(x)
+
+    with instrumentation.phase('factorization', method='line+coarse'):
+        M = LinePreconditioner(G, stack.num_layers)
+        instrumentation.annotate(nnz_factor=M.nnz_factor)
+    with instrumentation.phase('solve', method='line-pcg'):
+        result = pcg(G, q, M, rtol=rtol, maxiter=maxiter)
+        instrumentation.annotate(iterations=result.iterations,
+                                 relative_residual=result.relative_residual)
+    if not result.converged:
+        print(f"Warning: CG stopped after {result.iterations} iterations "
+              f"at relative residual {result.relative_residual:.2e}")
+    else:
+        print(f"CG converged in {result.iterations} iterations ({stack.num_layers} layers)")
+    return stack.to_grid(result.x)
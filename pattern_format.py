@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Binary Columnar Pattern Format
+Versioned, memory-mappable container for channel, island and hot-spot
+arrays plus WaferSpec metadata, shared by the generator and FEA loader
+"""
+
+import numpy as np
+import json
+import struct
+from dataclasses import dataclass, field
+from typing import Optional
+
+
+MAGIC = b'TWPATTRN'
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+
+# Preamble: magic, format version, header length
+_PREAMBLE = struct.Struct('<8sII')
+
+# Array name -> trailing shape (leading dimension is the item count)
+ARRAY_LAYOUT = {
+    'channels': (2, 2),
+    'diamond_islands': (3,),
+    'hot_spots': (3,),
+}
+
+
+@dataclass
+class PatternData:
+    """Contents of a binary pattern file"""
+    channels: np.ndarray  # (N, 2, 2) endpoints in mm
+    diamond_islands: np.ndarray  # (M, 3) x, y, radius in mm
+    hot_spots: np.ndarray  # (K, 3) x, y, intensity in W/cm²
+    wafer_spec: dict = field(default_factory=dict)
+    metadata: dict = field(default_factory=dict)
+    version: int = FORMAT_VERSION
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def write_pattern(filename: str, channels, diamond_islands=(), hot_spots=(),
+                  wafer_spec: Optional[dict] = None,
+                  metadata: Optional[dict] = None):
+    """
+    Write a pattern as a binary columnar file
+
+    Layout: fixed preamble, JSON header describing each array's dtype,
+    shape and byte offset, then 64-byte aligned little-endian float64
+    arrays that can be memory-mapped in place.
+    """
+    arrays = {}
+    for name, source in (('channels', channels),
+                         ('diamond_islands', diamond_islands),
+                         ('hot_spots', hot_spots)):
+        trailing = ARRAY_LAYOUT[name]
+        arrays[name] = np.ascontiguousarray(
+            np.asarray(source, dtype='<f8').reshape((-1,) + trailing))
+
+    # Size the header with maximal-width offsets so real offsets always fit
+    descriptors = {name: {'dtype': '<f8', 'shape': list(a.shape), 'offset': 10**18}
+                   for name, a in arrays.items()}
+    header = {'format': 'thermal-wafer-pattern', 'version': FORMAT_VERSION,
+              'wafer_spec': wafer_spec or {}, 'metadata': metadata or {},
+              'arrays': descriptors}
+    reserved = _aligned(_PREAMBLE.size + len(json.dumps(header).encode('utf-8')))
+    offset = reserved
+    for name, a in arrays.items():
+        descriptors[name]['offset'] = offset
+        offset = _aligned(offset + a.nbytes)
+    header_bytes = json.dumps(header).encode('utf-8')
+    header_bytes += b' ' * (reserved - _PREAMBLE.size - len(header_bytes))
+
+    with open(filename, 'wb') as f:
+        f.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header_bytes)))
+        f.write(header_bytes)
+        for name, a in arrays.items():
+            f.seek(descriptors[name]['offset'])
+            f.write(a.tobytes())
+
+
+def read_header(filename: str) -> dict:
+    """Read and validate the JSON header of a binary pattern file"""
+    with open(filename, 'rb') as f:
+        preamble = f.read(_PREAMBLE.size)
+        if len(preamble) < _PREAMBLE.size:
+            raise ValueError(f"{filename}: truncated pattern file")
+        magic, version, header_len = _PREAMBLE.unpack(preamble)
+        if magic != MAGIC:
+            raise ValueError(f"{filename}: not a binary pattern file")
+        if version > FORMAT_VERSION:
+            raise ValueError(f"{filename}: pattern format version {version} is newer "
+                             f"than supported version {FORMAT_VERSION}")
+        return json.loads(f.read(header_len).decode('utf-8'))
+
+
+def read_pattern(filename: str, mmap: bool = True) -> PatternData:
+    """
+    Load a binary pattern file
+
+    Args:
+        filename: Pattern file path
+        mmap: Memory-map arrays read-only (zero-copy) instead of reading them
+
+    Returns:
+        PatternData with arrays shaped as in ARRAY_LAYOUT
+    """
+    header = read_header(filename)
+    arrays = {}
+    for name, desc in header['arrays'].items():
+        shape = tuple(desc['shape'])
+        if np.prod(shape) == 0:
+            arrays[name] = np.empty(shape, dtype=desc['dtype'])
+        elif mmap:
+            arrays[name] = np.memmap(filename, dtype=desc['dtype'], mode='r',
+                                     offset=desc['offset'], shape=shape)
+        else:
+            with open(filename, 'rb') as f:
+                f.seek(desc['offset'])
+                arrays[name] = np.fromfile(f, dtype=desc['dtype'],
+                                           count=int(np.prod(shape))).reshape(shape)
+    return PatternData(channels=arrays['channels'],
+                       diamond_islands=arrays['diamond_islands'],
+                       hot_spots=arrays['hot_spots'],
+                       wafer_spec=header.get('wafer_spec', {}),
+                       metadata=header.get('metadata', {}),
+                       version=header['version'])
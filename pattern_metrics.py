@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Fast Geometric Pre-Screening for Fractal Heat Spreader Patterns
+Rasterizes a pattern once and derives conduction-distance metrics from a
+Euclidean distance transform, with an FEA-calibrated surrogate for ΔT
+"""
+
+import numpy as np
+import json
+from dataclasses import dataclass, asdict
+from typing import List, Tuple, Sequence, Optional
+
+from array_utils import ragged_arange
+
+
+# Percentiles of the wafer-to-channel distance reported by default
+DISTANCE_PERCENTILES = (50.0, 90.0, 95.0, 99.0)
+
+# Spreader thickness used by the surrogate conduction estimate (mm)
+SPREADER_THICKNESS_MM = 1.0
+
+
+@dataclass
+class PatternMetrics:
+    """Geometric quality metrics for one pattern"""
+    max_distance_mm: float
+    mean_distance_mm: float
+    distance_percentiles_mm: dict
+    hot_spot_distances_mm: List[float]
+    channel_area_fraction: float
+    coverage_fraction: float
+    surrogate_feature: float
+    surrogate_delta_T: float = float('nan')
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+@dataclass
+class SurrogateModel:
+    """
+    Linear surrogate ΔT = scale * feature + offset
+
+    The feature is a slab-conduction estimate q·d²/(2·k·t) evaluated at
+    each hot spot, where d is the distance to the nearest channel. The
+    default coefficients are uncalibrated; use `fit` against FEA results.
+    """
+    scale: float = 1.0
+    offset: float = 0.0
+    num_samples: int = 0
+    rms_error: float = float('nan')
+
+    def predict(self, feature):
+        return self.scale * np.asarray(feature) + self.offset
+
+    @classmethod
+    def fit(cls, features: Sequence[float], delta_T: Sequence[float]) -> 'SurrogateModel':
+        """Least-squares fit of the surrogate to FEA ΔT values"""
+        x = np.asarray(features, dtype=float)
+        y = np.asarray(delta_T, dtype=float)
+        valid = np.isfinite(x) & np.isfinite(y)
+        x, y = x[valid], y[valid]
+        if len(x) < 2 or np.ptp(x) == 0:
+            offset = float(y.mean()) if len(y) else 0.0
+            model = cls(scale=0.0, offset=offset, num_samples=len(x))
+        else:
+            scale, offset = np.polyfit(x, y, 1)
+            model = cls(scale=float(scale), offset=float(offset), num_samples=len(x))
+        if len(x):
+            model.rms_error = float(np.sqrt(np.mean((model.predict(x) - y)**2)))
+        return model
+
+    def save(self, filename: str):
+        with open(filename, 'w') as f:
+            json.dump(asdict(self), f, indent=2)
+
+    @classmethod
+    def load(cls, filename: str) -> 'SurrogateModel':
+        with open(filename, 'r') as f:
+            return cls(**json.load(f))
+
+
+class PatternScreener:
+    """Distance-transform based pre-screening of candidate patterns"""
+
+    def __init__(self, diameter_mm: float, resolution: int = 256,
+                 channel_width_mm: float = 0.5,
+                 material_conductivity: float = 1200.0,
+                 coverage_radius_mm: float = 5.0,
+                 surrogate: Optional[SurrogateModel] = None):
+        """
+        Args:
+            diameter_mm: Wafer diameter in mm
+            resolution: Raster pixels along the diameter
+            channel_width_mm: Channel width in mm
+            material_conductivity: Spreader conductivity in W/m·K
+            coverage_radius_mm: Distance within which a point counts as covered
+            surrogate: Calibrated surrogate model (uncalibrated if omitted)
+        """
+        self.diameter_mm = diameter_mm
+        self.radius_mm = diameter_mm / 2.0
+        self.resolution = resolution
+        self.pixel_mm = diameter_mm / resolution
+        self.channel_width_mm = channel_width_mm
+        self.material_conductivity = material_conductivity
+        self.coverage_radius_mm = coverage_radius_mm
+        self.surrogate = surrogate or SurrogateModel()
+
+        centres = -self.radius_mm + (np.arange(resolution) + 0.5) * self.pixel_mm
+        self.mask = (centres[None, :]**2 + centres[:, None]**2) <= self.radius_mm**2
+
+    @classmethod
+    def for_spec(cls, spec, resolution: int = 256, **kwargs) -> 'PatternScreener':
+        """Screener configured from a WaferSpec"""
+        return cls(spec.diameter_mm, resolution,
+                   channel_width_mm=spec.channel_width_um / 1000.0,
+                   material_conductivity=spec.material_thermal_conductivity,
+                   **kwargs)
+
+    def _to_pixels(self, points: np.ndarray) -> np.ndarray:
+        """Convert (..., 2) mm coordinates to (x, y) = (col, row) pixel indices"""
+        ij = np.floor((points + self.radius_mm) / self.pixel_mm).astype(np.int64)
+        return np.clip(ij, 0, self.resolution - 1)
+
+    def rasterize(self, channels) -> np.ndarray:
+        """Rasterize channel segments to a boolean pixel grid"""
+        channels = np.asarray(channels, dtype=float).reshape(-1, 2, 2)
+        grid = np.zeros((self.resolution, self.resolution), dtype=bool)
+        if len(channels) == 0:
+            return grid
+
+        # Sample every segment at half-pixel steps
+        p1, delta = channels[:, 0], channels[:, 1] - channels[:, 0]
+        steps = np.ceil(np.linalg.norm(delta, axis=1) / (0.5 * self.pixel_mm))
+        counts = steps.astype(np.int64) + 1
+        owner = np.repeat(np.arange(len(channels)), counts)
+        k = ragged_arange(counts)
+        t = k / np.maximum(steps[owner], 1.0)
+        ij = self._to_pixels(p1[owner] + t[:, None] * delta[owner])
+        grid[ij[:, 1], ij[:, 0]] = True
+        return grid & self.mask
+
+    def distance_map(self, channel_raster: np.ndarray) -> np.ndarray:
+        """Distance (mm) from every pixel to the nearest channel edge"""
+        from scipy.ndimage import distance_transform_edt
+
+        if not channel_raster.any():
+            return np.full(channel_raster.shape, np.inf)
+        dist = distance_transform_edt(~channel_raster) * self.pixel_mm
+        return np.maximum(dist - self.channel_width_mm / 2, 0.0)
+
+    def evaluate(self, channels, hot_spots: Sequence[Tuple[float, float, float]] = ()
+                 ) -> PatternMetrics:
+        """
+        Compute geometric metrics for a pattern
+
+        Args:
+            channels: (N, 2, 2) channel segment endpoints in mm
+            hot_spots: Sequence of (x, y, intensity W/cm²)
+        """
+        channels = np.asarray(channels, dtype=float).reshape(-1, 2, 2)
+        dist = self.distance_map(self.rasterize(channels))
+        wafer_dist = dist[self.mask]
+
+        hot = np.asarray(hot_spots, dtype=float).reshape(-1, 3)
+        if len(hot):
+            ij = self._to_pixels(hot[:, :2])
+            hot_dist = dist[ij[:, 1], ij[:, 0]]
+        else:
+            hot_dist = np.empty(0)
+
+        lengths = np.linalg.norm(channels[:, 1] - channels[:, 0], axis=1)
+        area_fraction = (lengths.sum() * self.channel_width_mm /
+                         (np.pi * self.radius_mm**2))
+
+        feature = self._surrogate_feature(wafer_dist, hot, hot_dist)
+        return PatternMetrics(
+            max_distance_mm=float(wafer_dist.max()),
+            mean_distance_mm=float(wafer_dist.mean()),
+            distance_percentiles_mm={
+                f'p{p:g}': float(v) for p, v in
+                zip(DISTANCE_PERCENTILES, np.percentile(wafer_dist, DISTANCE_PERCENTILES))
+            },
+            hot_spot_distances_mm=[float(d) for d in hot_dist],
+            channel_area_fraction=float(min(area_fraction, 1.0)),
+            coverage_fraction=float(np.mean(wafer_dist <= self.coverage_radius_mm)),
+            surrogate_feature=feature,
+            surrogate_delta_T=float(self.surrogate.predict(feature)),
+        )
+
+    def evaluate_generator(self, gen) -> PatternMetrics:
+        """Compute metrics for a FractalPatternGenerator's current pattern"""
+        return self.evaluate(gen.channel_array(), gen.hot_spots)
+
+    def _surrogate_feature(self, wafer_dist: np.ndarray, hot: np.ndarray,
+                           hot_dist: np.ndarray) -> float:
+        """Slab conduction estimate q·d²/(2·k·t) in °C"""
+        k = self.material_conductivity
+        t = SPREADER_THICKNESS_MM / 1000.0
+        if len(hot):
+            q = hot[:, 2] * 1e4  # W/cm² -> W/m²
+            d = hot_dist / 1000.0
+            return float(np.max(q * d**2 / (2 * k * t)))
+        # Without hot spots, rate the worst-covered 1% of the wafer at unit flux
+        d = np.percentile(wafer_dist, 99.0) / 1000.0
+        return float(1e4 * d**2 / (2 * k * t))
+
+    def screen(self, candidates: Sequence, keep_fraction: float = 0.01
+               ) -> List[Tuple[int, PatternMetrics]]:
+        """
+        Rank candidate patterns by surrogate ΔT
+
+        Args:
+            candidates: Sequence of (channels, hot_spots) tuples
+            keep_fraction: Fraction of candidates to keep (at least one)
+
+        Returns:
+            List of (candidate index, metrics) for the kept candidates, best first
+        """
+        scored = [(i, self.evaluate(channels, hot_spots))
+                  for i, (channels, hot_spots) in enumerate(candidates)]
+        scored.sort(key=lambda item: item[1].surrogate_delta_T)
+        keep = max(1, int(round(len(scored) * keep_fraction)))
+        return scored[:keep]
+
+
+def calibrate_surrogate(generators: Sequence, fea_resolution: int = 100,
+                        screen_resolution: int = 256,
+                        ambient_temp_C: float = 25.0,
+                        cooling_type: str = 'liquid',
+                        source_radius_mm: float = 5.0) -> SurrogateModel:
+    """
+    Fit the surrogate against full ThermalFEA solves
+
+    Each generator's hot spots become FEA heat sources with power equal to
+    intensity (W/cm²) times the source footprint area.
+
+    Args:
+        generators: FractalPatternGenerator instances with generated patterns
+        fea_resolution: FEA mesh points along the diameter
+        screen_resolution: Raster pixels along the diameter
+        ambient_temp_C: FEA ambient temperature
+        cooling_type: FEA boundary condition type
+        source_radius_mm: FEA heat source radius
+
+    Returns:
+        Fitted SurrogateModel
+    """
+    from thermal_fea_simulator import ThermalFEA
+
+    features, delta_T = [], []
+    for gen in generators:
+        screener = PatternScreener.for_spec(gen.spec, screen_resolution)
+        features.append(screener.evaluate_generator(gen).surrogate_feature)
+
+        fea = ThermalFEA(gen.spec.diameter_mm, resolution=fea_resolution)
+        fea.load_pattern(gen.channels, gen.add_diamond_islands())
+        footprint_cm2 = np.pi * (source_radius_mm / 10.0)**2
+        for x, y, intensity in gen.hot_spots:
+            fea.add_heat_source(x, y, intensity * footprint_cm2, source_radius_mm)
+        fea.set_boundary_conditions(ambient_temp_C, cooling_type)
+        temperature = fea.solve_steady_state()
+        delta_T.append(float(np.ptp(temperature[fea.mask])))
+
+    model = SurrogateModel.fit(features, delta_T)
+    print(f"Surrogate calibrated on {model.num_samples} patterns: "
+          f"ΔT ≈ {model.scale:.4g}·feature + {model.offset:.4g} "
+          f"(RMS error {model.rms_error:.3g}°C)")
+    return model
@@ -0,0 +1,27 @@
+"""Shared ThermalFEA test model"""
+
+import pytest
+
+from thermal_fea_simulator import ThermalFEA
+
+
+def populate(fea):
+    """Two-channel cross, one diamond island, liquid cooling and two heat sources"""
+    fea.load_pattern([((-30, 0), (30, 0)), ((0, -30), (0, 25))], [(15, 15, 4.0)])
+    fea.set_boundary_conditions(25.0, 'liquid')
+    fea.add_heat_source(0, 0, 100, 8)
+    fea.add_heat_source(-20, 20, 50, 5)
+    return fea
+
+
+@pytest.fixture(params=[30, 45], ids=lambda n: f'{n}x{n}')
+def resolution(request):
+    return request.param
+
+
+@pytest.fixture
+def make_model(resolution):
+    """Factory for fresh 100 mm models: make_model(fea_class=ThermalFEA, **options)"""
+    def make(fea_class=ThermalFEA, **options):
+        return populate(fea_class(100.0, resolution, **options))
+    return make
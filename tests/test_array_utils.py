@@ -0,0 +1,12 @@
+"""Shared array helpers"""
+
+import numpy as np
+
+from array_utils import ragged_arange
+
+
+def test_ragged_arange_matches_loop():
+    counts = np.array([3, 0, 1, 4])
+    expected = np.concatenate([np.arange(c) for c in counts])
+    assert np.array_equal(ragged_arange(counts), expected)
+    assert ragged_arange(np.empty(0, dtype=np.int64)).shape == (0,)
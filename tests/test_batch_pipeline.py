@@ -0,0 +1,72 @@
+"""Batch pipeline cache keys"""
+
+import shutil
+
+import pytest
+
+import batch_pipeline
+from batch_pipeline import HashCache, is_stale, job_code, job_key, plan_jobs
+
+
+def test_job_code_follows_imports():
+    pattern, simulation = job_code('pattern'), job_code('simulation')
+    assert 'instrumentation.py' in pattern and 'instrumentation.py' in simulation
+    assert 'batch_pipeline.py' in pattern and 'batch_pipeline.py' in simulation
+    assert {'cad_writers.py', 'pattern_format.py', 'design_rule_checker.py'} <= set(pattern)
+    assert {'tiled_grid.py', 'domain_decomposition.py', 'layered_stack.py'} <= set(simulation)
+    assert 'thermal_fea_simulator.py' not in pattern
+
+
+@pytest.fixture
+def build(tmp_path, monkeypatch):
+    """Two variants' jobs with recorded keys, over a copy of the code"""
+    code = tmp_path / 'code'
+    code.mkdir()
+    for source in batch_pipeline.MODULE_DIR.glob('*.py'):
+        shutil.copy(source, code / source.name)
+    monkeypatch.setattr(batch_pipeline, 'MODULE_DIR', code)
+
+    variants = [{'name': name, 'spec': name, 'pattern': {'type': 'radial'},
+                 'simulation': {'resolution': 50}} for name in ('quantum', 'space_solar')]
+    jobs = plan_jobs({'variants': variants}, tmp_path / 'build')
+    (tmp_path / 'build').mkdir()
+    for job in jobs:
+        for path in job.inputs:
+            with open(path, 'w') as f:
+                f.write('pattern')
+    state = {job.id: {'key': job_key(job, HashCache()), 'outputs': {}} for job in jobs}
+
+    def stale():
+        file_hash = HashCache()
+        return {job.id for job in jobs if is_stale(job, job_key(job, file_hash), state, file_hash)}
+
+    return code, jobs, stale
+
+
+def touch(path):
+    with open(path, 'a') as f:
+        f.write('\n# edited\n')
+
+
+def test_fresh_build_is_up_to_date(build):
+    _, _, stale = build
+    assert stale() == set()
+
+
+@pytest.mark.parametrize('module, affected', [
+    ('batch_pipeline.py', {'pattern', 'simulation'}),
+    ('instrumentation.py', {'pattern', 'simulation'}),
+    ('cad_writers.py', {'pattern'}),
+    ('tiled_grid.py', {'simulation'}),
+])
+def test_code_edit_invalidates_affected_kinds(build, module, affected):
+    code, jobs, stale = build
+    touch(code / module)
+    assert stale() == {job.id for job in jobs if job.kind in affected}
+
+
+def test_input_edit_invalidates_its_consumer(build):
+    _, jobs, stale = build
+    simulation = next(job for job in jobs if job.id == 'quantum:simulation')
+    touch(simulation.inputs[0])
+    assert stale() == {'quantum:simulation'}
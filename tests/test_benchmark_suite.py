@@ -0,0 +1,31 @@
+"""Benchmark case construction"""
+
+import time
+
+from benchmark_suite import BenchmarkCase, fea_cases, run_case
+
+
+def test_fea_cases_use_their_own_variant_pattern(tmp_path):
+    cases = fea_cases(tmp_path, resolutions=(20,), transient=False)
+    channels = {}
+    for case in cases:
+        if case.name in ('rasterize_channels', 'assemble_stiffness'):
+            fea = case.setup()
+            channels.setdefault(case.params['variant'], set()).add(len(fea.channels))
+    assert all(len(counts) == 1 for counts in channels.values())
+    counts = [counts.pop() for counts in channels.values()]
+    assert len(set(counts)) == len(counts), channels
+
+
+def test_run_case_excludes_cold_first_call():
+    calls = []
+
+    def run(state):
+        calls.append(state)
+        if len(calls) == 1:
+            time.sleep(0.2)  # stands in for a cold import on first use
+
+    case = BenchmarkCase('group', 'cold', {}, setup=lambda: len(calls), run=run)
+    result = run_case(case, repeat=1, memory=False)
+    assert len(calls) == 2
+    assert result.seconds < 0.1
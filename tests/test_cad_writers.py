@@ -0,0 +1,106 @@
+"""Streaming DXF and SVG writer output"""
+
+import gzip
+import re
+import xml.etree.ElementTree as ET
+
+import numpy as np
+import pytest
+
+from cad_writers import StreamingDXFWriter, StreamingSVGWriter, merge_channel_runs
+
+
+SVG = '{http://www.w3.org/2000/svg}'
+
+
+def write_sample(filename):
+    channels = [[[0, 0], [1, 0]], [[1, 0], [1, 1]], [[5, 5], [6, 6]]]
+    vertices, starts = merge_channel_runs(channels)
+    with StreamingDXFWriter(str(filename), chunk_size=2) as dxf:
+        dxf.header((-10, -10), (10, 10))
+        dxf.tables([('CHANNELS', 5), ('HEAT_PIPES', 1)], ['HEAT_PIPE'])
+        dxf.circle_blocks([('HEAT_PIPE', 0.25)])
+        dxf.begin_entities()
+        dxf.circle((0.0, 0.0), 10.0, '0')
+        dxf.polylines(vertices, starts, 'CHANNELS')
+        dxf.inserts('HEAT_PIPE', np.array([[1.0, 2.0], [3.0, 4.0], [5.0, 6.0]]), 'HEAT_PIPES')
+    return vertices, starts
+
+
+def test_handles_are_unique_and_below_seed(tmp_path):
+    write_sample(tmp_path / 'out.dxf')
+    lines = (tmp_path / 'out.dxf').read_text().split('\n')
+    pairs = list(zip(lines[0::2], lines[1::2]))
+    seed = int(pairs[[value for _, value in pairs].index('$HANDSEED') + 1][1], 16)
+    handles = [int(value, 16) for code, value in pairs if code in ('5', '105')]
+    handles.remove(seed)  # $HANDSEED itself uses group code 5
+    assert len(handles) == len(set(handles))
+    assert max(handles) < seed
+    assert pairs[-1] == ('0', 'EOF')
+
+
+def test_r2000_document_reads_back(tmp_path):
+    ezdxf = pytest.importorskip('ezdxf')
+    vertices, starts = write_sample(tmp_path / 'out.dxf')
+    doc = ezdxf.readfile(str(tmp_path / 'out.dxf'))
+    assert doc.dxfversion == 'AC1015'
+    assert not doc.audit().has_errors
+
+    msp = doc.modelspace()
+    runs = [np.array([p[:2] for p in pl.get_points()]) for pl in msp.query('LWPOLYLINE')]
+    assert np.allclose(np.concatenate(runs), vertices)
+    assert [len(run) for run in runs] == np.diff(np.append(starts, len(vertices))).tolist()
+    assert len(msp.query('INSERT')) == 3
+    assert doc.blocks.get('HEAT_PIPE').query('CIRCLE')[0].dxf.radius == 0.25
+
+
+def parse_runs(d: str):
+    """Absolute vertex runs from 'M x y l dx dy ...' path data"""
+    runs = []
+    for command in re.findall(r'M[^M]*', d):
+        start, _, steps = command[1:].partition('l')
+        run = [np.array(start.split(), dtype=float)]
+        values = np.array(steps.split(), dtype=float).reshape(-1, 2)
+        run += list(run[0] + np.cumsum(values, axis=0))
+        runs.append(np.array(run))
+    return runs
+
+
+def test_writer_splits_paths_at_vertex_budget(tmp_path):
+    vertices = np.array([[0, 0], [1.004, 0], [1.004, 2.5], [7, 7], [8, 8], [3, 3], [4, 1]])
+    starts = np.array([0, 3, 5])
+    filename = str(tmp_path / 'runs.svg')
+    with StreamingSVGWriter(filename, 100, precision=2, vertices_per_path=4) as svg:
+        svg.paths(vertices, starts, stroke='blue', stroke_width=1)
+
+    paths = ET.parse(filename).getroot().findall(f'{SVG}path')
+    assert len(paths) == 2  # run 0 fills the first path; runs 1 and 2 share the second
+    assert paths[0].get('stroke-width') == '1'
+    runs = [run for path in paths for run in parse_runs(path.get('d'))]
+    assert np.allclose(np.concatenate(runs), np.round(vertices, 2), atol=1e-9)
+
+
+def test_generator_compact_svg_and_svgz_round_trip(tmp_path):
+    from fractal_pattern_generator import FractalPatternGenerator, QUANTUM_VARIANT
+
+    np.random.seed(0)
+    gen = FractalPatternGenerator(QUANTUM_VARIANT)
+    gen.generate_radial_fractal(num_primary=8, branch_factor=2)
+    gen.export_svg(str(tmp_path / 'p.svg'), compact=True)
+    gen.export_svg(str(tmp_path / 'p.svgz'))
+
+    text = (tmp_path / 'p.svg').read_text()
+    with gzip.open(tmp_path / 'p.svgz', 'rt') as f:
+        assert f.read() == text
+
+    paths = ET.fromstring(text).findall(f'{SVG}path')
+    assert len(paths) == 1
+    vertices, starts = merge_channel_runs(gen.channel_array())
+    runs = parse_runs(paths[0].get('d'))
+    assert [len(run) for run in runs] == np.diff(np.append(starts, len(vertices))).tolist()
+
+    # Back from pixels (10 px/mm, y down, centred) to mm
+    offset = int(gen.spec.diameter_mm * 10) / 2
+    points = np.concatenate(runs)
+    mm = np.column_stack([(points[:, 0] - offset) / 10, (offset - points[:, 1]) / 10])
+    assert np.allclose(mm, vertices, atol=0.005 / 10 + 1e-9)
@@ -0,0 +1,101 @@
+"""Design rule checker edge cases"""
+
+import numpy as np
+import pytest
+
+from design_rule_checker import DesignRuleChecker, DesignRules, UniformGridIndex
+
+
+def check(channels, radius_mm=100.0, **rules):
+    rules = dict(dict(channel_width_mm=0.2, min_channel_spacing_mm=0.2), **rules)
+    return DesignRuleChecker(radius_mm, DesignRules(**rules)).check(channels)
+
+
+def test_single_long_channel():
+    report = check([[[0, 0], [10, 0]]])
+    assert report.passed
+    assert report.counts().get('channel_spacing', 0) == 0
+
+
+def test_well_separated_parallel_channels():
+    report = check([[[0, 0], [10, 0]], [[0, 5], [10, 5]]])
+    assert report.passed
+    assert 'channel_spacing' not in report.counts()
+
+
+def test_close_parallel_channels_fail_spacing():
+    report = check([[[0, 0], [10, 0]], [[0, 0.3], [10, 0.3]]])
+    assert not report.passed
+    assert report.counts()['channel_spacing'] >= 1
+    assert report.errors[0].measured_mm == np.float64(0.3 - 0.2)
+
+
+def test_junction_is_not_a_spacing_violation():
+    report = check([[[0, 0], [10, 0]], [[10, 0], [10, 10]], [[5, 0], [5, -10]]])
+    assert 'channel_spacing' not in report.counts()
+
+
+def test_edge_clearance():
+    report = check([[[0, 0], [99.8, 0]]])
+    assert report.counts()['edge_clearance'] == 1
+    assert not report.passed
+
+
+def test_empty_pattern():
+    report = check(np.empty((0, 2, 2)))
+    assert report.passed and report.num_channels == 0
+
+
+def test_self_pairs_without_shared_cells():
+    index = UniformGridIndex(1.0).build(np.array([[0.0, 0.0], [5.0, 5.0]]),
+                                        np.array([[0.5, 0.5], [5.5, 5.5]]))
+    assert index.self_pairs().shape == (0, 2)
+
+
+def test_short_connector_joins_junctions():
+    # Junctions 0.5mm apart, joined by two connectors shorter than the spacing rule
+    channels = [[[0, 0], [0.25, 0]], [[0.25, 0], [0.5, 0]],
+                [[0, 0], [-10, 10]], [[0, 0], [-10, -10]],
+                [[0.5, 0], [10, 10]], [[0.5, 0], [10, -10]]]
+    report = check(channels, channel_width_mm=0.5, min_channel_spacing_mm=0.5)
+    assert 'channel_spacing' not in report.counts()
+
+
+def test_reference_generators_pass_error_rules():
+    from fractal_pattern_generator import (AI_VARIANT, QUANTUM_VARIANT, SPACE_VARIANT,
+                                           FractalPatternGenerator, default_hot_spots)
+
+    np.random.seed(0)
+    for spec, generate in ((SPACE_VARIANT, lambda g: g.generate_voronoi_fractal(500)),
+                           (AI_VARIANT, lambda g: g.generate_hilbert_fractal(6)),
+                           (QUANTUM_VARIANT, lambda g: g.generate_radial_fractal(24, 4))):
+        gen = FractalPatternGenerator(spec)
+        for x, y, intensity in default_hot_spots(spec):
+            gen.add_hot_spot(x, y, intensity)
+        generate(gen)
+        report = DesignRuleChecker.for_generator(gen).check_generator(gen)
+        assert report.passed, report.summary()
+
+
+@pytest.mark.parametrize('variant', ['SPACE_VARIANT', 'AI_VARIANT', 'QUANTUM_VARIANT'])
+@pytest.mark.parametrize('method', ['generate_voronoi_fractal', 'generate_hilbert_fractal',
+                                    'generate_radial_fractal'])
+def test_default_generators_pass_error_rules(variant, method):
+    import fractal_pattern_generator
+
+    np.random.seed(0)
+    gen = fractal_pattern_generator.FractalPatternGenerator(
+        getattr(fractal_pattern_generator, variant))
+    getattr(gen, method)()
+    report = DesignRuleChecker.for_generator(gen).check_generator(gen)
+    assert report.passed, report.summary()
+
+
+def test_withhold_release_removes_stale_file(tmp_path):
+    from design_rule_checker import withhold_release
+
+    stale = tmp_path / 'quantum_pattern.dxf'
+    stale.write_text('0\nEOF\n')
+    withhold_release(str(stale))
+    assert not stale.exists()
+    withhold_release(str(stale))  # nothing to remove
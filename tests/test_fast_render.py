@@ -0,0 +1,49 @@
+"""Headless fast rendering"""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+
+RENDER_SCRIPT = '''
+import json, sys
+import numpy as np
+from fast_render import render_batch
+from fractal_pattern_generator import FractalPatternGenerator, QUANTUM_VARIANT
+from thermal_fea_simulator import ThermalFEA
+
+out = sys.argv[1]
+np.random.seed(0)
+gen = FractalPatternGenerator(QUANTUM_VARIANT)
+gen.add_hot_spot(0.0, 0.0, 10.0)
+gen.generate_radial_fractal(num_primary=8, branch_factor=2)
+fea = ThermalFEA(QUANTUM_VARIANT.diameter_mm, 40)
+fea.load_pattern(gen.channel_array(), gen.add_diamond_islands())
+fea.add_heat_source(0.0, 0.0, 5.0)
+fea.set_boundary_conditions(25.0, 'liquid')
+fea.solve_steady_state()
+
+files = {}
+for workers in (1, 2):
+    jobs = [gen.render_job(f'{out}/pattern_{workers}.png', dpi=50),
+            fea.render_job(f'{out}/thermal_{workers}.png', dpi=50)]
+    files[workers] = render_batch(jobs, workers=workers)
+print(json.dumps({'files': files, 'pyplot': 'matplotlib.pyplot' in sys.modules}))
+'''
+
+
+def test_render_batch_is_headless_and_worker_independent(tmp_path):
+    out = subprocess.run([sys.executable, '-c', RENDER_SCRIPT, str(tmp_path)], cwd=REPO_DIR,
+                         capture_output=True, text=True, check=True)
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+    assert not result['pyplot']
+
+    from matplotlib.image import imread
+    for serial, parallel in zip(result['files']['1'], result['files']['2']):
+        assert Path(serial).read_bytes()[:8] == b'\x89PNG\r\n\x1a\n'
+        assert np.array_equal(imread(serial), imread(parallel))
@@ -0,0 +1,12 @@
+"""Cold import time and lazy heavy dependencies of the entry modules"""
+
+import pytest
+
+from import_budget import IMPORT_BUDGETS_S, measure_import
+
+
+@pytest.mark.parametrize('module', sorted(IMPORT_BUDGETS_S))
+def test_module_import_stays_within_budget(module):
+    result = measure_import(module)
+    assert result['loaded'] == [], f"{module} imports {result['loaded']} at import time"
+    assert result['seconds'] <= IMPORT_BUDGETS_S[module]
@@ -0,0 +1,86 @@
+"""Phase events, nesting and the instrumented decorator"""
+
+import json
+
+import pytest
+
+from instrumentation import Instrumentation, JsonlHook, instrumented
+
+
+def test_nested_phases_record_depth_and_total():
+    inst = Instrumentation('test')
+    with inst.phase('outer', kind='a'):
+        with inst.phase('inner'):
+            pass
+        with inst.phase('inner'):
+            pass
+
+    # Events are emitted as phases finish, innermost first
+    assert [(e.phase, e.depth) for e in inst.events] == [('inner', 1), ('inner', 1), ('outer', 0)]
+    outer = inst.events[-1]
+    assert outer.source == 'test'
+    assert outer.info == {'kind': 'a'}
+    assert outer.seconds >= sum(e.seconds for e in inst.events[:2])
+
+    summary = inst.summary()
+    assert summary['total_s'] == outer.seconds
+    assert summary['num_events'] == 3
+    assert summary['phases']['inner']['count'] == 2
+
+
+def test_annotate_targets_innermost_phase():
+    inst = Instrumentation()
+    inst.annotate(ignored=True)  # no active phase: a no-op
+    with inst.phase('outer'):
+        inst.annotate(size=10)
+        with inst.phase('inner', method='x'):
+            inst.annotate(iterations=3)
+        assert inst.elapsed() > 0
+    assert inst.elapsed() == 0.0
+
+    inner, outer = inst.events
+    assert inner.info == {'method': 'x', 'iterations': 3}
+    assert outer.info == {'size': 10}
+
+
+def test_phase_is_recorded_when_block_raises():
+    inst = Instrumentation()
+    with pytest.raises(RuntimeError):
+        with inst.phase('failing'):
+            raise RuntimeError
+    assert [e.phase for e in inst.events] == ['failing']
+    assert inst.elapsed() == 0.0
+
+
+class Solver:
+    def __init__(self):
+        self.instrumentation = Instrumentation('Solver')
+
+    @instrumented('solve', method='cg')
+    def solve(self, x, scale=1):
+        """Scale x"""
+        self.instrumentation.annotate(iterations=x)
+        return x * scale
+
+
+def test_instrumented_decorator_wraps_method(tmp_path):
+    solver = Solver()
+    solver.instrumentation.add_hook(JsonlHook(str(tmp_path / 'events.jsonl'), run='r1'))
+    assert solver.solve(4, scale=2) == 8
+    assert Solver.solve.__name__ == 'solve'
+    assert Solver.solve.__doc__ == 'Scale x'
+
+    event, = solver.instrumentation.events
+    assert (event.source, event.phase) == ('Solver', 'solve')
+    assert event.info == {'method': 'cg', 'iterations': 4}
+
+    record, = [json.loads(line) for line in (tmp_path / 'events.jsonl').read_text().splitlines()]
+    assert record['run'] == 'r1'
+    assert record['info'] == {'method': 'cg', 'iterations': 4}
+
+
+def test_decorator_info_is_not_shared_between_calls():
+    solver = Solver()
+    solver.solve(1)
+    solver.solve(2)
+    assert [e.info['iterations'] for e in solver.instrumentation.events] == [1, 2]
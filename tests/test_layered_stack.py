@@ -0,0 +1,44 @@
+"""Multi-layer stack solver"""
+
+import numpy as np
+import pytest
+
+from layered_stack import Layer, LayeredStack, solve_stack
+
+
+def test_line_solver_matches_direct(make_model):
+    fea = make_model()
+    direct = solve_stack(fea, solver='direct')
+    line = solve_stack(fea, solver='line', rtol=1e-12)
+    assert line.shape == (5,) + fea.mask.shape
+    assert np.allclose(line, direct, rtol=0, atol=1e-8)
+
+
+def test_single_layer_stack(make_model):
+    fea = make_model()
+    layers = [Layer('heat_pipes', 500.0, 'copper', feature='channels')]
+    direct = solve_stack(fea, layers, solver='direct')
+    line = solve_stack(fea, layers, solver='line', rtol=1e-12)
+    assert line.shape == (1,) + fea.mask.shape
+    assert np.allclose(line, direct, rtol=0, atol=1e-8)
+    assert (line[0][fea.mask] > fea.ambient_temp).all()
+
+
+def test_unknown_feature_is_rejected(make_model):
+    with pytest.raises(ValueError, match="Unknown layer feature 'fins'"):
+        solve_stack(make_model(), [Layer('top', 100.0, 'copper', feature='fins')])
+
+
+def test_channel_depth_sets_heat_pipe_thickness(make_model):
+    fea = make_model()
+    fea.wafer_spec = {'channel_depth_um': 123.0}
+    layers = {layer.name: layer for layer in LayeredStack(fea).layers}
+    assert layers['heat_pipes'].thickness_um == 123.0
+
+
+def test_solve_layered_stores_every_layer(make_model):
+    fea = make_model()
+    assert fea.layer_temperatures is None
+    top = fea.solve_layered(rtol=1e-10)
+    assert fea.layer_temperatures.shape == (5,) + fea.mask.shape
+    assert np.array_equal(top, fea.layer_temperatures[0])
@@ -0,0 +1,38 @@
+"""Binary pattern file round trip"""
+
+import numpy as np
+import pytest
+
+from pattern_format import ALIGNMENT, read_header, read_pattern, write_pattern
+
+
+CHANNELS = np.arange(24, dtype=float).reshape(6, 2, 2) / 7.0
+ISLANDS = [(1.5, -2.0, 0.5), (3.0, 4.0, 1.0)]
+
+
+@pytest.mark.parametrize('mmap', [True, False])
+def test_round_trip(tmp_path, mmap):
+    path = str(tmp_path / 'p.twp')
+    write_pattern(path, CHANNELS, ISLANDS, wafer_spec={'diameter_mm': 100.0},
+                  metadata={'pattern': 'test'})
+    data = read_pattern(path, mmap=mmap)
+    assert isinstance(data.channels, np.memmap) == mmap
+    assert np.array_equal(data.channels, CHANNELS)
+    assert np.array_equal(data.diamond_islands, np.array(ISLANDS))
+    assert data.hot_spots.shape == (0, 3)
+    assert data.wafer_spec == {'diameter_mm': 100.0}
+    assert data.metadata == {'pattern': 'test'}
+
+
+def test_arrays_are_aligned(tmp_path):
+    path = str(tmp_path / 'p.twp')
+    write_pattern(path, CHANNELS, ISLANDS)
+    offsets = [desc['offset'] for desc in read_header(path)['arrays'].values()]
+    assert all(offset % ALIGNMENT == 0 for offset in offsets)
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / 'p.twp'
+    path.write_bytes(b'not a pattern file at all')
+    with pytest.raises(ValueError, match='not a binary pattern file'):
+        read_pattern(str(path))
@@ -0,0 +1,78 @@
+"""Distance-transform screening metrics and the ΔT surrogate"""
+
+import numpy as np
+import pytest
+
+from pattern_metrics import (DISTANCE_PERCENTILES, PatternScreener, SurrogateModel,
+                             calibrate_surrogate)
+
+
+CHANNELS = np.array([[[-20.0, -5.0], [15.0, -5.0]],
+                     [[15.0, -5.0], [15.0, 18.0]],
+                     [[-10.0, 5.0], [-2.0, 20.0]]])
+HOT_SPOTS = [(0.0, 0.0, 50.0), (-15.0, -15.0, 20.0)]
+
+
+def brute_force_distance(screener, raster):
+    """Distance from every pixel centre to the nearest channel pixel centre, less half a width"""
+    rows, cols = np.indices(raster.shape)
+    pixels = np.stack([rows.ravel(), cols.ravel()], axis=1)
+    channel = np.argwhere(raster)
+    nearest = np.sqrt(((pixels[:, None, :] - channel[None, :, :])**2).sum(axis=2)).min(axis=1)
+    dist = nearest.reshape(raster.shape) * screener.pixel_mm
+    return np.maximum(dist - screener.channel_width_mm / 2, 0.0)
+
+
+def segment_distance(points, channels):
+    """Exact distance (mm) from points to the nearest segment centreline"""
+    p1, delta = channels[:, 0], channels[:, 1] - channels[:, 0]
+    t = ((points[:, None, :] - p1) * delta).sum(axis=2) / (delta**2).sum(axis=1)
+    closest = p1 + np.clip(t, 0, 1)[..., None] * delta
+    return np.linalg.norm(points[:, None, :] - closest, axis=2).min(axis=1)
+
+
+def test_metrics_match_brute_force_distances():
+    screener = PatternScreener(60.0, resolution=48, channel_width_mm=0.5)
+    raster = screener.rasterize(CHANNELS)
+    expected = brute_force_distance(screener, raster)
+    assert np.allclose(screener.distance_map(raster), expected)
+
+    metrics = screener.evaluate(CHANNELS, HOT_SPOTS)
+    wafer = expected[screener.mask]
+    assert metrics.max_distance_mm == pytest.approx(wafer.max())
+    assert metrics.mean_distance_mm == pytest.approx(wafer.mean())
+    assert list(metrics.distance_percentiles_mm.values()) == pytest.approx(
+        np.percentile(wafer, DISTANCE_PERCENTILES).tolist())
+    assert metrics.coverage_fraction == pytest.approx(np.mean(wafer <= 5.0))
+
+    # Rasterization costs at most about a pixel against the exact geometry
+    hot = np.array(HOT_SPOTS)[:, :2]
+    exact = np.maximum(segment_distance(hot, CHANNELS) - 0.25, 0.0)
+    assert np.allclose(metrics.hot_spot_distances_mm, exact, atol=1.5 * screener.pixel_mm)
+
+
+def test_surrogate_fit_recovers_linear_model():
+    model = SurrogateModel.fit([1.0, 2.0, 4.0, np.nan], [5.0, 7.0, 11.0, 3.0])
+    assert (model.scale, model.offset) == pytest.approx((2.0, 3.0))
+    assert model.num_samples == 3
+    assert model.rms_error == pytest.approx(0.0, abs=1e-12)
+
+
+def test_calibrated_surrogate_ranks_denser_pattern_first():
+    from fractal_pattern_generator import FractalPatternGenerator, QUANTUM_VARIANT
+
+    generators = []
+    for num_primary in (3, 6, 24):
+        np.random.seed(0)
+        gen = FractalPatternGenerator(QUANTUM_VARIANT)
+        gen.add_hot_spot(30.0, 10.0, 50.0)
+        gen.generate_radial_fractal(num_primary=num_primary, branch_factor=2)
+        generators.append(gen)
+
+    model = calibrate_surrogate(generators, fea_resolution=60, screen_resolution=128)
+    assert model.scale > 0
+
+    screener = PatternScreener.for_spec(QUANTUM_VARIANT, 128, surrogate=model)
+    ranked = screener.screen([(gen.channel_array(), gen.hot_spots) for gen in generators],
+                             keep_fraction=1.0)
+    assert [index for index, _ in ranked] == [2, 1, 0]
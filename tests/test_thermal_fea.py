@@ -0,0 +1,85 @@
+"""Steady-state assembly and solvers"""
+
+from multiprocessing import shared_memory
+
+import numpy as np
+import pytest
+
+
+def reference_system(fea):
+    """Node-by-node assembly, as build_stiffness_matrix/build_force_vector did originally"""
+    n, dx = fea.n, fea.dx / 1000.0
+    K = np.zeros((fea.num_nodes, fea.num_nodes))
+    F = np.zeros(fea.num_nodes)
+    for i in range(n):
+        for j in range(n):
+            idx = j * n + i
+            if not fea.mask[j, i]:
+                K[idx, idx], F[idx] = 1.0, fea.ambient_temp
+                continue
+            k = fea.conductivity_map[j, i]
+            K[idx, idx] = -4 * k / dx**2
+            for ni, nj in ((i + 1, j), (i - 1, j), (i, j + 1), (i, j - 1)):
+                if 0 <= ni < n and 0 <= nj < n and fea.mask[nj, ni]:
+                    K[idx, nj * n + ni] = k / dx**2
+            F[idx] = -fea.heat_sources[j, i] * dx**2
+            dist = np.hypot(-fea.radius_mm + i * fea.dx, -fea.radius_mm + j * fea.dx)
+            if abs(dist - fea.radius_mm) < 2 * fea.dx:
+                K[idx, idx] += -fea.h / dx
+                F[idx] += -fea.h * fea.ambient_temp / dx
+    return K, F
+
+
+def test_vectorized_assembly_matches_loops(make_model):
+    fea = make_model()
+    K_ref, F_ref = reference_system(fea)
+    assert np.allclose(fea.build_stiffness_matrix().toarray(), K_ref, rtol=1e-12, atol=0)
+    assert np.allclose(fea.build_force_vector(), F_ref, rtol=1e-12, atol=0)
+
+
+def test_schwarz_matches_direct(make_model):
+    fea = make_model()
+    direct = fea.solve_steady_state().copy()
+    schwarz = fea.solve_steady_state(solver='schwarz', num_subdomains=4, workers=1,
+                                     rtol=1e-12)
+    assert np.allclose(schwarz, direct, rtol=0, atol=1e-8)
+
+
+def test_schwarz_workers_match_direct_and_release_shared_memory(make_model, monkeypatch):
+    import domain_decomposition
+
+    preconditioners = []
+
+    class RecordingPreconditioner(domain_decomposition.SchwarzPreconditioner):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            preconditioners.append(self)
+
+    monkeypatch.setattr(domain_decomposition, 'SchwarzPreconditioner', RecordingPreconditioner)
+    fea = make_model()
+    direct = fea.solve_steady_state().copy()
+    schwarz = fea.solve_steady_state(solver='schwarz', num_subdomains=4, workers=2,
+                                     rtol=1e-12)
+    assert np.allclose(schwarz, direct, rtol=0, atol=1e-7)
+
+    M, = preconditioners
+    assert M.workers == 2 and not M._processes
+    for shm in (M._r_shm, M._z_shm):
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=shm.name)
+
+
+def test_unknown_solver(make_model):
+    with pytest.raises(ValueError, match='Unknown solver'):
+        make_model().solve_steady_state(solver='multigrid')
+
+
+def test_outside_nodes_are_pinned_to_ambient(make_model):
+    fea = make_model()
+    outside = np.flatnonzero(~fea.mask.ravel())
+    K = fea.build_stiffness_matrix()[outside]
+    assert (K.getnnz(axis=1) == 1).all() and np.array_equal(K[:, outside].diagonal(),
+                                                            np.ones(len(outside)))
+    T = fea.solve_steady_state()
+    assert np.isfinite(T).all()
+    assert (T[~fea.mask] == fea.ambient_temp).all()
@@ -0,0 +1,53 @@
+"""Tiled grid storage and the tiled ThermalFEA backend"""
+
+import numpy as np
+
+from thermal_fea_simulator import TiledThermalFEA
+from tiled_grid import TiledGrid
+
+
+def test_tiled_solve_matches_dense_direct(make_model):
+    dense = make_model()
+    expected = dense.solve_steady_state()
+    with make_model(TiledThermalFEA, tile_size=24, dtype=np.float64) as tiled:
+        assert np.array_equal(tiled.mask, dense.mask)
+        assert np.array_equal(tiled.heat_sources, dense.heat_sources)
+        tiled.solve_steady_state(rtol=1e-12)
+        assert np.allclose(tiled.temperature, expected, rtol=0, atol=1e-9)
+
+
+def test_dense_solvers_mask_temperature_through_tiles(make_model):
+    with make_model(TiledThermalFEA, tile_size=24, dtype=np.float64) as tiled:
+        # Unpin outside nodes so only the solver's final masking sets them
+        build_force_vector = tiled.build_force_vector
+        def unpinned():
+            F = build_force_vector()
+            F[~tiled.mask.ravel()] = 0.0
+            return F
+        tiled.build_force_vector = unpinned
+
+        for solve in (lambda: tiled.solve_steady_state(solver='direct'),
+                      lambda: tiled.solve_transient(0.3, dt=0.1)):
+            solve()
+            temperature = tiled.temperature
+            assert (temperature[~tiled.mask] == tiled.ambient_temp).all()
+            assert (temperature[tiled.mask] > 0).all()
+
+
+def test_default_conductivities_follow_materials():
+    import tiled_grid
+    from thermal_fea_simulator import MATERIALS
+
+    assert tiled_grid.BASE_CONDUCTIVITY == MATERIALS['copper'].conductivity
+    assert tiled_grid.DIAMOND_CONDUCTIVITY == MATERIALS['cvd_diamond'].conductivity
+
+
+def test_grid_removes_only_its_own_directory(tmp_path):
+    with TiledGrid(10.0, 16, tile_size=8) as grid:
+        owned = grid.directory
+        assert owned.exists()
+    assert not owned.exists()
+
+    grid = TiledGrid(10.0, 16, tile_size=8, directory=tmp_path / 'grid')
+    grid.close()
+    assert (tmp_path / 'grid' / 'grid.json').exists()
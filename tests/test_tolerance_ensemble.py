@@ -0,0 +1,24 @@
+"""Tolerance ensemble members against full reassembly"""
+
+import numpy as np
+
+from tolerance_ensemble import ToleranceEnsemble
+
+
+def test_members_match_reassembled_direct_solves(make_model):
+    ensemble = ToleranceEnsemble(make_model(), seed=3)
+    for member in (0, 7):
+        t_max, delta_t, _ = ensemble.solve_member(member, rtol=1e-12)
+
+        fea = make_model()
+        fea.conductivity_map = ensemble.sample_conductivity(member)
+        T = fea.solve_steady_state()[fea.mask]
+        assert np.isclose(t_max, T.max(), rtol=1e-9)
+        assert np.isclose(delta_t, np.ptp(T), rtol=1e-9)
+
+
+def test_batched_members_match_single_solves(make_model):
+    ensemble = ToleranceEnsemble(make_model(), seed=3)
+    batch = ensemble.solve_members([1, 2, 3], rtol=1e-12)
+    single = [ensemble.solve_member(m, rtol=1e-12) for m in (1, 2, 3)]
+    assert np.allclose([b[:2] for b in batch], [s[:2] for s in single], rtol=1e-10)
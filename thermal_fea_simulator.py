@@ -6,15 +6,17 @@ Supports all three variants: Space Solar, AI Compute, Quantum
 """
 
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib import cm
-from scipy.sparse import lil_matrix, csr_matrix
-from scipy.sparse.linalg import spsolve
 import json
 from pathlib import Path
 from dataclasses import dataclass
-from typing import List, Tuple, Dict
-import time
+from typing import List, Tuple, Dict, TYPE_CHECKING
+
+from instrumentation import Instrumentation, instrumented
+
+# scipy and matplotlib are imported where they are used, so importing this
+# module for a headless solve never loads a plotting backend.
+if TYPE_CHECKING:
+    from scipy.sparse import csr_matrix
 
 
 @dataclass
@@ -35,55 +37,103 @@ MATERIALS = {
     'silicon': ThermalProperties(148.0, 2329, 712, 0.7),
 }
 
+# Heat pipes have effective conductivity of ~15000 W/m·K
+HEAT_PIPE_CONDUCTIVITY = 15000.0
+
 
 class ThermalFEA:
     """Finite Element Analysis for thermal distribution"""
     
-    def __init__(self, wafer_diameter_mm: float, resolution: int = 200):
+    def __init__(self, wafer_diameter_mm: float, resolution: int = 200,
+                 instrumentation: Instrumentation = None):
         """
         Initialize FEA mesh
         
         Args:
             wafer_diameter_mm: Wafer diameter in mm
             resolution: Number of mesh points along diameter
+            instrumentation: Phase timing/memory recorder (timing only if omitted)
         """
+        self.instrumentation = instrumentation or Instrumentation('ThermalFEA')
         self.diameter_mm = wafer_diameter_mm
         self.radius_mm = wafer_diameter_mm / 2.0
         self.resolution = resolution
         
-        # Create 2D mesh
+        # Create 2D mesh; 2D coordinate grids are built on demand (X, Y)
         self.dx = self.diameter_mm / resolution
-        x = np.linspace(-self.radius_mm, self.radius_mm, resolution)
-        y = np.linspace(-self.radius_mm, self.radius_mm, resolution)
-        self.X, self.Y = np.meshgrid(x, y)
+        self.x = np.linspace(-self.radius_mm, self.radius_mm, resolution)
+        self.y = np.linspace(-self.radius_mm, self.radius_mm, resolution)
         
-        # Create mask for circular wafer
-        self.mask = (self.X**2 + self.Y**2) <= self.radius_mm**2
+        # Cell origins used when stamping channels, islands and sources
+        self.cell_x = -self.radius_mm + np.arange(resolution) * self.dx
+        self.cell_y = self.cell_x
         
-        # Initialize fields
-        self.temperature = np.zeros_like(self.X)
-        self.heat_sources = np.zeros_like(self.X)
-        self.conductivity_map = np.ones_like(self.X) * MATERIALS['copper'].conductivity
+        # Wafer mask and fields
+        self._allocate_fields()
         
         # Channel network
         self.channels = []
         self.diamond_islands = []
+        self.wafer_spec = {}
+        self.layer_temperatures = None  # (layers, n, n) from solve_layered
         
         self.n = resolution
         self.num_nodes = resolution * resolution
     
+    def _allocate_fields(self):
+        """Create the circular wafer mask and dense field arrays"""
+        self.mask = (self.x[None, :]**2 + self.y[:, None]**2) <= self.radius_mm**2
+        
+        shape = (self.resolution, self.resolution)
+        self.temperature = np.zeros(shape)
+        self.heat_sources = np.zeros(shape)
+        self.conductivity_map = np.full(shape, MATERIALS['copper'].conductivity)
+    
+    @property
+    def X(self) -> np.ndarray:
+        return np.broadcast_to(self.x[None, :], self.mask.shape)
+    
+    @property
+    def Y(self) -> np.ndarray:
+        return np.broadcast_to(self.y[:, None], self.mask.shape)
+    
     def load_pattern_from_json(self, json_file: str):
         """Load fractal pattern from JSON file"""
-        with open(json_file, 'r') as f:
-            data = json.load(f)
+        with self.instrumentation.phase('pattern_load', format='json'):
+            with open(json_file, 'r') as f:
+                data = json.load(f)
         
-        self.channels = [
-            (np.array(p1), np.array(p2)) 
-            for p1, p2 in data['channels']
-        ]
+        self.wafer_spec = data.get('wafer_spec', {})
+        self.load_pattern(data['channels'], data['diamond_islands'])
+    
+    def load_pattern_from_binary(self, pattern_file: str, mmap: bool = True):
+        """
+        Load fractal pattern from a binary columnar pattern file
+        
+        Args:
+            pattern_file: File written by FractalPatternGenerator.export_binary
+            mmap: Memory-map the channel arrays instead of reading them
+        """
+        from pattern_format import read_pattern
+        
+        with self.instrumentation.phase('pattern_load', format='binary', mmap=mmap):
+            data = read_pattern(pattern_file, mmap=mmap)
+        self.wafer_spec = data.wafer_spec
+        self.load_pattern(data.channels, data.diamond_islands)
+    
+    def load_pattern(self, channels, diamond_islands):
+        """
+        Load a fractal pattern from in-memory channel and island data
+        
+        Args:
+            channels: (N, 2, 2) array or sequence of ((x1, y1), (x2, y2))
+                      segments in mm; float64 arrays are used without copying
+            diamond_islands: Sequence of (x, y, radius) in mm
+        """
+        self.channels = np.asarray(channels, dtype=np.float64).reshape(-1, 2, 2)
         
         self.diamond_islands = [
-            (x, y, r) for x, y, r in data['diamond_islands']
+            (float(x), float(y), float(r)) for x, y, r in diamond_islands
         ]
         
         # Apply enhanced conductivity to channels
@@ -95,64 +145,34 @@ class ThermalFEA:
         print(f"Loaded pattern with {len(self.channels)} channels "
               f"and {len(self.diamond_islands)} diamond islands")
     
+    @instrumented('channel_rasterization')
     def _apply_channel_conductivity(self, channel_width_mm: float = 0.5):
         """Apply enhanced conductivity along channel network"""
-        # Heat pipes have effective conductivity of ~15000 W/m·K
-        heat_pipe_k = 15000.0
-        
-        for p1, p2 in self.channels:
-            # Rasterize line
-            num_points = int(np.linalg.norm(p2 - p1) / self.dx) + 1
-            for t in np.linspace(0, 1, num_points):
-                point = p1 + t * (p2 - p1)
-                
-                # Find mesh indices
-                i = int((point[0] + self.radius_mm) / self.dx)
-                j = int((point[1] + self.radius_mm) / self.dx)
-                
-                if (0 <= i < self.n and 0 <= j < self.n and self.mask[j, i]):
-                    # Apply enhanced conductivity in region around channel
-                    for di in range(-2, 3):
-                        for dj in range(-2, 3):
-                            ii, jj = i + di, j + dj
-                            if (0 <= ii < self.n and 0 <= jj < self.n 
-                                and self.mask[jj, ii]):
-                                self.conductivity_map[jj, ii] = heat_pipe_k
+        from tiled_grid import channel_stamp_centers, stamp_channels
+        
+        # Rasterize lines, then apply enhanced conductivity around each sample
+        ci, cj = channel_stamp_centers(self.channels, self.dx, self.radius_mm, self.n)
+        keep = self.mask[cj, ci]
+        stamp_channels(self.conductivity_map, self.mask, 0, 0, ci[keep], cj[keep],
+                       HEAT_PIPE_CONDUCTIVITY)
     
+    @instrumented('island_stamping')
     def _apply_diamond_islands(self):
         """Apply CVD diamond thermal conductivity at island locations"""
-        diamond_k = MATERIALS['cvd_diamond'].conductivity
+        from tiled_grid import stamp_islands
         
-        for x, y, r in self.diamond_islands:
-            # Convert to mesh coordinates
-            for i in range(self.n):
-                for j in range(self.n):
-                    if not self.mask[j, i]:
-                        continue
-                    
-                    mesh_x = -self.radius_mm + i * self.dx
-                    mesh_y = -self.radius_mm + j * self.dx
-                    
-                    dist = np.sqrt((mesh_x - x)**2 + (mesh_y - y)**2)
-                    if dist <= r:
-                        self.conductivity_map[j, i] = diamond_k
+        diamond_k = MATERIALS['cvd_diamond'].conductivity
+        stamp_islands(self.conductivity_map, self.mask, self.cell_x, self.cell_y,
+                      self.diamond_islands, diamond_k)
     
+    @instrumented('source_stamping')
     def add_heat_source(self, x_mm: float, y_mm: float, 
                        power_W: float, radius_mm: float = 5.0):
-        """Add a heat source to the simulation"""
-        for i in range(self.n):
-            for j in range(self.n):
-                if not self.mask[j, i]:
-                    continue
-                
-                mesh_x = -self.radius_mm + i * self.dx
-                mesh_y = -self.radius_mm + j * self.dx
-                
-                dist = np.sqrt((mesh_x - x_mm)**2 + (mesh_y - y_mm)**2)
-                if dist <= radius_mm:
-                    # Gaussian heat distribution
-                    self.heat_sources[j, i] += (power_W / (np.pi * radius_mm**2)) * \
-                        np.exp(-dist**2 / (2 * (radius_mm/3)**2))
+        """Add a Gaussian heat source to the simulation"""
+        from tiled_grid import stamp_sources
+        
+        stamp_sources(self.heat_sources, self.mask, self.cell_x, self.cell_y,
+                      [(x_mm, y_mm, power_W, radius_mm)])
     
     def set_boundary_conditions(self, ambient_temp_C: float, 
                                cooling_type: str = 'convective'):
@@ -175,101 +195,142 @@ class ThermalFEA:
         
         self.h = self.h_coefficients.get(cooling_type, 10.0)
     
-    def build_stiffness_matrix(self) -> csr_matrix:
+    @instrumented('assembly', operator='stiffness')
+    def build_stiffness_matrix(self) -> 'csr_matrix':
         """Build global stiffness matrix for steady-state heat equation"""
-        print("Building stiffness matrix...")
-        start_time = time.time()
+        from scipy.sparse import coo_matrix
         
-        # Sparse matrix for efficiency
-        K = lil_matrix((self.num_nodes, self.num_nodes))
+        print("Building stiffness matrix...")
         
         # Finite difference stencil
         dx = self.dx / 1000.0  # Convert to meters
+        n = self.n
+        inside = self.mask.ravel()
+        k = self.conductivity_map.ravel()
+        idx = np.arange(self.num_nodes)
         
-        for i in range(self.n):
-            for j in range(self.n):
-                if not self.mask[j, i]:
-                    continue
-                
-                idx = j * self.n + i
-                k = self.conductivity_map[j, i]
-                
-                # Central node
-                K[idx, idx] = -4 * k / (dx**2)
-                
-                # Neighbors (4-point stencil)
-                neighbors = [
-                    (i+1, j, 1), (i-1, j, 1),
-                    (i, j+1, 1), (i, j-1, 1)
-                ]
-                
-                for ni, nj, weight in neighbors:
-                    if (0 <= ni < self.n and 0 <= nj < self.n 
-                        and self.mask[nj, ni]):
-                        nidx = nj * self.n + ni
-                        K[idx, nidx] = k / (dx**2) * weight
-                
-                # Boundary conditions (Robin/convective)
-                if self._is_boundary(i, j):
-                    K[idx, idx] += -self.h / dx
+        # Central node; nodes outside the wafer are pinned to ambient
+        diag = np.where(inside, -4 * k / (dx**2), 1.0)
+        
+        # Boundary conditions (Robin/convective)
+        diag[inside & self._boundary_nodes()] += -self.h / dx
+        
+        rows, cols, vals = [idx], [idx], [diag]
+        
+        # Neighbors (4-point stencil), only between nodes inside the wafer
+        col = idx % n
+        for offset, valid in ((1, col < n - 1), (-1, col > 0),
+                              (n, idx < self.num_nodes - n), (-n, idx >= n)):
+            src = idx[valid & inside]
+            src = src[inside[src + offset]]
+            rows.append(src)
+            cols.append(src + offset)
+            vals.append(k[src] / (dx**2))
         
-        print(f"Stiffness matrix built in {time.time() - start_time:.2f}s")
+        K = coo_matrix((np.concatenate(vals), (np.concatenate(rows), np.concatenate(cols))),
+                       shape=(self.num_nodes, self.num_nodes))
+        
+        print(f"Stiffness matrix built in {self.instrumentation.elapsed():.2f}s")
         return K.tocsr()
     
-    def _is_boundary(self, i: int, j: int) -> bool:
-        """Check if node is on wafer boundary"""
-        mesh_x = -self.radius_mm + i * self.dx
-        mesh_y = -self.radius_mm + j * self.dx
-        dist = np.sqrt(mesh_x**2 + mesh_y**2)
-        return abs(dist - self.radius_mm) < 2 * self.dx
+    def _boundary_nodes(self) -> np.ndarray:
+        """Flat boolean array of nodes on the wafer boundary"""
+        dist = np.sqrt(self.cell_x[None, :]**2 + self.cell_y[:, None]**2)
+        return (np.abs(dist - self.radius_mm) < 2 * self.dx).ravel()
     
+    @instrumented('assembly', operator='force')
     def build_force_vector(self) -> np.ndarray:
         """Build force vector from heat sources and boundary conditions"""
-        F = np.zeros(self.num_nodes)
-        
         dx = self.dx / 1000.0  # Convert to meters
+        inside = self.mask.ravel()
         
-        for i in range(self.n):
-            for j in range(self.n):
-                if not self.mask[j, i]:
-                    continue
-                
-                idx = j * self.n + i
-                
-                # Heat source term
-                F[idx] = -self.heat_sources[j, i] * dx**2
-                
-                # Boundary condition (ambient temperature)
-                if self._is_boundary(i, j):
-                    F[idx] += -self.h * self.ambient_temp / dx
+        # Heat source term
+        F = -self.heat_sources.ravel() * dx**2
+        
+        # Boundary condition (ambient temperature)
+        F[inside & self._boundary_nodes()] += -self.h * self.ambient_temp / dx
+        
+        # Nodes outside the wafer are pinned to ambient
+        F[~inside] = self.ambient_temp
         
         return F
     
-    def solve_steady_state(self) -> np.ndarray:
-        """Solve steady-state heat equation"""
+    @instrumented('steady_state')
+    def solve_steady_state(self, solver: str = 'direct', **solver_options) -> np.ndarray:
+        """
+        Solve steady-state heat equation
+        
+        Args:
+            solver: 'direct' (sparse LU) or 'schwarz' (domain-decomposition
+                    preconditioned CG across worker processes)
+            solver_options: Passed to domain_decomposition.solve_schwarz
+                            (num_subdomains, overlap, workers, rtol, maxiter)
+        """
+        from scipy.sparse.linalg import splu
+        
+        if solver not in ('direct', 'schwarz'):
+            raise ValueError(f"Unknown solver '{solver}'; use 'direct' or 'schwarz'")
+        
         print("Solving steady-state thermal distribution...")
-        start_time = time.time()
         
         # Build system
         K = self.build_stiffness_matrix()
         F = self.build_force_vector()
         
         # Solve K*T = F
-        T_vector = spsolve(K, F)
+        if solver == 'schwarz':
+            from domain_decomposition import solve_schwarz
+            T_vector = solve_schwarz(self, K, F, **solver_options)
+        else:
+            with self.instrumentation.phase('factorization', method='splu'):
+                lu = splu(K.tocsc())
+                self.instrumentation.annotate(nnz_factor=int(lu.L.nnz + lu.U.nnz))
+            with self.instrumentation.phase('solve', method='splu', iterations=1):
+                T_vector = lu.solve(F)
+        
+        # Reshape to 2D and apply mask before storing: subclasses may
+        # back self.temperature with storage that hands out copies
+        temperature = T_vector.reshape((self.n, self.n))
+        temperature[~self.mask] = self.ambient_temp
+        self.temperature = temperature
+        
+        print(f"Solution computed in {self.instrumentation.elapsed():.2f}s")
+        print(f"Temperature range: {temperature[self.mask].min():.1f}°C "
+              f"to {temperature[self.mask].max():.1f}°C")
+        print(f"Max ΔT: {temperature[self.mask].max() - temperature[self.mask].min():.1f}°C")
+        
+        return temperature
+    
+    @instrumented('layered')
+    def solve_layered(self, layers=None, solver: str = 'line', **solver_options) -> np.ndarray:
+        """
+        Solve steady state through the multi-layer (2.5D) wafer stack
+        
+        Args:
+            layers: layered_stack.Layer list, top first (default: the
+                    five-layer build-up with this pattern's channel depth)
+            solver: 'line' (layer-aware preconditioned CG) or 'direct'
+            solver_options: Passed to layered_stack.solve_stack (rtol, maxiter)
+        
+        Returns:
+            Top-layer (device side) temperature; all layers are stored in
+            self.layer_temperatures
+        """
+        from layered_stack import solve_stack
         
-        # Reshape to 2D
-        self.temperature = T_vector.reshape((self.n, self.n))
+        print("Solving layered steady-state thermal distribution...")
         
-        # Apply mask
-        self.temperature[~self.mask] = self.ambient_temp
+        self.layer_temperatures = solve_stack(self, layers, solver, **solver_options)
+        self.temperature = self.layer_temperatures[0].copy()
         
-        print(f"Solution computed in {time.time() - start_time:.2f}s")
-        print(f"Temperature range: {self.temperature[self.mask].min():.1f}°C "
-              f"to {self.temperature[self.mask].max():.1f}°C")
-        print(f"Max ΔT: {self.temperature[self.mask].max() - self.temperature[self.mask].min():.1f}°C")
+        print(f"Solution computed in {self.instrumentation.elapsed():.2f}s")
+        for index, T in enumerate(self.layer_temperatures):
+            print(f"  Layer {index}: {T[self.mask].min():.1f}°C to {T[self.mask].max():.1f}°C")
+        print(f"Max ΔT (top): {self.temperature[self.mask].max() - self.temperature[self.mask].min():.1f}°C")
         
         return self.temperature
     
+    @instrumented('transient')
     def solve_transient(self, total_time_s: float, dt: float = 0.1) -> List[np.ndarray]:
         """
         Solve transient heat equation
@@ -281,6 +342,9 @@ class ThermalFEA:
         Returns:
             List of temperature fields at each time step
         """
+        from scipy.sparse import diags
+        from scipy.sparse.linalg import splu
+        
         print(f"Solving transient thermal response for {total_time_s}s...")
         
         # Material properties (use composite values)
@@ -292,13 +356,13 @@ class ThermalFEA:
         
         # Mass matrix (lumped)
         dx = self.dx / 1000.0
-        M = lil_matrix((self.num_nodes, self.num_nodes))
-        for i in range(self.num_nodes):
-            M[i, i] = rho * cp * dx**2
-        M = M.tocsr()
+        M = diags(np.full(self.num_nodes, rho * cp * dx**2), format='csr')
         
-        # Time integration (implicit Euler)
+        # Time integration (implicit Euler); A is constant, so factor it once
         A = M + dt * K
+        with self.instrumentation.phase('factorization', method='splu'):
+            lu = splu(A.tocsc())
+            self.instrumentation.annotate(nnz_factor=int(lu.L.nnz + lu.U.nnz))
         
         # Initial condition
         T_current = np.zeros(self.num_nodes)
@@ -307,30 +371,64 @@ class ThermalFEA:
         results = []
         num_steps = int(total_time_s / dt)
         
-        for step in range(num_steps):
-            if step % 100 == 0:
-                print(f"  Step {step}/{num_steps} ({step*dt:.1f}s)")
-            
-            # Build RHS
-            F = self.build_force_vector()
-            b = M @ T_current + dt * F
-            
-            # Solve
-            T_current = spsolve(A, b)
-            
-            # Store result every 10 steps
-            if step % 10 == 0:
-                T_2d = T_current.reshape((self.n, self.n))
-                T_2d[~self.mask] = self.ambient_temp
-                results.append(T_2d.copy())
-        
-        self.temperature = T_current.reshape((self.n, self.n))
-        self.temperature[~self.mask] = self.ambient_temp
+        # Sources and boundary conditions are fixed over the run
+        F = self.build_force_vector()
+        
+        with self.instrumentation.phase('solve', method='splu', iterations=num_steps):
+            for step in range(num_steps):
+                if step % 100 == 0:
+                    print(f"  Step {step}/{num_steps} ({step*dt:.1f}s)")
+                
+                # Build RHS and solve
+                b = M @ T_current + dt * F
+                T_current = lu.solve(b)
+                
+                # Store result every 10 steps
+                if step % 10 == 0:
+                    T_2d = T_current.reshape((self.n, self.n))
+                    T_2d[~self.mask] = self.ambient_temp
+                    results.append(T_2d.copy())
+        
+        temperature = T_current.reshape((self.n, self.n))
+        temperature[~self.mask] = self.ambient_temp
+        self.temperature = temperature
         
         return results
     
-    def visualize(self, filename: str = None, show_channels: bool = True):
-        """Visualize thermal distribution"""
+    def render_job(self, filename: str, show_channels: bool = True,
+                   dpi: int = 100, target_px: int = None):
+        """Picklable fast-render job for fast_render.render_batch"""
+        return ('thermal', dict(
+            filename=filename, temperature=self.temperature, mask=self.mask,
+            radius_mm=self.radius_mm, spacing_mm=float(self.x[1] - self.x[0]),
+            channels=self.channels if show_channels else (),
+            diamond_islands=self.diamond_islands, dpi=dpi, target_px=target_px))
+    
+    @instrumented('export', format='image')
+    def visualize(self, filename: str = None, show_channels: bool = True,
+                  fast: bool = False, dpi: int = 300, target_px: int = None):
+        """
+        Visualize thermal distribution
+        
+        Args:
+            filename: Output image path (shows interactively if omitted)
+            show_channels: Overlay the channel network
+            fast: Headless Agg rendering with imshow, NaN masking and
+                  gradients in physical °C/mm
+            dpi: Output resolution
+            target_px: In fast mode, downsample to at most this many pixels
+        """
+        if fast:
+            if filename is None:
+                raise ValueError("fast rendering requires an output filename")
+            from fast_render import render_batch
+            render_batch([self.render_job(filename, show_channels, dpi, target_px)],
+                         workers=1)
+            print(f"Visualization saved to {filename}")
+            return
+        
+        import matplotlib.pyplot as plt
+        
         fig, axes = plt.subplots(1, 2, figsize=(16, 7))
         
         # Temperature distribution
@@ -341,7 +439,7 @@ class ThermalFEA:
         im = ax.contourf(self.X, self.Y, temp_plot, levels=50, cmap='hot')
         plt.colorbar(im, ax=ax, label='Temperature (°C)')
         
-        if show_channels and self.channels:
+        if show_channels and len(self.channels):
             for p1, p2 in self.channels[:200]:  # Limit for visibility
                 ax.plot([p1[0], p2[0]], [p1[1], p2[1]], 
                        'c-', linewidth=0.3, alpha=0.3)
@@ -380,15 +478,16 @@ class ThermalFEA:
         plt.tight_layout()
         
         if filename:
-            plt.savefig(filename, dpi=300, bbox_inches='tight')
+            plt.savefig(filename, dpi=dpi, bbox_inches='tight')
             print(f"Visualization saved to {filename}")
         else:
             plt.show()
         
         plt.close()
     
+    @instrumented('export', format='json')
     def export_results(self, filename: str):
-        """Export simulation results to JSON"""
+        """Export simulation results to JSON, with the per-phase timing summary"""
         results = {
             'wafer_diameter_mm': self.diameter_mm,
             'resolution': self.resolution,
@@ -403,6 +502,7 @@ class ThermalFEA:
                                self.temperature[self.mask].min())
             },
             'heat_load_W': float(np.sum(self.heat_sources) * (self.dx/1000)**2),
+            'instrumentation': self.instrumentation.summary(),
         }
         
         with open(filename, 'w') as f:
@@ -411,38 +511,174 @@ class ThermalFEA:
         print(f"Results exported to {filename}")
 
 
-def run_all_simulations():
-    """Run thermal simulations for all three variants"""
-    output_dir = Path('/home/claude/thermal_wafer_project/simulations')
-    cad_dir = Path('/home/claude/thermal_wafer_project/cad_models')
-    
-    variants = [
-        {
-            'name': 'space_solar',
-            'diameter': 300.0,
-            'pattern_file': cad_dir / 'space_solar_pattern.json',
-            'ambient_temp': 25.0,
-            'cooling': 'radiative',
-            'heat_loads': [(0, 0, 50), (105, 0, 50), (-105, 0, 50),
-                          (0, 105, 50), (0, -105, 50)]
-        },
-        {
-            'name': 'ai_compute',
-            'diameter': 450.0,
-            'pattern_file': cad_dir / 'ai_compute_pattern.json',
-            'ambient_temp': 25.0,
-            'cooling': 'liquid',
-            'heat_loads': [(0, 0, 1000)]
-        },
-        {
-            'name': 'quantum',
-            'diameter': 200.0,
-            'pattern_file': cad_dir / 'quantum_pattern.json',
-            'ambient_temp': -269.0,  # 4K
-            'cooling': 'convective',
-            'heat_loads': [(0, 0, 5), (15, 15, 5), (-15, -15, 5)]
-        }
-    ]
+class TiledThermalFEA(ThermalFEA):
+    """
+    ThermalFEA backed by an out-of-core tiled_grid.TiledGrid
+    
+    Patterns and heat sources are stamped tile by tile into memory-mapped
+    fields, and the default 'tiled' solver is matrix-free CG that holds a
+    few tiles at a time, so wafers larger than RAM can be solved (float32
+    halves the footprint). mask, conductivity_map, heat_sources and
+    temperature are dense copies read on demand, for the 'direct' and
+    'schwarz' solvers, plotting and export on grids that fit in memory.
+    """
+    
+    def __init__(self, wafer_diameter_mm: float, resolution: int = 200,
+                 instrumentation: Instrumentation = None, tile_size: int = 1024,
+                 dtype=np.float32, directory: str = None, workers: int = 1):
+        """
+        Initialize tiled FEA mesh
+        
+        Args:
+            wafer_diameter_mm: Wafer diameter in mm
+            resolution: Number of mesh points along diameter
+            instrumentation: Phase timing/memory recorder (timing only if omitted)
+            tile_size: Tile edge in cells (multiple of 8)
+            dtype: Field dtype, np.float32 or np.float64
+            directory: Backing directory (a temporary one, removed on close(),
+                       if omitted)
+            workers: Worker processes for stamping (1 runs in-process)
+        """
+        from tiled_grid import TiledGrid
+        
+        self.grid = TiledGrid(wafer_diameter_mm, resolution, tile_size, dtype, directory,
+                              MATERIALS['copper'].conductivity, workers)
+        self.workers = workers
+        super().__init__(wafer_diameter_mm, resolution, instrumentation)
+    
+    def _allocate_fields(self):
+        # Fields live in self.grid
+        pass
+    
+    @property
+    def mask(self) -> np.ndarray:
+        return self.grid.to_dense('mask')
+    
+    @property
+    def conductivity_map(self) -> np.ndarray:
+        return self.grid.to_dense('conductivity')
+    
+    @property
+    def heat_sources(self) -> np.ndarray:
+        return self.grid.to_dense('heat_sources')
+    
+    @property
+    def temperature(self) -> np.ndarray:
+        return self.grid.to_dense('temperature')
+    
+    @temperature.setter
+    def temperature(self, values: np.ndarray):
+        self.grid.write_window('temperature', 0, 0, np.asarray(values))
+    
+    def close(self):
+        """Release the grid (deleting its directory if it is temporary)"""
+        self.grid.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    @instrumented('channel_rasterization')
+    def _apply_channel_conductivity(self, channel_width_mm: float = 0.5):
+        """Apply enhanced conductivity along channel network, tile by tile"""
+        self.grid.rasterize(channels=self.channels, workers=self.workers)
+    
+    @instrumented('island_stamping')
+    def _apply_diamond_islands(self):
+        """Apply CVD diamond thermal conductivity at island locations, tile by tile"""
+        self.grid.rasterize(diamond_islands=self.diamond_islands,
+                            island_k=MATERIALS['cvd_diamond'].conductivity,
+                            workers=self.workers)
+    
+    @instrumented('source_stamping')
+    def add_heat_source(self, x_mm: float, y_mm: float,
+                        power_W: float, radius_mm: float = 5.0):
+        """Add a Gaussian heat source to the simulation"""
+        self.grid.rasterize(heat_sources=[(x_mm, y_mm, power_W, radius_mm)],
+                            workers=self.workers)
+    
+    def solve_steady_state(self, solver: str = 'tiled', **solver_options):
+        """
+        Solve steady-state heat equation
+        
+        Args:
+            solver: 'tiled' (matrix-free CG over the tiles), or 'direct' and
+                    'schwarz' on dense copies of the fields (small grids only)
+            solver_options: Passed to tiled_grid.solve_tiled (rtol, maxiter),
+                            or as for ThermalFEA.solve_steady_state
+        
+        Returns:
+            For 'tiled', the tile-major temperature memmap (self.temperature
+            gives a dense copy); otherwise the dense temperature field
+        """
+        if solver != 'tiled':
+            return super().solve_steady_state(solver, **solver_options)
+        
+        from tiled_grid import solve_tiled
+        
+        print("Solving steady-state thermal distribution (tiled)...")
+        
+        with self.instrumentation.phase('steady_state'):
+            with self.instrumentation.phase('solve', method='tiled-pcg'):
+                result = solve_tiled(self.grid, self.h, self.ambient_temp, **solver_options)
+                self.instrumentation.annotate(iterations=result.iterations,
+                                              relative_residual=result.relative_residual)
+        
+        if not result.converged:
+            print(f"Warning: CG stopped after {result.iterations} iterations "
+                  f"at relative residual {result.relative_residual:.2e}")
+        low, high = self.grid.masked_range('temperature')
+        print(f"Solution computed in {self.instrumentation.events[-1].seconds:.2f}s "
+              f"({result.iterations} CG iterations)")
+        print(f"Temperature range: {low:.1f}°C to {high:.1f}°C")
+        print(f"Max ΔT: {high - low:.1f}°C")
+        
+        return result.x
+
+
+# Reference simulation setup per variant; heat loads are (x_mm, y_mm, power_W)
+SIMULATION_CASES = [
+    {
+        'name': 'space_solar',
+        'diameter': 300.0,
+        'ambient_temp': 25.0,
+        'cooling': 'radiative',
+        'heat_loads': [(0, 0, 50), (105, 0, 50), (-105, 0, 50),
+                      (0, 105, 50), (0, -105, 50)]
+    },
+    {
+        'name': 'ai_compute',
+        'diameter': 450.0,
+        'ambient_temp': 25.0,
+        'cooling': 'liquid',
+        'heat_loads': [(0, 0, 1000)]
+    },
+    {
+        'name': 'quantum',
+        'diameter': 200.0,
+        'ambient_temp': -269.0,  # 4K
+        'cooling': 'convective',
+        'heat_loads': [(0, 0, 5), (15, 15, 5), (-15, -15, 5)]
+    }
+]
+
+
+def run_all_simulations(output_dir: str = '.', cad_dir: str = '.'):
+    """
+    Run thermal simulations for all three variants
+    
+    Args:
+        output_dir: Directory for result images and JSON
+        cad_dir: Directory holding the generated *_pattern.json/.twp files
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    cad_dir = Path(cad_dir)
+    
+    variants = [dict(case, pattern_file=cad_dir / f"{case['name']}_pattern.json")
+                for case in SIMULATION_CASES]
     
     for variant in variants:
         print(f"\n{'='*70}")
@@ -453,7 +689,10 @@ def run_all_simulations():
         fea = ThermalFEA(variant['diameter'], resolution=150)
         
         # Load pattern
-        if variant['pattern_file'].exists():
+        binary_file = variant['pattern_file'].with_suffix('.twp')
+        if binary_file.exists():
+            fea.load_pattern_from_binary(str(binary_file))
+        elif variant['pattern_file'].exists():
             fea.load_pattern_from_json(str(variant['pattern_file']))
         else:
             print(f"Warning: Pattern file not found, running without pattern")
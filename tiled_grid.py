@@ -0,0 +1,514 @@
+#!/usr/bin/env python3
+"""
+Tiled Out-of-Core Wafer Grid
+Memory-mapped, tile-major field storage with a bit-packed wafer mask and
+on-the-fly coordinates, the vectorized channel, island and heat-source
+stamping kernels shared with ThermalFEA, and a matrix-free tile-by-tile
+conjugate gradient solver for the steady-state system
+"""
+
+import json
+import shutil
+import tempfile
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from array_utils import ragged_arange
+from thermal_fea_simulator import HEAT_PIPE_CONDUCTIVITY, MATERIALS
+
+
+FIELDS = ('conductivity', 'heat_sources', 'temperature')
+
+# Default conductivities (W/m·K), shared with ThermalFEA
+BASE_CONDUCTIVITY = MATERIALS['copper'].conductivity
+DIAMOND_CONDUCTIVITY = MATERIALS['cvd_diamond'].conductivity
+
+# Channels raise conductivity in a (2·half_width + 1)² block around each sample
+CHANNEL_HALF_WIDTH = 2
+
+
+# ---------------------------------------------------------------------------
+# Stamping kernels. Each operates on one tile (or a whole dense grid as a
+# single tile) whose first cell is (row j0, column i0).
+# ---------------------------------------------------------------------------
+
+def channel_stamp_centers(channels, dx: float, radius_mm: float, n: int
+                          ) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Grid cells sampled along each channel segment
+
+    Each segment is sampled at int(length / dx) + 1 evenly spaced points
+    (endpoints included) and each point maps to the cell it truncates to.
+
+    Returns:
+        (i, j) column and row indices of in-bounds samples
+    """
+    channels = np.asarray(channels, dtype=np.float64).reshape(-1, 2, 2)
+    if len(channels) == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    p1 = channels[:, 0]
+    delta = channels[:, 1] - p1
+    # Lengths via per-row dot products, as np.linalg.norm of one segment computes them
+    lengths = np.sqrt(np.matmul(delta[:, None, :], delta[:, :, None]).ravel())
+    counts = (lengths / dx).astype(np.int64) + 1
+    owner = np.repeat(np.arange(len(channels)), counts)
+    k = ragged_arange(counts)
+
+    # Same parameterization as np.linspace(0, 1, count) per segment
+    step = 1.0 / np.maximum(counts - 1, 1)
+    t = k * step[owner]
+    t[(k == counts[owner] - 1) & (counts[owner] > 1)] = 1.0
+
+    points = p1[owner] + t[:, None] * delta[owner]
+    i = ((points[:, 0] + radius_mm) / dx).astype(np.int64)
+    j = ((points[:, 1] + radius_mm) / dx).astype(np.int64)
+    inside = (i >= 0) & (i < n) & (j >= 0) & (j < n)
+    return i[inside], j[inside]
+
+
+def stamp_channels(field: np.ndarray, mask: np.ndarray, i0: int, j0: int,
+                   ci: np.ndarray, cj: np.ndarray, value: float,
+                   half_width: int = CHANNEL_HALF_WIDTH):
+    """Set masked cells within half_width of any stamp center to value"""
+    h, w = field.shape
+    hit = np.zeros((h, w), dtype=bool)
+    for di in range(-half_width, half_width + 1):
+        ii = ci + di - i0
+        ok_i = (ii >= 0) & (ii < w)
+        for dj in range(-half_width, half_width + 1):
+            jj = cj + dj - j0
+            ok = ok_i & (jj >= 0) & (jj < h)
+            hit[jj[ok], ii[ok]] = True
+    field[hit & mask] = value
+
+
+def _window(coords: np.ndarray, centre: float, radius: float) -> slice:
+    """Index range of sorted uniform coords that can lie within radius of centre"""
+    return slice(int(np.searchsorted(coords, centre - radius, side='left')),
+                 int(np.searchsorted(coords, centre + radius, side='right')))
+
+
+def stamp_islands(field: np.ndarray, mask: np.ndarray, xs: np.ndarray,
+                  ys: np.ndarray, islands, value: float):
+    """Set masked cells inside any (x, y, radius) disc to value"""
+    for x, y, r in islands:
+        cols, rows = _window(xs, x, r), _window(ys, y, r)
+        if cols.start >= cols.stop or rows.start >= rows.stop:
+            continue
+        dist = np.sqrt((xs[None, cols] - x)**2 + (ys[rows, None] - y)**2)
+        field[rows, cols][(dist <= r) & mask[rows, cols]] = value
+
+
+def stamp_sources(field: np.ndarray, mask: np.ndarray, xs: np.ndarray,
+                  ys: np.ndarray, sources):
+    """Add Gaussian (x, y, power_W, radius_mm) heat sources to masked cells"""
+    for x, y, power_W, radius_mm in sources:
+        cols, rows = _window(xs, x, radius_mm), _window(ys, y, radius_mm)
+        if cols.start >= cols.stop or rows.start >= rows.stop:
+            continue
+        dist = np.sqrt((xs[None, cols] - x)**2 + (ys[rows, None] - y)**2)
+        inside = (dist <= radius_mm) & mask[rows, cols]
+        field[rows, cols][inside] += ((power_W / (np.pi * radius_mm**2)) *
+                                      np.exp(-dist[inside]**2 / (2 * (radius_mm/3)**2)))
+
+
+# ---------------------------------------------------------------------------
+# Tiled storage
+# ---------------------------------------------------------------------------
+
+class TiledGrid:
+    """
+    Wafer grid stored as memory-mapped tiles
+
+    Fields are float arrays laid out tile-major, shape (tiles_y, tiles_x,
+    tile, tile), so each tile is one contiguous block on disk. The wafer
+    mask is bit-packed (one bit per cell). Coordinates are computed per
+    tile instead of stored; as in ThermalFEA, the mask uses mesh nodes
+    spaced D/(n-1) and stamping uses cell origins -R + i·D/n.
+
+    A grid created without a directory owns its temporary directory and
+    deletes it on close() (or when used as a context manager, or at the
+    latest when the grid is garbage collected).
+    """
+
+    def __init__(self, diameter_mm: float, resolution: int, tile_size: int = 1024,
+                 dtype=np.float64, directory: Optional[str] = None,
+                 base_conductivity: float = BASE_CONDUCTIVITY,
+                 workers: Optional[int] = 1, _create: bool = True):
+        """
+        Args:
+            diameter_mm: Wafer diameter in mm
+            resolution: Cells along the diameter
+            tile_size: Tile edge in cells (multiple of 8)
+            dtype: Field dtype, np.float64 or np.float32
+            directory: Backing directory (a temporary one, removed on
+                       close(), if omitted)
+            base_conductivity: Initial conductivity of every wafer cell
+            workers: Worker processes for initialization (1 runs in-process)
+        """
+        if tile_size % 8 or tile_size <= 2 * CHANNEL_HALF_WIDTH:
+            raise ValueError("tile_size must be a multiple of 8 larger than the channel stamp")
+        self.diameter_mm = diameter_mm
+        self.radius_mm = diameter_mm / 2.0
+        self.n = resolution
+        self.dx = diameter_mm / resolution
+        self.node_spacing = diameter_mm / (resolution - 1)
+        self.tile_size = tile_size
+        self.dtype = np.dtype(dtype)
+        self.tiles_y = self.tiles_x = -(-resolution // tile_size)
+        self.owns_directory = directory is None
+        self.directory = Path(directory or tempfile.mkdtemp(prefix='tiled_grid_'))
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._cleanup = (weakref.finalize(self, shutil.rmtree, str(self.directory), True)
+                         if self.owns_directory else None)
+
+        shape = (self.tiles_y, self.tiles_x, tile_size, tile_size)
+        mode = 'w+' if _create else 'r+'
+        self.fields = {name: np.memmap(self.directory / f'{name}.dat', dtype=self.dtype,
+                                       mode=mode, shape=shape)
+                       for name in FIELDS}
+        self.mask_bits = np.memmap(self.directory / 'mask.bits', dtype=np.uint8, mode=mode,
+                                   shape=shape[:3] + (tile_size // 8,))
+        if _create:
+            self._write_header()
+            self.initialize(base_conductivity, workers)
+
+    @classmethod
+    def open(cls, directory: str) -> 'TiledGrid':
+        """Reopen a grid written earlier"""
+        with open(Path(directory) / 'grid.json', 'r') as f:
+            header = json.load(f)
+        return cls(header['diameter_mm'], header['resolution'], header['tile_size'],
+                   np.dtype(header['dtype']), directory, _create=False)
+
+    def close(self):
+        """Flush and release the memory maps; delete the directory if the grid owns it"""
+        for a in self.fields.values():
+            a.flush()
+        if self.mask_bits is not None:
+            self.mask_bits.flush()
+        self.fields, self.mask_bits = {}, None
+        if self._cleanup is not None:
+            self._cleanup()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _write_header(self):
+        with open(self.directory / 'grid.json', 'w') as f:
+            json.dump({'diameter_mm': self.diameter_mm, 'resolution': self.n,
+                       'tile_size': self.tile_size, 'dtype': self.dtype.str,
+                       'fields': list(FIELDS)}, f, indent=2)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes on disk across all fields and the mask"""
+        return sum(a.nbytes for a in self.fields.values()) + self.mask_bits.nbytes
+
+    def tiles(self) -> Iterator[Tuple[int, int]]:
+        for ty in range(self.tiles_y):
+            for tx in range(self.tiles_x):
+                yield ty, tx
+
+    def tile_origin(self, ty: int, tx: int) -> Tuple[int, int]:
+        """(row j0, column i0) of a tile's first cell"""
+        return ty * self.tile_size, tx * self.tile_size
+
+    def tile_coordinates(self, ty: int, tx: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Cell x (per column) and y (per row) coordinates in mm for a tile"""
+        j0, i0 = self.tile_origin(ty, tx)
+        offsets = np.arange(self.tile_size)
+        return (-self.radius_mm + (i0 + offsets) * self.dx,
+                -self.radius_mm + (j0 + offsets) * self.dx)
+
+    def mask_at(self, i: np.ndarray, j: np.ndarray) -> np.ndarray:
+        """Wafer mask evaluated at arbitrary (column, row) cells"""
+        i, j = np.asarray(i), np.asarray(j)
+        # Node coordinates as np.linspace(-R, R, n) computes them
+        x = np.where(i == self.n - 1, self.radius_mm, -self.radius_mm + i * self.node_spacing)
+        y = np.where(j == self.n - 1, self.radius_mm, -self.radius_mm + j * self.node_spacing)
+        inside = (i < self.n) & (j < self.n)
+        return inside & ((x**2 + y**2) <= self.radius_mm**2)
+
+    def tile_mask(self, ty: int, tx: int) -> np.ndarray:
+        """Unpacked (tile, tile) boolean mask"""
+        return np.unpackbits(self.mask_bits[ty, tx], axis=1).astype(bool)
+
+    def add_field(self, name: str) -> np.ndarray:
+        """Create (or return) an extra tile-major field, e.g. solver work vectors"""
+        if name not in self.fields:
+            self.fields[name] = np.memmap(self.directory / f'{name}.dat', dtype=self.dtype,
+                                          mode='w+', shape=self.fields[FIELDS[0]].shape)
+        return self.fields[name]
+
+    def tile(self, name: str, ty: int, tx: int) -> np.ndarray:
+        """Writable (tile, tile) view of one field"""
+        return self.fields[name][ty, tx]
+
+    def _spec(self) -> Dict:
+        """Picklable description for worker processes"""
+        return {'directory': str(self.directory)}
+
+    def _run(self, function, jobs: List[Tuple], workers: Optional[int]):
+        spec = self._spec()
+        if workers == 1 or len(jobs) <= 1:
+            for job in jobs:
+                function(spec, *job)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                list(pool.map(function, [spec] * len(jobs), *zip(*jobs)))
+        for a in self.fields.values():
+            a.flush()
+        self.mask_bits.flush()
+
+    def initialize(self, base_conductivity: float = BASE_CONDUCTIVITY,
+                   workers: Optional[int] = 1):
+        """Compute the mask and reset fields, tile by tile"""
+        self._run(_initialize_tile, [(ty, tx, base_conductivity) for ty, tx in self.tiles()],
+                  workers)
+
+    def rasterize(self, channels=(), diamond_islands=(), heat_sources=(),
+                  channel_k: float = HEAT_PIPE_CONDUCTIVITY,
+                  island_k: float = DIAMOND_CONDUCTIVITY,
+                  workers: Optional[int] = None):
+        """
+        Stamp channels, diamond islands and heat sources tile by tile
+
+        Channel samples are binned to every tile their stamp touches, so
+        tiles are independent and processed in parallel worker processes.
+
+        Args:
+            channels: (N, 2, 2) segments in mm
+            diamond_islands: Sequence of (x, y, radius) in mm
+            heat_sources: Sequence of (x, y, power_W, radius_mm)
+            channel_k: Conductivity along channels
+            island_k: Conductivity inside islands (applied after channels)
+            workers: Worker processes (CPU count if omitted; 1 runs in-process)
+        """
+        ci, cj = channel_stamp_centers(channels, self.dx, self.radius_mm, self.n)
+        keep = self.mask_at(ci, cj)
+        ci, cj = ci[keep], cj[keep]
+
+        # Bin samples to the tiles their stamp covers
+        T, hw = self.tile_size, CHANNEL_HALF_WIDTH
+        last = self.tiles_x - 1
+        tile_i = [np.clip((ci + d) // T, 0, last) for d in (-hw, hw)]
+        tile_j = [np.clip((cj + d) // T, 0, last) for d in (-hw, hw)]
+        keys = np.concatenate([tj * self.tiles_x + ti for ti in tile_i for tj in tile_j])
+        owners = np.tile(np.arange(len(ci)), 4)
+        stride = max(len(ci), 1)
+        pairs = np.unique(keys * stride + owners)
+        keys, owners = pairs // stride, pairs % stride
+        bounds = np.searchsorted(keys, np.arange(self.tiles_y * self.tiles_x + 1))
+
+        islands = [tuple(map(float, isl)) for isl in diamond_islands]
+        sources = [tuple(map(float, src)) for src in heat_sources]
+        jobs = []
+        for ty, tx in self.tiles():
+            key = ty * self.tiles_x + tx
+            sel = owners[bounds[key]:bounds[key + 1]]
+            tile_islands = self._overlapping(ty, tx, [(x, y, r) for x, y, r in islands])
+            tile_sources = self._overlapping(ty, tx, [(x, y, r) for x, y, _, r in sources],
+                                             sources)
+            if len(sel) or tile_islands or tile_sources:
+                jobs.append((ty, tx, ci[sel], cj[sel], tile_islands, tile_sources,
+                             channel_k, island_k))
+        self._run(_rasterize_tile, jobs, workers)
+
+    def _overlapping(self, ty: int, tx: int, discs, items=None) -> list:
+        """Items whose (x, y, r) disc bounding box intersects a tile"""
+        xs, ys = self.tile_coordinates(ty, tx)
+        items = discs if items is None else items
+        return [item for (x, y, r), item in zip(discs, items)
+                if x + r >= xs[0] and x - r <= xs[-1] and y + r >= ys[0] and y - r <= ys[-1]]
+
+    def read_window(self, name: str, j0: int, j1: int, i0: int, i1: int) -> np.ndarray:
+        """
+        Copy a rectangular window of a field (or 'mask') spanning tiles
+
+        Solvers use this to read a tile plus its halo from neighbours.
+        """
+        T = self.tile_size
+        out = np.zeros((j1 - j0, i1 - i0), dtype=bool if name == 'mask' else self.dtype)
+        for ty in range(max(j0, 0) // T, min(-(-j1 // T), self.tiles_y)):
+            for tx in range(max(i0, 0) // T, min(-(-i1 // T), self.tiles_x)):
+                tj0, ti0 = self.tile_origin(ty, tx)
+                rows = slice(max(j0, tj0), min(j1, tj0 + T))
+                cols = slice(max(i0, ti0), min(i1, ti0 + T))
+                block = self.tile_mask(ty, tx) if name == 'mask' else self.tile(name, ty, tx)
+                out[rows.start - j0:rows.stop - j0, cols.start - i0:cols.stop - i0] = \
+                    block[rows.start - tj0:rows.stop - tj0, cols.start - ti0:cols.stop - ti0]
+        return out
+
+    def write_window(self, name: str, j0: int, i0: int, values: np.ndarray):
+        """Write a rectangular window of a field starting at (row j0, column i0)"""
+        T = self.tile_size
+        j1, i1 = j0 + values.shape[0], i0 + values.shape[1]
+        for ty in range(j0 // T, -(-j1 // T)):
+            for tx in range(i0 // T, -(-i1 // T)):
+                tj0, ti0 = self.tile_origin(ty, tx)
+                rows = slice(max(j0, tj0), min(j1, tj0 + T))
+                cols = slice(max(i0, ti0), min(i1, ti0 + T))
+                self.tile(name, ty, tx)[rows.start - tj0:rows.stop - tj0,
+                                        cols.start - ti0:cols.stop - ti0] = \
+                    values[rows.start - j0:rows.stop - j0, cols.start - i0:cols.stop - i0]
+
+    def masked_range(self, name: str) -> Tuple[float, float]:
+        """(min, max) of a field over wafer cells, tile by tile"""
+        low, high = np.inf, -np.inf
+        for ty, tx in self.tiles():
+            values = self.tile(name, ty, tx)[self.tile_mask(ty, tx)]
+            if values.size:
+                low, high = min(low, float(values.min())), max(high, float(values.max()))
+        return low, high
+
+    def to_dense(self, name: str) -> np.ndarray:
+        """Whole field (or 'mask') as a dense (n, n) array; small grids only"""
+        return self.read_window(name, 0, self.n, 0, self.n)
+
+
+def _initialize_tile(spec: Dict, ty: int, tx: int, base_conductivity: float):
+    grid = TiledGrid.open(spec['directory'])
+    j0, i0 = grid.tile_origin(ty, tx)
+    offsets = np.arange(grid.tile_size)
+    mask = grid.mask_at((i0 + offsets)[None, :], (j0 + offsets)[:, None])
+    grid.mask_bits[ty, tx] = np.packbits(mask, axis=1)
+    grid.tile('conductivity', ty, tx)[:] = np.where(mask, base_conductivity, 0.0)
+    grid.tile('heat_sources', ty, tx)[:] = 0.0
+    grid.tile('temperature', ty, tx)[:] = 0.0
+
+
+def _rasterize_tile(spec: Dict, ty: int, tx: int, ci: np.ndarray, cj: np.ndarray,
+                    islands: Sequence, sources: Sequence, channel_k: float,
+                    island_k: float):
+    grid = TiledGrid.open(spec['directory'])
+    j0, i0 = grid.tile_origin(ty, tx)
+    xs, ys = grid.tile_coordinates(ty, tx)
+    mask = grid.tile_mask(ty, tx)
+    conductivity = grid.tile('conductivity', ty, tx)
+    if len(ci):
+        stamp_channels(conductivity, mask, i0, j0, ci, cj, channel_k)
+    if islands:
+        stamp_islands(conductivity, mask, xs, ys, islands, island_k)
+    if sources:
+        stamp_sources(grid.tile('heat_sources', ty, tx), mask, xs, ys, sources)
+
+
+# ---------------------------------------------------------------------------
+# Matrix-free steady-state solver on the reduced ThermalFEA system
+# (domain_decomposition.reduced_system): wafer cells only, each row scaled
+# by -1/k, so A = (4·I - adjacency)/dx² plus the convective rim term.
+# ---------------------------------------------------------------------------
+
+# CG work vectors, stored as extra tile-major fields next to the grid's own
+SOLVER_FIELDS = ('cg_diagonal', 'cg_residual', 'cg_direction', 'cg_product')
+
+
+def _dot(a: np.ndarray, b: np.ndarray) -> float:
+    return float(np.sum(np.multiply(a, b, dtype=np.float64)))
+
+
+def _tile_system(grid: TiledGrid, ty: int, tx: int, h: float, ambient_temp: float
+                 ) -> Tuple[np.ndarray, np.ndarray]:
+    """Diagonal and right-hand side of the reduced system on one tile"""
+    dx = grid.dx / 1000.0  # m
+    xs, ys = grid.tile_coordinates(ty, tx)
+    rim = np.abs(np.sqrt(xs[None, :]**2 + ys[:, None]**2) - grid.radius_mm) < 2 * grid.dx
+    mask = grid.tile_mask(ty, tx)
+    k = np.where(mask, grid.tile('conductivity', ty, tx), 1.0).astype(np.float64)
+    robin = np.where(rim, h / (dx * k), 0.0)
+    diagonal = np.where(mask, 4 / dx**2 + robin, 1.0)
+    rhs = np.where(mask, grid.tile('heat_sources', ty, tx) * dx**2 / k + robin * ambient_temp,
+                   0.0)
+    return diagonal, rhs
+
+
+def _apply_tile(grid: TiledGrid, name: str, ty: int, tx: int) -> np.ndarray:
+    """
+    A·v on one tile from the tile plus a one-cell halo of v
+
+    v must be zero outside the wafer, so neighbours there drop out of the
+    stencil just as they are absent from the reduced system.
+    """
+    j0, i0 = grid.tile_origin(ty, tx)
+    T = grid.tile_size
+    v = grid.read_window(name, j0 - 1, j0 + T + 1, i0 - 1, i0 + T + 1).astype(np.float64)
+    neighbours = v[:-2, 1:-1] + v[2:, 1:-1] + v[1:-1, :-2] + v[1:-1, 2:]
+    dx = grid.dx / 1000.0
+    Av = grid.tile('cg_diagonal', ty, tx) * v[1:-1, 1:-1] - neighbours / dx**2
+    return np.where(grid.tile_mask(ty, tx), Av, 0.0)
+
+
+def solve_tiled(grid: TiledGrid, h: float, ambient_temp: float, rtol: float = 1e-6,
+                maxiter: Optional[int] = None):
+    """
+    Steady-state temperatures by matrix-free Jacobi-preconditioned CG
+
+    Only a few tiles (plus one-cell halos) are in memory at a time; the
+    solution is written to the 'temperature' field, ambient outside the
+    wafer. Dot products accumulate in float64, but float32 grids cannot
+    resolve residuals much below rtol ≈ 1e-6.
+
+    Args:
+        grid: Rasterized grid (conductivity and heat_sources set)
+        h: Convective coefficient at the rim (W/m²·K)
+        ambient_temp: Ambient temperature (°C)
+        rtol: Stop when ‖b - Ax‖ ≤ rtol·‖b‖
+        maxiter: Iteration limit (defaults to 10·resolution)
+
+    Returns:
+        domain_decomposition.CGResult whose x is the tile-major temperature field
+    """
+    from domain_decomposition import CGResult
+
+    x = grid.fields['temperature']
+    diagonal, r, p, Ap = (grid.add_field(name) for name in SOLVER_FIELDS)
+    tiles = list(grid.tiles())
+    maxiter = maxiter or 10 * grid.n
+
+    # Start from x = 0, so r = b and p = M⁻¹r
+    rr = rz = 0.0
+    for t in tiles:
+        diagonal[t], r[t] = _tile_system(grid, *t, h, ambient_temp)
+        x[t] = 0.0
+        p[t] = r[t] / diagonal[t]
+        rr += _dot(r[t], r[t])
+        rz += _dot(r[t], p[t])
+    bnorm = np.sqrt(rr) or 1.0
+    res = float(np.sqrt(rr) / bnorm)
+    history = [res]
+
+    iterations = 0
+    while res > rtol and iterations < maxiter:
+        iterations += 1
+        pAp = 0.0
+        for t in tiles:
+            Ap[t] = _apply_tile(grid, 'cg_direction', *t)
+            pAp += _dot(p[t], Ap[t])
+        alpha = rz / pAp
+        rr = rz_new = 0.0
+        for t in tiles:
+            x[t] += alpha * p[t]
+            r[t] -= alpha * Ap[t]
+            rr += _dot(r[t], r[t])
+            rz_new += _dot(r[t], r[t] / diagonal[t])
+        res = float(np.sqrt(rr) / bnorm)
+        history.append(res)
+        if res <= rtol:
+            break
+        beta, rz = rz_new / rz, rz_new
+        for t in tiles:
+            p[t] = r[t] / diagonal[t] + beta * p[t]
+
+    for t in tiles:
+        x[t][~grid.tile_mask(*t)] = ambient_temp
+    for a in grid.fields.values():
+        a.flush()
+    return CGResult(x, iterations, res, res <= rtol, history)
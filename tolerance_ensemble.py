@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+"""
+Monte Carlo Manufacturing-Tolerance Ensembles
+Samples channel width/position, diamond island placement and conductivity
+scatter around a nominal ThermalFEA model and solves every member with CG
+preconditioned by the nominal factorization, warm-started from the nominal
+solution
+"""
+
+import copy
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, asdict, field
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from domain_decomposition import reduced_system
+from instrumentation import Instrumentation
+from tiled_grid import (BASE_CONDUCTIVITY, CHANNEL_HALF_WIDTH, DIAMOND_CONDUCTIVITY,
+                        HEAT_PIPE_CONDUCTIVITY, channel_stamp_centers, stamp_channels, stamp_islands)
+
+
+@dataclass
+class ManufacturingTolerances:
+    """
+    Manufacturing tolerances, read as ±3σ bounds of a normal distribution
+
+    Defaults follow the channel dimension check in
+    test_qualification_protocols.md and the Manufacturing Tolerances section
+    of technical_specifications.md.
+    """
+    channel_width_fraction: float = 0.10  # ±10% width (scales heat-pipe conductance)
+    channel_position_um: float = 50.0  # ±50µm per channel vertex
+    island_position_um: float = 200.0  # ±200µm diamond island placement
+    conductivity_fraction: float = 0.05  # ±5% per material
+
+    def sigma(self, name: str) -> float:
+        return getattr(self, name) / 3.0
+
+
+@dataclass
+class EnsembleResult:
+    """Per-member outputs of a tolerance ensemble"""
+    max_temperature_C: np.ndarray
+    delta_T_C: np.ndarray
+    iterations: np.ndarray
+    nominal_max_temperature_C: float
+    nominal_delta_T_C: float
+    seconds: float = 0.0
+    cold_solve_s: float = float('nan')
+    tolerances: dict = field(default_factory=dict)
+
+    def summary(self, level: float = 0.95) -> Dict:
+        """Distribution statistics with confidence intervals on the mean and tails"""
+        num = len(self.max_temperature_C)
+        stats = {}
+        for name, values, nominal in (
+                ('max_temperature_C', self.max_temperature_C, self.nominal_max_temperature_C),
+                ('delta_T_C', self.delta_T_C, self.nominal_delta_T_C)):
+            tail = 100 * (1 + level) / 2
+            stats[name] = {
+                'nominal': nominal,
+                'mean': float(values.mean()),
+                'std': float(values.std(ddof=1)) if num > 1 else 0.0,
+                'mean_ci': confidence_interval(values, level),
+                'p50': float(np.percentile(values, 50)),
+                f'p{tail:g}': float(np.percentile(values, tail)),
+                f'p{tail:g}_ci': percentile_interval(values, tail, level),
+                'min': float(values.min()),
+                'max': float(values.max()),
+            }
+        return {
+            'members': num,
+            'confidence_level': level,
+            'mean_iterations': float(self.iterations.mean()),
+            'seconds': self.seconds,
+            'cold_solve_s': self.cold_solve_s,
+            'cold_solve_equivalents': self.seconds / self.cold_solve_s,
+            'tolerances': self.tolerances,
+            **stats,
+        }
+
+    def export_json(self, filename: str, level: float = 0.95):
+        data = {'summary': self.summary(level),
+                'members': {'max_temperature_C': self.max_temperature_C.tolist(),
+                            'delta_T_C': self.delta_T_C.tolist(),
+                            'iterations': self.iterations.tolist()}}
+        with open(filename, 'w') as f:
+            json.dump(data, f, indent=2)
+        print(f"Ensemble results exported to {filename}")
+
+
+def _z_score(level: float) -> float:
+    """Two-sided standard normal quantile for a confidence level"""
+    from scipy.stats import norm
+    return float(norm.ppf((1 + level) / 2))
+
+
+def confidence_interval(values: np.ndarray, level: float = 0.95) -> List[float]:
+    """Normal-approximation confidence interval on the mean"""
+    values = np.asarray(values, dtype=float)
+    if len(values) < 2:
+        return [float(values.mean())] * 2
+    half = _z_score(level) * values.std(ddof=1) / np.sqrt(len(values))
+    return [float(values.mean() - half), float(values.mean() + half)]
+
+
+def percentile_interval(values: np.ndarray, percentile: float,
+                        level: float = 0.95) -> List[float]:
+    """Distribution-free (order statistic) confidence interval on a percentile"""
+    values = np.sort(np.asarray(values, dtype=float))
+    num, p = len(values), percentile / 100.0
+    half = _z_score(level) * np.sqrt(num * p * (1 - p))
+    lo = int(np.clip(np.floor(num * p - half), 0, num - 1))
+    hi = int(np.clip(np.ceil(num * p + half), 0, num - 1))
+    return [float(values[lo]), float(values[hi])]
+
+
+class ToleranceEnsemble:
+    """
+    Monte Carlo ensemble around a nominal ThermalFEA model
+
+    ThermalFEA rows are k_i times a conductivity-independent stencil plus a
+    Robin term, so in the SPD form used by domain_decomposition a member's
+    matrix differs from nominal only on the boundary diagonal, and its
+    right-hand side is the nominal force divided by k. The nominal LU
+    factorization is therefore a near-exact preconditioner: warm-started
+    from the nominal solution, members converge in one or two CG
+    iterations without reassembly or refactorization.
+    Likewise only nodes carrying a heat load or a Robin term see k at all,
+    so member rasterization is restricted to that support.
+    """
+
+    def __init__(self, fea, tolerances: Optional[ManufacturingTolerances] = None,
+                 seed: int = 0):
+        """
+        Args:
+            fea: ThermalFEA with pattern, heat sources and boundary conditions set
+            tolerances: Manufacturing tolerances (spec defaults if omitted)
+            seed: Base seed; member m uses an independent stream (seed, m)
+        """
+        self.fea = fea
+        self.tolerances = tolerances or ManufacturingTolerances()
+        self.seed = seed
+        self._factorized = False
+
+    def _prepare(self):
+        """Nominal reduced system, factorization and solution"""
+        from scipy.sparse import diags
+        from scipy.ndimage import binary_dilation
+        from scipy.sparse.linalg import splu
+
+        fea = self.fea
+        start = time.perf_counter()
+        K = fea.build_stiffness_matrix()
+        F = fea.build_force_vector()
+        A0, b0, self.nodes = reduced_system(K, F, fea.mask, fea.conductivity_map)
+        self.lu = splu(A0.tocsc())
+        self.x0 = self.lu.solve(b0)
+        self.cold_solve_s = time.perf_counter() - start
+
+        # Split A0 into its conductivity-independent part and the Robin diagonal
+        dx = fea.dx / 1000.0
+        self.robin = np.where(fea._boundary_nodes()[self.nodes], fea.h / dx, 0.0)
+        self.stencil = (A0 - diags(self.robin / fea.conductivity_map.ravel()[self.nodes])).tocsr()
+        self.force = F[self.nodes]
+
+        # Only nodes with a load or a Robin term depend on k
+        support = np.zeros(fea.num_nodes, dtype=bool)
+        support[self.nodes[(self.force != 0) | (self.robin != 0)]] = True
+        self.support = support.reshape(fea.mask.shape)
+        # Channel samples farther than the stamp half-width cannot reach it
+        reach = np.ones((2 * CHANNEL_HALF_WIDTH + 1,) * 2, dtype=bool)
+        self.channel_reach = binary_dilation(self.support, reach)
+
+        # Channel vertices shared by segments move together
+        channels = np.asarray(fea.channels, dtype=float).reshape(-1, 2, 2)
+        self.vertices, inverse = np.unique(
+            np.round(channels.reshape(-1, 2), 9), axis=0, return_inverse=True)
+        self.vertex_index = inverse.ravel()
+        self.islands = np.asarray(fea.diamond_islands, dtype=float).reshape(-1, 3)
+        self._factorized = True
+
+    def sample_conductivity(self, member: int, restrict: bool = False) -> np.ndarray:
+        """
+        Conductivity map for one ensemble member
+
+        Args:
+            member: Member index (selects the random stream)
+            restrict: Stamp only the cells the member system depends on; the
+                      rest keep the perturbed base conductivity
+
+        Returns:
+            (n, n) conductivity map
+        """
+        fea, tol = self.fea, self.tolerances
+        if not self._factorized:
+            self._prepare()
+        mask = self.support if restrict else fea.mask
+        rng = np.random.default_rng([self.seed, member])
+        scatter = 1 + tol.sigma('conductivity_fraction') * rng.standard_normal(3)
+        width = 1 + tol.sigma('channel_width_fraction') * rng.standard_normal()
+
+        vertices = self.vertices + tol.sigma('channel_position_um') / 1000.0 * \
+            rng.standard_normal(self.vertices.shape)
+        channels = vertices[self.vertex_index].reshape(-1, 2, 2)
+        islands = self.islands.copy()
+        islands[:, :2] += tol.sigma('island_position_um') / 1000.0 * \
+            rng.standard_normal((len(islands), 2))
+
+        k = np.full(fea.mask.shape, BASE_CONDUCTIVITY * scatter[0])
+        ci, cj = channel_stamp_centers(channels, fea.dx, fea.radius_mm, fea.n)
+        keep = fea.mask[cj, ci]
+        if restrict:
+            keep &= self.channel_reach[cj, ci]
+        stamp_channels(k, mask, 0, 0, ci[keep], cj[keep],
+                       HEAT_PIPE_CONDUCTIVITY * scatter[1] * width)
+        stamp_islands(k, mask, fea.cell_x, fea.cell_y, islands,
+                      DIAMOND_CONDUCTIVITY * scatter[2])
+        return k
+
+    def solve_members(self, members: List[int], rtol: float = 1e-6) -> List[tuple]:
+        """
+        Solve a batch of members together
+
+        Each member is an independent CG run; the runs advance in lockstep so
+        every preconditioner application is one multi-right-hand-side solve
+        with the nominal factorization.
+
+        Returns:
+            (max temperature, ΔT, CG iterations) per member
+        """
+        if not self._factorized:
+            self._prepare()
+        k = np.stack([self.sample_conductivity(m, restrict=True).ravel()[self.nodes]
+                      for m in members], axis=1)
+        shift = self.robin[:, None] / k
+
+        def apply(X):
+            return self.stencil @ X + shift * X
+
+        B = -self.force[:, None] / k
+        X = np.repeat(self.x0[:, None], len(members), axis=1)
+        bnorm = np.linalg.norm(B, axis=0)
+        bnorm[bnorm == 0] = 1.0
+        R = B - apply(X)
+        iterations = np.zeros(len(members), dtype=int)
+        active = np.linalg.norm(R, axis=0) / bnorm > rtol
+        Z = self.lu.solve(R)
+        P = Z.copy()
+        rz = np.einsum('ij,ij->j', R, Z)
+        for _ in range(len(self.nodes)):
+            if not active.any():
+                break
+            AP = apply(P)
+            alpha = np.where(active, rz / np.einsum('ij,ij->j', P, AP), 0.0)
+            X += alpha * P
+            R -= alpha * AP
+            iterations += active
+            active &= np.linalg.norm(R, axis=0) / bnorm > rtol
+            Z = self.lu.solve(R)
+            rz_new = np.einsum('ij,ij->j', R, Z)
+            P = Z + (rz_new / np.where(rz == 0, 1.0, rz)) * P
+            rz = rz_new
+        return [(float(x.max()), float(np.ptp(x)), int(i)) for x, i in zip(X.T, iterations)]
+
+    def solve_member(self, member: int, rtol: float = 1e-6) -> tuple:
+        """(max temperature, ΔT, CG iterations) for one member"""
+        return self.solve_members([member], rtol)[0]
+
+    def run(self, members: int = 1000, workers: Optional[int] = None,
+            rtol: float = 1e-6, chunk_size: int = 25) -> EnsembleResult:
+        """
+        Solve an ensemble
+
+        Args:
+            members: Number of Monte Carlo members
+            workers: Worker processes (CPU count if omitted; 1 runs in-process).
+                     Each worker factors the nominal system once.
+            rtol: CG relative residual tolerance
+            chunk_size: Members per task
+
+        Returns:
+            EnsembleResult with per-member outputs and timing
+        """
+        start = time.perf_counter()
+        self._prepare()
+        chunks = [list(range(i, min(i + chunk_size, members)))
+                  for i in range(0, members, chunk_size)]
+        if workers == 1:
+            rows = [row for chunk in chunks for row in self.solve_members(chunk, rtol)]
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(self._portable(),)) as pool:
+                rows = [row for chunk in pool.map(_solve_chunk, chunks, [rtol] * len(chunks))
+                        for row in chunk]
+        rows = np.asarray(rows, dtype=float).reshape(-1, 3)
+
+        result = EnsembleResult(
+            max_temperature_C=rows[:, 0], delta_T_C=rows[:, 1],
+            iterations=rows[:, 2].astype(int),
+            nominal_max_temperature_C=float(self.x0.max()),
+            nominal_delta_T_C=float(np.ptp(self.x0)),
+            seconds=time.perf_counter() - start, cold_solve_s=self.cold_solve_s,
+            tolerances=asdict(self.tolerances))
+        print(f"Ensemble of {members} members solved in {result.seconds:.1f}s "
+              f"(≈{result.seconds / self.cold_solve_s:.0f} cold solves, "
+              f"{result.iterations.mean():.1f} CG iterations per member)")
+        return result
+
+    def _portable(self) -> 'ToleranceEnsemble':
+        """Copy suitable for pickling to workers (factorization is rebuilt there)"""
+        clone = copy.copy(self)
+        clone.fea = copy.copy(self.fea)
+        clone.fea.instrumentation = Instrumentation('ThermalFEA')
+        for name in ('lu', 'x0', 'stencil', 'robin', 'force', 'nodes',
+                     'support', 'channel_reach', 'vertices', 'vertex_index', 'islands'):
+            clone.__dict__.pop(name, None)
+        clone._factorized = False
+        return clone
+
+
+_WORKER_ENSEMBLE = None
+
+
+def _init_worker(ensemble: ToleranceEnsemble):
+    import contextlib
+    import io
+
+    global _WORKER_ENSEMBLE
+    _WORKER_ENSEMBLE = ensemble
+    with contextlib.redirect_stdout(io.StringIO()):
+        ensemble._prepare()
+
+
+def _solve_chunk(members: List[int], rtol: float) -> List[tuple]:
+    return _WORKER_ENSEMBLE.solve_members(members, rtol)
+
+
+def nominal_model(case_name: str, resolution: int = 150, cad_dir: str = '.'):
+    """ThermalFEA for one of thermal_fea_simulator.SIMULATION_CASES"""
+    from pathlib import Path
+    from thermal_fea_simulator import SIMULATION_CASES, ThermalFEA
+
+    cases = {case['name']: case for case in SIMULATION_CASES}
+    if case_name not in cases:
+        raise ValueError(f"Unknown case '{case_name}'; choose from {sorted(cases)}")
+    case = cases[case_name]
+    fea = ThermalFEA(case['diameter'], resolution=resolution)
+    pattern = Path(cad_dir) / f"{case_name}_pattern"
+    if pattern.with_suffix('.twp').exists():
+        fea.load_pattern_from_binary(str(pattern.with_suffix('.twp')))
+    elif pattern.with_suffix('.json').exists():
+        fea.load_pattern_from_json(str(pattern.with_suffix('.json')))
+    else:
+        print("Warning: Pattern file not found, running without pattern")
+    for x, y, power in case['heat_loads']:
+        fea.add_heat_source(x, y, power)
+    fea.set_boundary_conditions(case['ambient_temp'], case['cooling'])
+    return fea
+
+
+def main(argv=None):
+    import argparse
+    from thermal_fea_simulator import SIMULATION_CASES
+
+    defaults = ManufacturingTolerances()
+    parser = argparse.ArgumentParser(description='Monte Carlo manufacturing-tolerance ensemble')
+    parser.add_argument('case', choices=[case['name'] for case in SIMULATION_CASES])
+    parser.add_argument('--members', type=int, default=1000)
+    parser.add_argument('--resolution', type=int, default=150)
+    parser.add_argument('--cad-dir', default='.', help='Directory holding *_pattern.json/.twp')
+    parser.add_argument('--workers', type=int, help='Worker processes (default: CPU count)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--confidence', type=float, default=0.95)
+    parser.add_argument('--rtol', type=float, default=1e-6)
+    parser.add_argument('--width', type=float, default=defaults.channel_width_fraction,
+                        help='Channel width tolerance (fraction, ±3σ)')
+    parser.add_argument('--position-um', type=float, default=defaults.channel_position_um)
+    parser.add_argument('--island-um', type=float, default=defaults.island_position_um)
+    parser.add_argument('--conductivity', type=float, default=defaults.conductivity_fraction)
+    parser.add_argument('--output', help='JSON output (default: <case>_ensemble.json)')
+    args = parser.parse_args(argv)
+
+    tolerances = ManufacturingTolerances(args.width, args.position_um, args.island_um,
+                                         args.conductivity)
+    fea = nominal_model(args.case, args.resolution, args.cad_dir)
+    result = ToleranceEnsemble(fea, tolerances, args.seed).run(args.members, args.workers,
+                                                                   args.rtol)
+
+    summary = result.summary(args.confidence)
+    tail = f"p{100 * (1 + args.confidence) / 2:g}"
+    for name in ('max_temperature_C', 'delta_T_C'):
+        stats = summary[name]
+        print(f"{name}: nominal {stats['nominal']:.4g}, mean {stats['mean']:.4g} "
+              f"[{stats['mean_ci'][0]:.4g}, {stats['mean_ci'][1]:.4g}], "
+              f"σ {stats['std']:.3g}, {tail} {stats[tail]:.4g} "
+              f"[{stats[tail + '_ci'][0]:.4g}, {stats[tail + '_ci'][1]:.4g}]")
+    result.export_json(args.output or f'{args.case}_ensemble.json', args.confidence)
+
+
+if __name__ == '__main__':
+    main()